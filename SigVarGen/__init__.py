@@ -1,19 +1,51 @@
-from .noise import *
-from .signal import *
-from .variations import *
+import importlib
 
-from .config import *
-from .utils import *
+# Submodules and public names are imported on first access (PEP 562), so that
+# `import SigVarGen` stays cheap for worker processes and short-lived scripts
+_SUBMODULES = ('noise', 'signal', 'variations', 'config', 'utils')
+
+_LAZY_ATTRS = {
+    **dict.fromkeys(['envelope_linear', 'envelope_sine', 'envelope_random_walk', 'envelope_blockwise',
+                     'EnvelopeSpec', 'generate_noise_power', 'generate_noise_power_batch', 'harmonic_peaks',
+                     'HarmonicPeaksFilter', 'MeasuredNoiseColor', 'add_colored_noise',
+                     'ColoredNoiseStream', 'NoiseBank'], 'noise'),
+    **dict.fromkeys(['get_non_overlapping_interval', 'place_interrupt', 'apply_interrupt_modifications',
+                     'blend_signal', 'generate_main_interrupt', 'add_complexity_to_inter',
+                     'add_main_interrupt', 'add_smaller_interrupts', 'add_interrupt_with_params',
+                     'add_interrupt_bursts', 'generate_semi_periodic_signal', 'generate_semi_periodic_signals',
+                     'unpack_semi_periodic_signals', 'add_periodic_interrupts',
+                     'generate_semi_periodic_rle', 'signal_to_rle', 'rle_to_signal',
+                     'add_periodic_interrupts_rle', 'generate_signal', 'InterruptLabels',
+                     'interrupt_mask'], 'signal'),
+    **dict.fromkeys(['apply_baseline_drift_region', 'apply_baseline_drift_polynomial',
+                     'apply_baseline_drift_piecewise', 'apply_baseline_drift_quadratic',
+                     'apply_baseline_drift_middle_peak', 'generate_parameter_variations', 'generate_variation',
+                     'apply_time_shift', 'apply_time_warp', 'apply_gain_variation',
+                     'apply_amplitude_modulation', 'apply_baseline_drift',
+                     'apply_amplitude_modulation_region', 'transform_wave_with_score',
+                     'apply_nonlinear_distortion', 'apply_quantization_noise'], 'variations'),
+    **dict.fromkeys(['EMBEDDED_DEVICE_RANGES', 'EMBEDDED_DEVICE_INTERRUPTS', 'param_sweeps',
+                     'noise_funcs', 'npw_levels', 'mf_levels'], 'config'),
+    **dict.fromkeys(['calculate_SNR', 'calculate_SNR_batch', 'SNRAccumulator', 'calculate_SNR_streaming',
+                     'local_snr', 'calculate_ED', 'calculate_DTW', 'pairwise_ed', 'CrossCorrelationAligner',
+                     'align_to_reference', 'sketch_signals', 'find_near_duplicates', 'interpoling',
+                     'resample_signals', 'normalization', 'safe_normalization', 'StreamingNormalizer',
+                     'generate_device_parameters', 'generate_domain_parameters', 'DeviceCatalog'], 'utils'),
+    **dict.fromkeys(['load_scenario', 'Scenario'], 'scenario'),
+    **dict.fromkeys(['plan_batch', 'render_plan', 'SignalPlan'], 'plan'),
+}
 
 #__version__ = 1.0.0
 
 __all__ = ['noise', 'signal', 'variations',
-            'envelope_linear', 'envelope_sine', 'envelope_random_walk', 'envelope_blockwise',
-            'generate_noise_power', 'harmonic_peaks', 'add_colored_noise',
+            'envelope_linear', 'envelope_sine', 'envelope_random_walk', 'envelope_blockwise', 'EnvelopeSpec',
+            'generate_noise_power', 'generate_noise_power_batch', 'harmonic_peaks', 'HarmonicPeaksFilter', 'MeasuredNoiseColor', 'add_colored_noise', 'ColoredNoiseStream', 'NoiseBank',
             'get_non_overlapping_interval', 'place_interrupt', 'apply_interrupt_modifications', 
             'blend_signal', 'generate_main_interrupt', 'add_complexity_to_inter',
             'add_main_interrupt', 'add_smaller_interrupts', 'add_interrupt_with_params', 'add_interrupt_bursts',
-            'generate_semi_periodic_signal', 'add_periodic_interrupts', 'generate_signal',
+            'generate_semi_periodic_signal', 'generate_semi_periodic_signals',
+            'unpack_semi_periodic_signals', 'add_periodic_interrupts',
+            'generate_semi_periodic_rle', 'signal_to_rle', 'rle_to_signal', 'add_periodic_interrupts_rle', 'generate_signal', 'InterruptLabels', 'interrupt_mask',
             'apply_baseline_drift_region', 'apply_baseline_drift_polynomial', 
             'apply_baseline_drift_piecewise', 'apply_baseline_drift_quadratic', 
             'apply_baseline_drift_middle_peak', 'generate_parameter_variations', 'generate_variation',
@@ -23,5 +55,19 @@ __all__ = ['noise', 'signal', 'variations',
             'apply_nonlinear_distortion', 'apply_quantization_noise',
             'EMBEDDED_DEVICE_RANGES', 'EMBEDDED_DEVICE_INTERRUPTS', 'param_sweeps',
             'noise_funcs', 'npw_levels', 'mf_levels',
-            'calculate_SNR', 'calculate_ED', 'interpoling', 'normalization',
-            'generate_device_parameters']
+            'calculate_SNR', 'calculate_SNR_batch', 'SNRAccumulator', 'calculate_SNR_streaming', 'local_snr', 'calculate_ED', 'calculate_DTW', 'pairwise_ed', 'CrossCorrelationAligner', 'align_to_reference', 'sketch_signals', 'find_near_duplicates', 'interpoling', 'resample_signals', 'normalization', 'safe_normalization', 'StreamingNormalizer',
+            'generate_device_parameters', 'generate_domain_parameters', 'DeviceCatalog',
+            'load_scenario', 'Scenario',
+            'plan_batch', 'render_plan', 'SignalPlan']
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f'.{name}', __name__)
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(f'.{_LAZY_ATTRS[name]}', __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
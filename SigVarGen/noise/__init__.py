@@ -1,5 +1,24 @@
-from .envelopes import envelope_linear, envelope_sine, envelope_random_walk, envelope_blockwise
-from .noise import generate_noise_power, add_colored_noise, harmonic_peaks
+import importlib
 
-__all__ = ['envelope_linear', 'envelope_sine', 'envelope_random_walk', 'envelope_blockwise',
-            'generate_noise_power', 'harmonic_peaks', 'add_colored_noise']
\ No newline at end of file
+# Public names and the submodule defining them, imported on first access (PEP 562)
+_LAZY_ATTRS = {
+    'envelope_linear': 'envelopes', 'envelope_sine': 'envelopes',
+    'envelope_random_walk': 'envelopes', 'envelope_blockwise': 'envelopes', 'EnvelopeSpec': 'envelopes',
+    'generate_noise_power': 'noise', 'generate_noise_power_batch': 'noise', 'add_colored_noise': 'noise',
+    'harmonic_peaks': 'noise', 'HarmonicPeaksFilter': 'noise', 'MeasuredNoiseColor': 'noise',
+    'ColoredNoiseStream': 'streaming',
+    'NoiseBank': 'noise_bank',
+}
+
+__all__ = ['envelope_linear', 'envelope_sine', 'envelope_random_walk', 'envelope_blockwise', 'EnvelopeSpec',
+            'generate_noise_power', 'generate_noise_power_batch', 'harmonic_peaks', 'HarmonicPeaksFilter', 'MeasuredNoiseColor', 'add_colored_noise', 'ColoredNoiseStream', 'NoiseBank']
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(f'.{_LAZY_ATTRS[name]}', __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,66 +1,156 @@
 import numpy as np
 
-from SigVarGen.variations.transformations import apply_time_shift
+from SigVarGen.utils import _get_rng
 
-def envelope_linear(num_samples, npw, param):
+def _envelope_shape(num_samples, n_envelopes):
+    return (num_samples,) if n_envelopes is None else (n_envelopes, num_samples)
+
+def envelope_linear(num_samples, npw, param, n_envelopes=None):
     start, end = npw
     if param > 0.5:
         envelope = np.linspace(start, end, num=num_samples)
     else:
         envelope = np.linspace(end, start, num=num_samples)
+
+    if n_envelopes is not None:
+        envelope = np.tile(envelope, (n_envelopes, 1))
     return envelope
 
-def envelope_sine(num_samples, npw, param=0.005):
+def envelope_sine(num_samples, npw, param=0.005, max_shift=500, n_envelopes=None):
 
     frequency = param
 
     low, high = npw
     amplitude = (high - low) / 2.0
     offset = (high + low) / 2.0
-    
+
+    # Random time shift in [-max_shift, max_shift), folded into the phase
+    # instead of rolling the finished envelope; max_shift=0 means no shift
+    size = None if n_envelopes is None else (n_envelopes, 1)
+    shift = np.random.randint(-max_shift, max_shift, size=size) if max_shift else np.zeros(size or (), dtype=int)
+
     x = np.arange(num_samples)
     # sine wave oscillates in [-1, 1], so scale and offset
-    envelope = offset + amplitude * np.sin(2.0 * np.pi * frequency * x)
+    envelope = offset + amplitude * np.sin(2.0 * np.pi * frequency * (x - shift))
 
-    envelope = apply_time_shift(envelope, 500)
-    
     return envelope
 
-def envelope_random_walk(num_samples, npw, param=0.01):
+def envelope_random_walk(num_samples, npw, param=0.01, n_envelopes=None):
 
     step_std = param
 
     low, high = npw
-    envelope = np.zeros(num_samples)
-    
+    envelope = np.zeros(_envelope_shape(num_samples, n_envelopes))
+    steps = np.random.normal(0, step_std, size=envelope.shape)
+
     # Start somewhere in the middle
-    envelope[0] = (low + high) / 2.0
-    
+    envelope[..., 0] = (low + high) / 2.0
+
+    # Clipping makes every step depend on the previous one, so only the
+    # batch axis can be vectorized here
     for i in range(1, num_samples):
-        envelope[i] = envelope[i-1] + np.random.normal(0, step_std)
-        # Clip to ensure we stay in [low, high]
-        envelope[i] = np.clip(envelope[i], low, high)
-    
+        envelope[..., i] = np.clip(envelope[..., i-1] + steps[..., i], low, high)
+
     return envelope
 
-def envelope_blockwise(num_samples, npw, param=100):
+def envelope_blockwise(num_samples, npw, param=100, n_envelopes=None):
 
     block_size = int(param)
 
-    envelope = np.zeros(num_samples)
     low, high = npw
-    
-    n_blocks = num_samples // block_size
-    remainder = num_samples % block_size
-    
-    idx = 0
-    for _ in range(n_blocks):
-        val = np.random.uniform(low, high)
-        envelope[idx: idx+block_size] = val
-        idx += block_size
-    
-    if remainder > 0:
-        val = np.random.uniform(low, high)
-        envelope[idx:] = val
-    
-    return envelope
\ No newline at end of file
+
+    # One value per (possibly partial) block, expanded to samples in one pass
+    n_blocks = -(-num_samples // block_size)
+    values = np.random.uniform(low, high, size=_envelope_shape(n_blocks, n_envelopes))
+    envelope = np.repeat(values, block_size, axis=-1)[..., :num_samples]
+
+    return envelope
+
+class EnvelopeSpec:
+    """
+    Immutable description of a noise modulation envelope: an envelope function and the range
+    its `param` is drawn from.
+
+    Entries of `noise_funcs` are `EnvelopeSpec` objects. They cannot be modified after
+    creation, so one configuration can be shared between iterations, threads and forked
+    workers without copying; use `with_param` to derive a spec with another range and
+    `sample` to draw a parameter. For compatibility with code written against the former
+    dict entries, `spec['func']` and `spec['param']` still work (read-only).
+
+    Parameters
+    ----------
+    func : callable
+        Envelope function with the signature of `envelope_linear` and friends.
+    param : sequence of two values
+        Range (low, high) from which the envelope parameter is drawn uniformly.
+
+    Example
+    -------
+    >>> spec = EnvelopeSpec(envelope_sine, (0.0001, 0.01))
+    >>> pm = spec.sample(np.random.default_rng(0))
+    >>> env = spec.envelope(num_samples=1000, npw=(0.5, 1.5))
+    """
+
+    __slots__ = ('func', 'param')
+
+    def __init__(self, func, param):
+        if len(param) != 2:
+            raise ValueError("param must be a (low, high) range.")
+        object.__setattr__(self, 'func', func)
+        object.__setattr__(self, 'param', tuple(param))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable; use with_param() to derive a new spec.")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable.")
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __reduce__(self):
+        return (type(self), (self.func, self.param))
+
+    def __eq__(self, other):
+        if not isinstance(other, EnvelopeSpec):
+            return NotImplemented
+        return (self.func, self.param) == (other.func, other.param)
+
+    def __hash__(self):
+        return hash((self.func, self.param))
+
+    def __repr__(self):
+        return f"EnvelopeSpec({getattr(self.func, '__name__', self.func)}, param={self.param})"
+
+    def with_param(self, low, high):
+        """
+        Return a new spec with the same function and the parameter range (low, high).
+        """
+        return type(self)(self.func, (low, high))
+
+    def sample(self, rng=None):
+        """
+        Draw an envelope parameter uniformly from `param`.
+
+        Parameters
+        ----------
+        rng : int or numpy.random.Generator, optional
+            Seed or generator (default: None, follows numpy's global random state).
+
+        Returns
+        -------
+        float
+            A fresh parameter value; the spec itself is unchanged.
+        """
+        # low + (high - low) * u, like np.random.uniform, so reversed ranges such as
+        # (True, False) keep working
+        low, high = self.param
+        return float(low + (high - low) * _get_rng(rng).random())
+
+    def envelope(self, num_samples, npw, rng=None, n_envelopes=None):
+        """
+        Draw a parameter with `sample` and evaluate the envelope function with it.
+        """
+        return self.func(num_samples, npw, param=self.sample(rng), n_envelopes=n_envelopes)
@@ -1,5 +1,9 @@
+from abc import ABC, abstractmethod
+
 import numpy as np
 
+from SigVarGen.utils import _concat_ranges
+
 def generate_noise_power(wave, snr_range=(-20, 30)):
     """
     Generates noise power based on a randomly selected SNR within a given range.
@@ -36,7 +40,37 @@ def generate_noise_power(wave, snr_range=(-20, 30)):
 
     return noise_power, selected_snr_db
 
-def harmonic_peaks(freqs, base_freq=100, num_harmonics=5, width=5):
+def generate_noise_power_batch(waves, snr_range=(-20, 30)):
+    """
+    Row-wise version of `generate_noise_power` for a stack of signals.
+
+    Parameters:
+    ----------
+    - waves : numpy.ndarray
+        Input signals of shape (n, N).
+    - snr_range : tuple (int, int)
+        The range of SNR values (in dB) to randomly select from; one SNR is drawn per row.
+
+    Returns:
+    ----------
+    - noise_power : numpy.ndarray
+        Noise power (variance) per row, shape (n,).
+    - selected_snr_db : numpy.ndarray
+        The SNR drawn for each row, shape (n,).
+    """
+    waves = np.atleast_2d(waves)
+
+    # Variance per row, i.e. signal_std ** 2
+    signal_var = np.var(waves, axis=-1)
+
+    selected_snr_db = np.random.uniform(*snr_range, size=len(waves))
+
+    # noise_power = (signal_std * 10 ** (-snr / 20)) ** 2
+    noise_power = signal_var * 10 ** (-selected_snr_db / 10)
+
+    return noise_power, selected_snr_db
+
+def harmonic_peaks(freqs, base_freq=100, num_harmonics=5, width=5, k=6):
     """
     Generate a frequency-domain filter with Gaussian peaks at harmonic positions.
 
@@ -44,10 +78,14 @@ def harmonic_peaks(freqs, base_freq=100, num_harmonics=5, width=5):
     The resulting filter can be applied to white noise in the frequency domain to produce noise that
     contains energy primarily at harmonic peaks (e.g., for simulating voiced or periodic signals).
 
+    Each peak is evaluated only within ±k·width of its center. The bin ranges are located with
+    `np.searchsorted`, so `freqs` must be sorted in ascending order (as returned by np.fft.rfftfreq),
+    and all peaks are evaluated in one vectorized pass.
+
     Parameters
     ----------
     freqs : np.ndarray
-        Array of frequency bins (e.g., from np.fft.rfftfreq).
+        Sorted array of frequency bins (e.g., from np.fft.rfftfreq).
     base_freq : float, optional
         The fundamental frequency (in Hz). Harmonic peaks will occur at integer multiples of this value.
         Default is 100 Hz.
@@ -56,6 +94,9 @@ def harmonic_peaks(freqs, base_freq=100, num_harmonics=5, width=5):
     width : float, optional
         Standard deviation of each Gaussian peak. Controls how wide each harmonic is in the spectrum.
         Default is 5.
+    k : float or None, optional
+        Half-width of the evaluation window in units of `width`. Contributions beyond it are below
+        exp(-k²/2) and treated as zero. If None, every peak is evaluated on the full axis. Default is 6.
 
     Returns
     -------
@@ -69,56 +110,158 @@ def harmonic_peaks(freqs, base_freq=100, num_harmonics=5, width=5):
     >>> filter = harmonic_peaks(freqs, base_freq=100, num_harmonics=3, width=10)
     >>> plt.plot(freqs, filter)  # Visualize harmonic structure
     """
-    filter = np.zeros_like(freqs)
-    for i in range(1, num_harmonics + 1):
-        center = base_freq * i
-        filter += np.exp(-((freqs - center) ** 2) / (2 * width**2))
-    return filter
+    freqs = np.asarray(freqs)
+    centers = base_freq * np.arange(1, num_harmonics + 1)
 
+    if k is None:
+        peaks = np.exp(-((freqs[None, :] - centers[:, None]) ** 2) / (2 * width**2))
+        return peaks.sum(axis=0).astype(freqs.dtype, copy=False)
 
-def add_colored_noise(wave, fs, noise_power, npw, mf, color='pink', mod_envelope=None):
+    # Bin range [lo, hi) of every peak window
+    lo = np.searchsorted(freqs, centers - k * width, side='left')
+    hi = np.searchsorted(freqs, centers + k * width, side='right')
+    counts = hi - lo
+
+    # Flattened bin indices of all windows and the peak each one belongs to
+    peak_idx = np.repeat(np.arange(num_harmonics), counts)
+    bin_idx = _concat_ranges(lo, counts)
+
+    values = np.exp(-((freqs[bin_idx] - centers[peak_idx]) ** 2) / (2 * width**2))
+    filter = np.bincount(bin_idx, weights=values, minlength=len(freqs))
+    return filter.astype(freqs.dtype, copy=False)
+
+
+class _CachedSpectralFilter(ABC):
     """
-    Add colored noise (white, pink, or brown) to a signal.
+    Base class for `color` callables whose filter depends only on the frequency grid.
 
-    Parameters:
+    `add_colored_noise` rebuilds the same grid for every signal of a given length and sampling
+    frequency, so filters are cached per grid, identified by its length and first, second and
+    last bins. Subclasses implement `_compute(freqs)`.
+    """
+
+    def __init__(self, maxsize=8):
+        self.maxsize = maxsize
+        self._cache = {}
+
+    @abstractmethod
+    def _compute(self, freqs):
+        """
+        Filter for the frequency grid `freqs`, as an array of the same shape.
+        """
+
+    def __call__(self, freqs):
+        freqs = np.asarray(freqs)
+        key = (len(freqs), float(freqs[0]), float(freqs[1]), float(freqs[-1]))
+        filter = self._cache.get(key)
+        if filter is None:
+            filter = self._compute(freqs)
+            filter.setflags(write=False)
+            if len(self._cache) >= self.maxsize:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[key] = filter
+        return filter
+
+
+class HarmonicPeaksFilter(_CachedSpectralFilter):
+    """
+    Caching wrapper around `harmonic_peaks` for use as the `color` callable of `add_colored_noise`.
+
+    The filter is computed once per frequency grid, so repeated calls for signals of the same
+    length and sampling frequency cost a dict lookup.
+
+    Parameters
     ----------
-    - wave : numpy.ndarray
-        Original signal.
-    - noise_power : float
-        Base noise power level (variance).
-    - npw : tuple (float, float)
-        Tuple specifying the range over which to vary the noise power (relative to noise_power).
-    - mf : tuple (float, float)
-        Tuple specifying the modulation factor range to slightly vary the amplitude of the signal.
-    - color : str or callable, optional
-        Specifies the spectral profile of the noise to be added. Accepts:
-        - Predefined strings:
-            - 'white'  → flat spectrum
-            - 'pink'   → power ∝ 1/f
-            - 'brown'  → power ∝ 1/f^2
-            - 'blue'   → power ∝ f
-            - 'violet' → power ∝ f^2
-        - A custom function: A callable that takes a frequency array and returns a filter of the same shape.
-          For example, `lambda freqs: 1 / (freqs**0.8)` for a custom decay.
-    - mod_envelope : Dictionary {'func': function, 'param': list}
-        Dictionary selected from noise_funcs. 
+    base_freq, num_harmonics, width, k :
+        Passed to `harmonic_peaks`.
+    maxsize : int, optional
+        Maximum number of cached grids; the oldest entry is evicted first (default: 8).
 
-    Returns:
-    - res : numpy.ndarray
-        The signal with added colored noise.
+    Example
+    -------
+    >>> color = HarmonicPeaksFilter(base_freq=50, num_harmonics=20, width=2)
+    >>> res, noise = add_colored_noise(wave, fs, noise_power, npw, mf, color=color)
     """
 
-    # Determine noise power within the specified range
-    noise_pw = noise_power # * np.random.uniform(*npw)
-    
-    # Generate white noise
-    white_noise = np.random.normal(0, 1, size=len(wave))
-    
-    # Generate colored noise
-    d = 1/fs
-    freqs = np.fft.rfftfreq(len(white_noise), d=d)
-    freqs[0] = freqs[1] 
-    
+    def __init__(self, base_freq=100, num_harmonics=5, width=5, k=6, maxsize=8):
+        super().__init__(maxsize)
+        self.base_freq = base_freq
+        self.num_harmonics = num_harmonics
+        self.width = width
+        self.k = k
+
+    def _compute(self, freqs):
+        return harmonic_peaks(freqs, self.base_freq, self.num_harmonics, self.width, self.k)
+
+
+class MeasuredNoiseColor(_CachedSpectralFilter):
+    """
+    Noise color reproducing a measured noise spectrum, for use as the `color` of `add_colored_noise`.
+
+    The power spectral density is taken either from a noise recording (estimated once with
+    Welch's method) or given directly. It is converted to an amplitude shaping filter, sqrt(PSD),
+    which is linearly interpolated onto each target `rfftfreq` grid and cached per grid, so the
+    per-call cost matches the analytic colors.
+
+    Parameters
+    ----------
+    recording : numpy.ndarray, optional
+        Measured noise (e.g. a device noise floor recording). Mutually exclusive with `psd`.
+    fs : float, optional
+        Sampling frequency of `recording` (required with `recording`).
+    psd : numpy.ndarray, optional
+        Precomputed power spectral density values.
+    psd_freqs : numpy.ndarray, optional
+        Ascending frequencies of `psd` (required with `psd`).
+    nperseg : int, optional
+        Welch segment length (default: scipy's default, 256 samples).
+    maxsize : int, optional
+        Maximum number of cached grids (default: 8).
+
+    Notes
+    -----
+    - Target frequencies outside the measured range take the PSD value at the nearest edge.
+    - Only the spectral shape matters; `add_colored_noise` rescales the result to `noise_power`.
+
+    Example
+    -------
+    >>> color = MeasuredNoiseColor(recording=floor_recording, fs=10000)
+    >>> res, noise = add_colored_noise(wave, 10000, noise_power, npw, mf, color=color)
+    """
+
+    def __init__(self, recording=None, fs=None, psd=None, psd_freqs=None, nperseg=None, maxsize=8):
+        super().__init__(maxsize)
+        if (recording is None) == (psd is None):
+            raise ValueError("Provide exactly one of `recording` or `psd`.")
+
+        if recording is not None:
+            if fs is None:
+                raise ValueError("`fs` is required to estimate the PSD of a recording.")
+            from scipy.signal import welch
+            psd_freqs, psd = welch(np.asarray(recording, dtype=float), fs=fs, nperseg=nperseg)
+        elif psd_freqs is None:
+            raise ValueError("`psd_freqs` is required together with `psd`.")
+
+        psd_freqs = np.asarray(psd_freqs, dtype=float)
+        psd = np.asarray(psd, dtype=float)
+        if psd_freqs.shape != psd.shape or psd.ndim != 1:
+            raise ValueError("`psd` and `psd_freqs` must be 1-D arrays of the same length.")
+        if np.any(np.diff(psd_freqs) <= 0):
+            raise ValueError("`psd_freqs` must be strictly increasing.")
+        if np.any(psd < 0):
+            raise ValueError("`psd` must be non-negative.")
+
+        self.psd_freqs = psd_freqs
+        self.amplitude = np.sqrt(psd)
+
+    def _compute(self, freqs):
+        return np.interp(freqs, self.psd_freqs, self.amplitude)
+
+
+def _spectral_filter(freqs, color):
+    """
+    Return the amplitude filter for `color` evaluated on the frequency bins `freqs`.
+    """
     if callable(color):
         # If color is a function, than apply it as a filter
         filter = color(freqs)
@@ -137,29 +280,98 @@ def add_colored_noise(wave, fs, noise_power, npw, mf, color='pink', mod_envelope
     else:
         # White noise (no filtering)
         filter = np.ones_like(freqs)
-    
+    return filter
+
+
+def _unit_colored_noise(num_samples, fs, color, rng=None):
+    """
+    Generate `num_samples` of zero-mean, unit-variance colored noise by spectral shaping.
+    White noise is drawn from `rng` if given, otherwise from the global numpy state.
+    """
+    # Generate white noise
+    white_noise = (np.random if rng is None else rng).normal(0, 1, size=num_samples)
+
+    # Generate colored noise
+    d = 1/fs
+    freqs = np.fft.rfftfreq(num_samples, d=d)
+    freqs[0] = freqs[1]
+
+    filter = _spectral_filter(freqs, color)
+
     # Apply the filter to the noise spectrum
     noise_spectrum = np.fft.rfft(white_noise) * filter
-    
+
     # Inverse FFT to get the time-domain noise signal
-    noise = np.fft.irfft(noise_spectrum, n=len(white_noise))
-    
+    noise = np.fft.irfft(noise_spectrum, n=num_samples)
+
     # Normalize the noise to zero mean
     noise = noise - np.mean(noise)
-    
+
     # Compute the standard deviation
     noise_std = np.std(noise)
-    
+
     # Prevent division by zero
     if noise_std == 0:
         noise_std = 1
-    
+
     # Normalize to unit variance
-    noise = noise / noise_std
-    
-    # Scale noise to have the desired RMS value
-    noise_rms = np.sqrt(noise_pw)
-    noise = noise * noise_rms
+    return noise / noise_std
+
+
+def add_colored_noise(wave, fs, noise_power, npw, mf, color='pink', mod_envelope=None, noise_bank=None):
+    """
+    Add colored noise (white, pink, or brown) to a signal.
+
+    Parameters:
+    ----------
+    - wave : numpy.ndarray
+        Original signal.
+    - noise_power : float
+        Base noise power level (variance).
+    - npw : tuple (float, float)
+        Tuple specifying the range over which to vary the noise power (relative to noise_power).
+    - mf : tuple (float, float)
+        Tuple specifying the modulation factor range to slightly vary the amplitude of the signal.
+    - color : str or callable, optional
+        Specifies the spectral profile of the noise to be added. Accepts:
+        - Predefined strings:
+            - 'white'  → flat spectrum
+            - 'pink'   → power ∝ 1/f
+            - 'brown'  → power ∝ 1/f^2
+            - 'blue'   → power ∝ f
+            - 'violet' → power ∝ f^2
+        - A custom function: A callable that takes a frequency array and returns a filter of the same shape.
+          For example, `lambda freqs: 1 / (freqs**0.8)` for a custom decay.
+        - A `MeasuredNoiseColor` built from a noise recording or a precomputed PSD.
+    - mod_envelope : EnvelopeSpec or dict {'func': function, 'param': list}
+        Envelope selected from noise_funcs. 
+    - noise_bank : NoiseBank, optional
+        If given, the noise is served as a randomly offset window of the bank's pre-generated
+        realization for `color` instead of being shaped from fresh white noise. It must be built
+        for `len(wave)` samples and the same `fs`.
+
+    Returns:
+    - res : numpy.ndarray
+        The signal with added colored noise.
+    """
+
+    # Determine noise power within the specified range
+    noise_pw = noise_power # * np.random.uniform(*npw)
+
+    if noise_bank is not None:
+        # Serve a pre-generated window instead of shaping fresh noise
+        if noise_bank.num_samples != len(wave):
+            raise ValueError("noise_bank was built for a different signal length.")
+        if noise_bank.fs != fs:
+            raise ValueError("noise_bank was built for a different sampling frequency.")
+        noise = noise_bank.draw(color, noise_pw)
+    else:
+        # Generate zero-mean, unit-variance colored noise
+        noise = _unit_colored_noise(len(wave), fs, color)
+
+        # Scale noise to have the desired RMS value
+        noise_rms = np.sqrt(noise_pw)
+        noise = noise * noise_rms
     
     # Combine the original wave with the noise and apply modulation factor
 
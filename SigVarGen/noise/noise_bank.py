@@ -0,0 +1,205 @@
+import os
+import tempfile
+import weakref
+
+import numpy as np
+
+from SigVarGen.noise.noise import _unit_colored_noise
+
+
+def _remove_files(paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class NoiseBank:
+    """
+    Pool of pre-generated colored noise served as randomly offset windows.
+
+    For runs with a fixed signal length and color, most of the cost of `add_colored_noise`
+    is the forward and inverse FFT repeated for every variant. A `NoiseBank` shapes one long
+    realization per color once, and then serves per-variant noise as a randomly offset,
+    randomly sign-flipped window rescaled to the requested noise power. Windows taken from
+    the same realization may overlap, which trades a controlled amount of independence
+    between variants for speed; use `diagnostics` to quantify it.
+
+    Parameters
+    ----------
+    num_samples : int
+        Length of the served noise windows (the length of the signals to be noised).
+    fs : float
+        Sampling frequency used for spectral shaping.
+    colors : iterable, optional
+        Noise colors to pre-generate. Accepts the same values as `color` in `add_colored_noise`,
+        including callables (default: ('pink',)).
+    bank_factor : int, optional
+        Length of each realization in multiples of `num_samples`. Larger banks reduce window
+        overlap at the cost of memory (default: 64).
+    memmap_dir : str, optional
+        If given, realizations are stored as `numpy.memmap` files in this directory
+        instead of being held in memory. Each file gets a unique name, so several banks
+        may share a directory. The files are deleted by `close()`, on leaving a `with` block,
+        or at the latest when the bank is garbage collected.
+    seed : int or numpy.random.Generator, optional
+        Seed or generator for both the realizations and the window draws (default: None).
+
+    Example
+    -------
+    >>> bank = NoiseBank(num_samples=10000, fs=1000, colors=('pink', 'brown'), seed=0)
+    >>> noise = bank.draw('pink', noise_power=0.01)             # shape (10000,)
+    >>> batch = bank.draw('brown', noise_power=0.01, n=32)      # shape (32, 10000)
+    >>> noisy, _ = add_colored_noise(wave, 1000, 0.01, npw, mf, color='pink', noise_bank=bank)
+    >>> with NoiseBank(10000, 1000, memmap_dir='/scratch', seed=0) as bank:   # files removed on exit
+    ...     batch = bank.draw('pink', n=32)
+    """
+
+    def __init__(self, num_samples, fs, colors=('pink',), bank_factor=64, memmap_dir=None, seed=None):
+        if bank_factor < 1:
+            raise ValueError("bank_factor must be at least 1.")
+
+        self.num_samples = int(num_samples)
+        self.fs = fs
+        self.bank_length = int(bank_factor) * self.num_samples
+        self.rng = np.random.default_rng(seed)
+        self._banks = {}
+        self._paths = []
+        # Removes the memmap files even if close() is never called
+        self._finalizer = weakref.finalize(self, _remove_files, self._paths)
+
+        for i, color in enumerate(colors):
+            realization = _unit_colored_noise(self.bank_length, fs, color, rng=self.rng)
+            if memmap_dir is not None:
+                # Unique file per realization, so banks sharing a directory never overwrite each other
+                fd, path = tempfile.mkstemp(prefix=f"noise_bank_{i}_{self.bank_length}_", suffix=".dat",
+                                            dir=memmap_dir)
+                os.close(fd)
+                self._paths.append(path)
+                stored = np.memmap(path, dtype=np.float64, mode='w+', shape=(self.bank_length,))
+                stored[:] = realization
+                stored.flush()
+                del stored
+                realization = np.memmap(path, dtype=np.float64, mode='r', shape=(self.bank_length,))
+            self._banks[color] = realization
+
+    @property
+    def colors(self):
+        return list(self._banks)
+
+    @property
+    def closed(self):
+        return not self._finalizer.alive
+
+    def close(self):
+        """
+        Release the realizations and delete any memmap files. Safe to call more than once.
+        """
+        self._banks = {}
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _draw_offsets(self, n):
+        offsets = self.rng.integers(0, self.bank_length - self.num_samples, size=n, endpoint=True)
+        signs = self.rng.choice(np.array([-1.0, 1.0]), size=n)
+        return offsets, signs
+
+    def _windows(self, color, offsets, signs):
+        if self.closed:
+            raise ValueError("NoiseBank is closed.")
+        if color not in self._banks:
+            raise KeyError(f"Color {color!r} is not in the noise bank. Available: {self.colors}")
+
+        bank = self._banks[color]
+        windows = bank[offsets[:, None] + np.arange(self.num_samples)]
+
+        # Normalize each window exactly, as add_colored_noise does for fresh noise
+        windows -= windows.mean(axis=1, keepdims=True)
+        std = windows.std(axis=1, keepdims=True)
+        std[std == 0] = 1
+        windows *= (signs[:, None] / std)
+        return windows
+
+    def draw(self, color='pink', noise_power=1.0, n=None, return_offsets=False):
+        """
+        Serve zero-mean colored noise windows with variance `noise_power`.
+
+        Parameters
+        ----------
+        color : str or callable, optional
+            One of the colors the bank was built with (default: 'pink').
+        noise_power : float or array-like, optional
+            Target noise power (variance). May be an array of length `n` (default: 1.0).
+        n : int, optional
+            Number of windows. If None, a single 1-D window is returned.
+        return_offsets : bool, optional
+            If True, also return the window offsets and signs used (default: False).
+
+        Returns
+        -------
+        noise : numpy.ndarray
+            Array of shape (num_samples,) or (n, num_samples).
+        offsets, signs : numpy.ndarray
+            Only returned if `return_offsets` is True.
+        """
+        offsets, signs = self._draw_offsets(1 if n is None else n)
+        noise = self._windows(color, offsets, signs)
+        noise *= np.sqrt(np.asarray(noise_power, dtype=float)).reshape(-1, 1)
+
+        if n is None:
+            noise = noise[0]
+        if return_offsets:
+            return noise, offsets, signs
+        return noise
+
+    def diagnostics(self, color='pink', n_windows=128):
+        """
+        Report overlap and correlation statistics for windows served by the bank.
+
+        Draws `n_windows` windows the same way `draw` does and compares all pairs. Overlap is
+        the shared fraction of samples between two windows; correlation is the Pearson
+        correlation of the served (sign-flipped) windows. Disjoint pairs give the baseline
+        correlation expected between independent realizations of this color.
+
+        Parameters
+        ----------
+        color : str or callable, optional
+            Color to diagnose (default: 'pink').
+        n_windows : int, optional
+            Number of windows to draw; memory use is n_windows * num_samples (default: 128).
+
+        Returns
+        -------
+        dict
+            - n_windows, bank_length
+            - overlap_probability: fraction of window pairs sharing at least one sample
+            - mean_overlap, max_overlap: shared fraction of samples over all pairs
+            - mean_abs_corr, max_abs_corr: absolute correlation over all pairs
+            - mean_abs_corr_overlapping, mean_abs_corr_disjoint: the same split by overlap
+        """
+        offsets, signs = self._draw_offsets(n_windows)
+        windows = self._windows(color, offsets, signs)
+
+        pairs = np.triu_indices(n_windows, k=1)
+        gap = np.abs(offsets[:, None] - offsets[None, :])[pairs]
+        overlap = np.clip(self.num_samples - gap, 0, None) / self.num_samples
+        abs_corr = np.abs((windows @ windows.T)[pairs] / self.num_samples)
+
+        overlapping = overlap > 0
+        return {
+            'n_windows': n_windows,
+            'bank_length': self.bank_length,
+            'overlap_probability': float(np.mean(overlapping)),
+            'mean_overlap': float(np.mean(overlap)),
+            'max_overlap': float(np.max(overlap)),
+            'mean_abs_corr': float(np.mean(abs_corr)),
+            'max_abs_corr': float(np.max(abs_corr)),
+            'mean_abs_corr_overlapping': float(np.mean(abs_corr[overlapping])) if overlapping.any() else np.nan,
+            'mean_abs_corr_disjoint': float(np.mean(abs_corr[~overlapping])) if (~overlapping).any() else np.nan,
+        }
@@ -0,0 +1,129 @@
+import numpy as np
+
+# IIR approximation of a 1/f (pink) power spectrum (J. O. Smith, "Spectral Audio Signal Processing")
+_PINK_B = np.array([0.049922035, -0.095993537, 0.050612699, -0.004408786])
+_PINK_A = np.array([1.0, -2.494956002, 2.017265875, -0.522189400])
+
+_DIFF = np.array([1.0, -1.0])
+
+
+def _color_filter(color, leak=0.999):
+    """
+    Return the (b, a) coefficients of the IIR filter that shapes white noise into `color`.
+    """
+    if color == 'pink':
+        return _PINK_B, _PINK_A
+    elif color == 'brown':
+        # Leaky integration of white noise, power ∝ 1/f^2 above the leak corner
+        return np.array([1.0]), np.array([1.0, -leak])
+    elif color == 'blue':
+        # Differentiated pink noise, power ∝ f
+        return np.convolve(_PINK_B, _DIFF), _PINK_A
+    elif color == 'violet':
+        # Differentiated white noise, power ∝ f^2
+        return _DIFF, np.array([1.0])
+    elif color == 'white':
+        return np.array([1.0]), np.array([1.0])
+    raise ValueError(f"Unknown noise color '{color}'. Expected one of 'white', 'pink', 'brown', 'blue', 'violet'.")
+
+
+class ColoredNoiseStream:
+    """
+    Stateful colored noise generator producing chunks of arbitrary size.
+
+    White Gaussian noise is shaped by a low-order IIR filter whose state is carried over
+    between calls, so consecutive chunks join into one continuous realization with the same
+    statistics as a single long draw. Memory use per stream is O(1) (a handful of filter
+    taps), which makes it suitable for unbounded or memory-mapped recordings where the
+    FFT-based `add_colored_noise` cannot hold the whole signal.
+
+    Parameters
+    ----------
+    color : str, optional
+        One of 'white', 'pink', 'brown', 'blue' or 'violet' (default: 'pink').
+    noise_power : float, optional
+        Target noise power (variance) of the stationary output (default: 1.0).
+    leak : float, optional
+        Pole of the leaky integrator used for brown noise. Values closer to 1 extend the
+        1/f^2 region towards DC (default: 0.999).
+    seed : int or numpy.random.Generator, optional
+        Seed or generator for the stream's own random source (default: None).
+
+    Example
+    -------
+    >>> stream = ColoredNoiseStream('pink', noise_power=0.01, seed=0)
+    >>> first = stream.generate(1000)
+    >>> second = stream.generate(250)  # continues where `first` stopped
+    """
+
+    def __init__(self, color='pink', noise_power=1.0, leak=0.999, seed=None):
+        from scipy.signal import lfilter
+        self.color = color
+        self.noise_power = noise_power
+        self.rng = np.random.default_rng(seed)
+        self.b, self.a = _color_filter(color, leak)
+
+        # Length after which the impulse response has decayed below 1e-8
+        pole = np.max(np.abs(np.roots(self.a)), initial=0.0)
+        n_decay = len(self.b) + (int(np.ceil(np.log(1e-8) / np.log(pole))) if pole > 0 else 0)
+
+        # Unit-variance scaling from the energy of the impulse response
+        impulse = np.zeros(n_decay)
+        impulse[0] = 1.0
+        self._unit_std = np.sqrt(np.sum(lfilter(self.b, self.a, impulse) ** 2))
+
+        # Warm the filter up so the first chunk is already stationary
+        self._zi = np.zeros(max(len(self.a), len(self.b)) - 1)
+        if n_decay > 1:
+            self._filter(self.rng.standard_normal(n_decay))
+
+    def _filter(self, white):
+        if len(self._zi) == 0 or len(white) == 0:
+            return white * (self.b[0] / self.a[0])
+        from scipy.signal import lfilter
+        out, self._zi = lfilter(self.b, self.a, white, zi=self._zi)
+        return out
+
+    def generate(self, num_samples):
+        """
+        Draw the next `num_samples` samples of the stream.
+
+        Parameters
+        ----------
+        num_samples : int
+            Number of samples to produce.
+
+        Returns
+        -------
+        numpy.ndarray
+            Colored noise with variance ≈ `noise_power`, continuous with the previous chunk.
+        """
+        white = self.rng.standard_normal(int(num_samples))
+        noise = self._filter(white)
+        return noise * (np.sqrt(self.noise_power) / self._unit_std)
+
+    def add_to(self, wave, out=None, chunk_size=65536):
+        """
+        Add noise from the stream to `wave`, processing it chunk by chunk.
+
+        Parameters
+        ----------
+        wave : numpy.ndarray
+            1-D input signal (may be a numpy.memmap).
+        out : numpy.ndarray, optional
+            Array receiving the noisy signal. May be `wave` itself for in-place operation,
+            or a writable memmap. If None, a new array is allocated.
+        chunk_size : int, optional
+            Number of samples processed per step (default: 65536).
+
+        Returns
+        -------
+        numpy.ndarray
+            The noisy signal (`out` if given).
+        """
+        if out is None:
+            out = np.empty(len(wave), dtype=np.result_type(wave, np.float64))
+        for start in range(0, len(wave), chunk_size):
+            stop = min(start + chunk_size, len(wave))
+            out[start:stop] = wave[start:stop] + self.generate(stop - start)
+        return out
@@ -0,0 +1,472 @@
+import numpy as np
+
+from SigVarGen.noise.envelopes import envelope_linear, envelope_sine, envelope_random_walk, envelope_blockwise
+from SigVarGen.noise.noise import _spectral_filter
+from SigVarGen.signal.interrupt_labels import SINUSOID_DTYPE
+from SigVarGen.utils import _get_rng, _concat_ranges, DeviceCatalog
+
+# Codes stored in plans; a plan stays renderable without pickling functions
+COLORS = ('white', 'pink', 'brown', 'blue', 'violet')
+ENVELOPES = (envelope_linear, envelope_sine, envelope_random_walk, envelope_blockwise)
+
+PLAN_DTYPE = np.dtype([
+    # Base signal: sinusoids[sin_start:sin_start + sin_count], rescaled into [amp_low, amp_high]
+    ('domain', np.int16), ('row', np.int32),
+    ('sin_start', np.int64), ('sin_count', np.int32),
+    ('amp_low', np.float64), ('amp_high', np.float64),
+    # Main interrupt
+    ('has_interrupt', np.bool_), ('interrupt_start', np.int64), ('interrupt_duration', np.int64),
+    ('interrupt_sin_start', np.int64), ('interrupt_sin_count', np.int32),
+    ('interrupt_amp_low', np.float64), ('interrupt_amp_high', np.float64),
+    ('device_min', np.float64), ('device_max', np.float64),
+    ('drop', np.bool_), ('disperse', np.bool_), ('drift_u', np.float64), ('offset_u', np.float64),
+    ('blend', np.float64),
+    # Variant
+    ('time_shift', np.int64), ('gain', np.float64),
+    # Noise (snr_db is NaN for noise-free samples, envelope is -1 without modulation)
+    ('snr_db', np.float64), ('color', np.uint8), ('envelope', np.int8), ('envelope_param', np.float64),
+    ('mf', np.float64), ('noise_seed', np.uint64),
+])
+
+
+class SignalPlan:
+    """
+    All random choices for a batch of samples, stored as compact structured arrays.
+
+    A plan is produced by `plan_batch` and turned into waveforms by `render_plan`. Keeping
+    the two apart makes a batch cheap to store, inspect and filter (e.g. `plan[plan.samples['drop']]`)
+    before any signal is synthesized, and lets any subset be rendered again, in any order or
+    in parallel, with identical results.
+
+    Attributes
+    ----------
+    samples : numpy.ndarray
+        One `PLAN_DTYPE` record per sample.
+    sinusoids : numpy.ndarray
+        `SINUSOID_DTYPE` records of all base and interrupt sinusoids, referenced by the
+        `*sin_start` / `*sin_count` fields of `samples`.
+    t : numpy.ndarray
+        Time vector shared by all samples.
+    domain_names : numpy.ndarray
+        Names indexed by the `domain` field.
+    """
+
+    def __init__(self, samples, sinusoids, t, domain_names):
+        self.samples = samples
+        self.sinusoids = sinusoids
+        self.t = np.asarray(t, dtype=float)
+        self.domain_names = np.asarray(domain_names)
+
+    def __len__(self):
+        return len(self.samples)
+
+    def __repr__(self):
+        return f"SignalPlan(n={len(self)}, length={len(self.t)}, sinusoids={len(self.sinusoids)})"
+
+    def __getitem__(self, index):
+        """
+        Sub-plan with the selected samples (index, slice or boolean mask); sinusoid
+        references are repacked so the sub-plan is self-contained.
+        """
+        samples = np.atleast_1d(self.samples[index]).copy()
+        base_counts = samples['sin_count'].astype(np.int64)
+        interrupt_counts = samples['interrupt_sin_count'].astype(np.int64)
+
+        starts = np.concatenate((samples['sin_start'], samples['interrupt_sin_start']))
+        counts = np.concatenate((base_counts, interrupt_counts))
+        sinusoids = self.sinusoids[_concat_ranges(starts, counts)]
+
+        new_starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        samples['sin_start'] = new_starts[:len(samples)]
+        samples['interrupt_sin_start'] = new_starts[len(samples):]
+        return SignalPlan(samples, sinusoids, self.t, self.domain_names)
+
+    def save(self, path):
+        """
+        Write the plan to an uncompressed `.npz` file.
+        """
+        np.savez(path, samples=self.samples, sinusoids=self.sinusoids, t=self.t, domain_names=self.domain_names)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a plan written by `save`.
+        """
+        with np.load(path) as data:
+            return cls(data['samples'], data['sinusoids'], data['t'], data['domain_names'])
+
+
+def _draw_sinusoids(rng, counts, amp_low, amp_high, freq_low, freq_high, amp_md_max=0.95):
+    """
+    Draw sinusoids as `generate_signal` does: amplitude in [low, amp_md_max * high],
+    frequency in the frequency range, phase in [0, 2π).
+    """
+    owner = np.repeat(np.arange(len(counts)), counts)
+    sinusoids = np.empty(len(owner), dtype=SINUSOID_DTYPE)
+    sinusoids['amp'] = rng.uniform(amp_low[owner], amp_md_max * amp_high[owner])
+    sinusoids['freq'] = rng.uniform(freq_low[owner], freq_high[owner])
+    sinusoids['phase'] = rng.uniform(0, 2 * np.pi, size=len(owner))
+    return sinusoids
+
+
+def plan_batch(n, t, device_ranges, interrupt_ranges=None, domain=None, n_sinusoids=(50, 100),
+               duration_ratio=(0.06, 0.12), drop=False, disperse=True, blend_factor=0.5,
+               max_time_shift=0, max_gain_variation=0.0, snr_range=None, colors=('white', 'pink', 'brown'),
+               noise_funcs=None, mf=(1.0, 1.0), seed=None):
+    """
+    Draw every random parameter of `n` samples without synthesizing any signal.
+
+    Covers the base signal (`generate_signal`), one main interrupt as placed by
+    `add_main_interrupt` (with drift, offset and blending), a time shift and gain variant
+    (`apply_time_shift`, `apply_gain_variation`) and noise as added by `add_colored_noise`
+    (SNR, color, envelope and modulation factor). Quantities that depend on the rendered
+    waveform, such as the interrupt offset and drift, are stored as uniform draws and mapped
+    to their valid range at render time, so they follow the same distributions as the
+    sequential functions.
+
+    Parameters
+    ----------
+    n : int
+        Number of samples.
+    t : numpy.ndarray
+        Time vector shared by all samples.
+    device_ranges : dict or DeviceCatalog
+        Base signal ranges, e.g. `EMBEDDED_DEVICE_RANGES` (domain and band drawn uniformly).
+    interrupt_ranges : dict or DeviceCatalog, optional
+        Interrupt ranges with the same devices and bands. If None, no interrupts are planned.
+    domain : str or array-like, optional
+        Fix the domain(s) instead of drawing them (default: None).
+    n_sinusoids : tuple of int, optional
+        Inclusive range of the number of base sinusoids (default: (50, 100)).
+    duration_ratio : tuple of float, optional
+        Range of the main interrupt length as a fraction of the signal (default: (0.06, 0.12)).
+    drop, disperse : bool, optional
+        As in `add_main_interrupt` (defaults: False, True).
+    blend_factor : float, optional
+        Blend weight of the base signal inside the interrupt (default: 0.5).
+    max_time_shift : int, optional
+        Circular shift drawn from [-max_time_shift, max_time_shift) (default: 0, none).
+    max_gain_variation : float, optional
+        Gain drawn from [1 - max_gain_variation, 1 + max_gain_variation] (default: 0.0).
+    snr_range : tuple of float, optional
+        SNR range in dB. If None, no noise is planned (default: None).
+    colors : sequence of str, optional
+        Noise colors drawn uniformly, from 'white', 'pink', 'brown', 'blue', 'violet'.
+    noise_funcs : sequence, optional
+        Envelope choices drawn uniformly, e.g. `config.noise_funcs` (None entries mean no
+        modulation). If None, noise is not modulated.
+    mf : tuple of float, optional
+        Range of the signal modulation factor (default: (1.0, 1.0)).
+    seed : int or numpy.random.Generator, optional
+        Seed or generator (default: None, follows numpy's global random state).
+
+    Returns
+    -------
+    SignalPlan
+
+    Example
+    -------
+    >>> plan = plan_batch(10000, np.linspace(0, 1, 1000), EMBEDDED_DEVICE_RANGES, interrupt_ranges,
+    ...                   snr_range=(-10, 20), noise_funcs=noise_funcs, seed=0)
+    >>> cameras = plan[plan.domain_names[plan.samples['domain']] == 'Cameras']
+    >>> noisy = render_plan(cameras)
+    """
+    rng = _get_rng(seed)
+    t = np.asarray(t, dtype=float)
+    N = len(t)
+    catalog = device_ranges if isinstance(device_ranges, DeviceCatalog) else DeviceCatalog(device_ranges)
+
+    samples = np.zeros(n, dtype=PLAN_DTYPE)
+    rows = catalog.sample_rows(n, domain=domain, seed=rng)
+    samples['row'] = rows
+    samples['domain'] = catalog.domains[rows]
+    samples['amp_low'], samples['amp_high'] = catalog.amplitude_bounds[rows].T
+
+    counts = rng.integers(n_sinusoids[0], n_sinusoids[1], size=n, endpoint=True)
+    freq_low, freq_high = catalog.frequency_bounds[rows].T
+    parts = [_draw_sinusoids(rng, counts, samples['amp_low'], samples['amp_high'], freq_low, freq_high)]
+    samples['sin_count'] = counts
+    samples['sin_start'] = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    if interrupt_ranges is not None:
+        interrupts = interrupt_ranges if isinstance(interrupt_ranges, DeviceCatalog) else DeviceCatalog(interrupt_ranges)
+        # Interrupt row with the same device and band as each device row
+        lookup = {(interrupts.domain_names[d], b): r for r, (d, b) in
+                  enumerate(zip(interrupts.domains[:interrupts.rows_per_split], interrupts.band_names))}
+        try:
+            mapping = np.array([lookup[(catalog.domain_names[d], b)] for d, b in
+                                zip(catalog.domains[:catalog.rows_per_split], catalog.band_names)])
+        except KeyError as missing:
+            raise ValueError(f"interrupt_ranges has no entry for device/band {missing.args[0]}.")
+        interrupt_rows = mapping[rows % catalog.rows_per_split]
+
+        samples['has_interrupt'] = True
+        samples['interrupt_amp_low'], samples['interrupt_amp_high'] = interrupts.amplitude_bounds[interrupt_rows].T
+        samples['device_min'] = np.minimum(samples['interrupt_amp_low'], samples['amp_low'])
+        samples['device_max'] = np.maximum(samples['interrupt_amp_high'], samples['amp_high'])
+
+        # Placement as in place_interrupt on an empty signal
+        duration = (rng.uniform(*duration_ratio, size=n) * N).astype(np.int64)
+        start = rng.integers(0, np.maximum(N - duration, 0), endpoint=True)
+        samples['interrupt_start'] = start
+        samples['interrupt_duration'] = np.minimum(N - 1, start + duration) - start
+
+        interrupt_counts = rng.integers(2, 10, size=n, endpoint=True)
+        int_freq_low, int_freq_high = interrupts.frequency_bounds[interrupt_rows].T
+        parts.append(_draw_sinusoids(rng, interrupt_counts, samples['interrupt_amp_low'],
+                                     samples['interrupt_amp_high'], int_freq_low, int_freq_high))
+        samples['interrupt_sin_count'] = interrupt_counts
+        samples['interrupt_sin_start'] = counts.sum() + np.concatenate(([0], np.cumsum(interrupt_counts)[:-1]))
+
+        samples['drop'] = drop
+        samples['disperse'] = disperse
+        samples['drift_u'] = rng.random(n)
+        samples['offset_u'] = rng.random(n)
+        samples['blend'] = blend_factor
+
+    samples['time_shift'] = rng.integers(-max_time_shift, max_time_shift, size=n) if max_time_shift else 0
+    samples['gain'] = rng.uniform(1 - max_gain_variation, 1 + max_gain_variation, size=n)
+
+    samples['snr_db'] = np.nan if snr_range is None else rng.uniform(*snr_range, size=n)
+    samples['color'] = np.array([COLORS.index(c) for c in colors])[rng.integers(0, len(colors), size=n)]
+    samples['envelope'] = -1
+    if noise_funcs is not None:
+        choice = rng.integers(0, len(noise_funcs), size=n)
+        for i, spec in enumerate(noise_funcs):
+            selected = choice == i
+            if spec is None or not selected.any():
+                continue
+            samples['envelope'][selected] = ENVELOPES.index(spec['func'])
+            low, high = spec['param']
+            samples['envelope_param'][selected] = low + (high - low) * rng.random(selected.sum())
+    samples['mf'] = rng.uniform(*mf, size=n)
+    samples['noise_seed'] = rng.integers(0, 2**63, size=n)
+
+    return SignalPlan(samples, np.concatenate(parts), t, catalog.domain_names)
+
+
+def _render_sinusoid_sums(t, sinusoids, starts, counts, amp_low, amp_high, amp_md_min=0.05, amp_md_max=0.95):
+    """
+    `generate_signal` for a batch: sum each row's sinusoids, remove the mean, scale to [-1, 1]
+    and rescale into the row's amplitude range.
+    """
+    # Rows sorted by sinusoid count, so the rows still summing at slot k are a prefix
+    order = np.argsort(-counts, kind='stable')
+    starts, counts = starts[order], counts[order]
+    sums = np.zeros((len(starts), len(t)))
+    buffer = np.empty_like(sums)
+    for k in range(int(counts.max(initial=0))):
+        m = np.count_nonzero(counts > k)
+        s = sinusoids[starts[:m] + k]
+        arg = buffer[:m]
+        np.multiply((2 * np.pi * s['freq'])[:, None], t, out=arg)
+        arg += s['phase'][:, None]
+        np.sin(arg, out=arg)
+        arg *= s['amp'][:, None]
+        sums[:m] += arg
+    out = np.empty_like(sums)
+    out[order] = sums
+
+    out -= out.mean(axis=1, keepdims=True)
+    max_abs = np.max(np.abs(out), axis=1, keepdims=True)
+    if np.any(max_abs == 0):
+        raise ValueError("Generated signal has zero amplitude. Check input parameters.")
+    out /= max_abs
+
+    A_min = np.maximum(amp_low, amp_md_min * amp_low)[:, None]
+    A_max = np.minimum(amp_high, amp_md_max * amp_high)[:, None]
+    return ((out + 1) / 2) * (A_max - A_min) + A_min
+
+
+def _render_interrupts(t, s, sinusoids, waves):
+    """
+    Main interrupts for plan rows `s`, placed into `waves` as `add_main_interrupt` places them.
+    """
+    inter = _render_sinusoid_sums(t, sinusoids, s['interrupt_sin_start'], s['interrupt_sin_count'],
+                                  s['interrupt_amp_low'], s['interrupt_amp_high'])
+    idx = np.arange(len(t))
+    start, duration = s['interrupt_start'][:, None], s['interrupt_duration'][:, None]
+    window = (idx >= start) & (idx < start + duration) & (duration > 1)
+    drop = s['drop'][:, None]
+    device_min, device_max = s['device_min'][:, None], s['device_max'][:, None]
+
+    def window_extrema(x):
+        return (np.where(window, x, np.inf).min(axis=1, keepdims=True),
+                np.where(window, x, -np.inf).max(axis=1, keepdims=True))
+
+    # Rows without a usable window (length <= 1) have infinite extrema but keep the base signal
+    with np.errstate(invalid='ignore'):
+        # Middle-peak drift over each window, as apply_baseline_drift_middle_peak
+        I_min, I_max = window_extrema(inter)
+        allowed = np.where(drop, np.maximum(I_min - device_min, 0), np.maximum(device_max - I_max, 0))
+        min_drift = np.where(drop, device_min, I_max)
+        final = min_drift + s['drift_u'][:, None] * (allowed - min_drift)
+        local_t = (idx - start) / np.maximum(duration - 1, 1)
+        drift = np.where(drop, -final, final) * 4 * local_t * (1 - local_t)
+        inter = np.where(window & s['disperse'][:, None], inter + drift, inter)
+
+        # Offset within the device bounds, as apply_interrupt_modifications
+        I_min, I_max = window_extrema(inter)
+        lower = np.where(drop, device_min - I_min, device_max - I_min)
+        upper = np.where(drop, device_min - I_max, device_max - I_max)
+        offset = np.where(lower > upper, 0.0, lower + s['offset_u'][:, None] * (upper - lower))
+        inter = np.where(drop, inter - offset, inter + offset)
+
+    blend = s['blend'][:, None]
+    return np.where(window, blend * waves + (1 - blend) * inter, waves)
+
+
+def _seeded_bits(seeds, n, stream):
+    """
+    Random 64-bit words of shape (len(seeds), n), computed for all rows at once by hashing
+    (seed, stream, column) with SplitMix64. Each row depends only on its own seed, so a row
+    draws the same values in any subset of a plan.
+    """
+    def mix(z):
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
+
+    golden = 0x9E3779B97F4A7C15
+    keys = mix(np.asarray(seeds, dtype=np.uint64) ^ np.uint64(int(stream) * golden % 2**64))
+    return mix(keys[:, None] + (np.arange(1, n + 1, dtype=np.uint64) * np.uint64(golden))[None, :])
+
+
+def _seeded_uniform(seeds, n, stream):
+    return (_seeded_bits(seeds, n, stream) >> np.uint64(11)) * 2.0 ** -53
+
+
+def _seeded_normal(seeds, n, stream):
+    """
+    Standard normals of shape (len(seeds), n) from `_seeded_bits`, by Box-Muller on the two
+    halves of each word. Computed in float32, which is ample for envelope steps and several
+    times faster for the trigonometric functions.
+    """
+    bits = _seeded_bits(seeds, -(-n // 2), stream)
+    u = ((bits >> np.uint64(40)).astype(np.float32) + np.float32(0.5)) * np.float32(2.0 ** -24)
+    radius = np.sqrt(np.float32(-2.0) * np.log(u))
+    angle = (bits & np.uint64(0xFFFFFF)).astype(np.float32) * np.float32(2.0 * np.pi * 2.0 ** -24)
+    return np.concatenate((radius * np.cos(angle), radius * np.sin(angle)), axis=1)[:, :n]
+
+
+def _render_envelopes(codes, params, N, low, high, seeds):
+    """
+    Noise envelopes on each row's [low, high] range, as the `ENVELOPES` functions compute
+    them, with the random draws of all rows of one envelope type taken in a single batch
+    from the samples' seeds.
+    """
+    env = np.ones((len(codes), N))
+    x = np.arange(N)
+    for code in np.unique(codes[codes >= 0]):
+        rows = np.flatnonzero(codes == code)
+        func = ENVELOPES[code]
+        lo, hi, param = low[rows, None], high[rows, None], params[rows, None]
+        if func is envelope_linear:
+            ramp = np.linspace(0, 1, N)
+            ramp = np.where(param > 0.5, ramp, ramp[::-1])
+            env[rows] = lo + (hi - lo) * ramp
+        elif func is envelope_sine:
+            # Integer shift in [-500, 500), as in envelope_sine
+            shift = np.floor(_seeded_uniform(seeds[rows], 1, code) * 1000) - 500
+            env[rows] = (hi + lo) / 2 + (hi - lo) / 2 * np.sin(2.0 * np.pi * param * (x - shift))
+        elif func is envelope_random_walk:
+            # Time-major, so each step of the loop below works on contiguous rows
+            steps = np.ascontiguousarray((param * _seeded_normal(seeds[rows], N, code)).T)
+            walk = np.empty_like(steps)
+            walk[0] = ((lo + hi) / 2)[:, 0]
+            # Clipping makes every step depend on the previous one; only rows are vectorized
+            for j in range(1, N):
+                np.add(walk[j - 1], steps[j], out=walk[j])
+                np.clip(walk[j], lo[:, 0], hi[:, 0], out=walk[j])
+            env[rows] = walk.T
+        else:
+            # One value per (possibly partial) block, drawn for all rows in one batch
+            block_size = params[rows, None].astype(np.int64)
+            values = lo + (hi - lo) * _seeded_uniform(seeds[rows], -(-N // block_size.min()), code)
+            # Samples per block: block_size, less for the last partial block, 0 past the end
+            counts = np.clip(N - np.arange(values.shape[1]) * block_size, 0, block_size)
+            env[rows] = np.repeat(values.ravel(), counts.ravel()).reshape(len(rows), N)
+    return env
+
+
+def _render_noise(s, waves):
+    n, N = waves.shape
+    rngs = [np.random.default_rng(noise_seed) for noise_seed in s['noise_seed']]
+    white = np.array([rng.standard_normal(N) for rng in rngs]).reshape(n, N)
+
+    spectrum = np.fft.rfft(white, axis=-1)
+    freqs = np.fft.rfftfreq(N)
+    freqs[0] = freqs[1]
+    for code in np.unique(s['color']):
+        rows = s['color'] == code
+        spectrum[rows] *= _spectral_filter(freqs, COLORS[code])
+    noise = np.fft.irfft(spectrum, n=N, axis=-1)
+    noise -= noise.mean(axis=1, keepdims=True)
+    std = noise.std(axis=1, keepdims=True)
+    std[std == 0] = 1
+
+    # Noise power from the SNR as in generate_noise_power
+    noise *= (waves.std(axis=1) * 10 ** (-s['snr_db'] / 20))[:, None] / std
+
+    if np.any(s['envelope'] >= 0):
+        noise *= _render_envelopes(s['envelope'], s['envelope_param'], N, waves.min(axis=1), waves.max(axis=1),
+                                   s['noise_seed'])
+    return noise
+
+
+def render_plan(plan, chunk_size=1024, return_clean=False, out=None):
+    """
+    Synthesize the waveforms described by a `SignalPlan`.
+
+    Samples are rendered in row chunks with batched kernels: sinusoid sums, interrupt
+    windows, shifts and gains are array operations over the whole chunk, and colored noise
+    is shaped with one batched FFT. Each sample's noise comes from its own stored seed, so
+    `render_plan(plan[idx])` equals `render_plan(plan)[idx]`.
+
+    Parameters
+    ----------
+    plan : SignalPlan
+        Plan from `plan_batch` (or a subset of one).
+    chunk_size : int, optional
+        Number of samples rendered at a time (default: 1024).
+    return_clean : bool, optional
+        If True, also return the noise-free variants (default: False).
+    out : numpy.ndarray, optional
+        Array of shape (n, len(t)) receiving the noisy signals, e.g. a numpy.memmap.
+
+    Returns
+    -------
+    noisy : numpy.ndarray
+        Signals of shape (n, len(t)). Equal to the clean variants scaled by `mf` when the plan
+        has no noise.
+    clean : numpy.ndarray
+        Only returned if `return_clean` is True.
+    """
+    t = plan.t
+    n, N = len(plan), len(t)
+    if out is None:
+        out = np.empty((n, N))
+    clean_out = np.empty((n, N)) if return_clean else None
+
+    for start in range(0, n, chunk_size):
+        s = plan.samples[start:start + chunk_size]
+        waves = _render_sinusoid_sums(t, plan.sinusoids, s['sin_start'], s['sin_count'], s['amp_low'], s['amp_high'])
+        if s['has_interrupt'].any():
+            rows = np.flatnonzero(s['has_interrupt'])
+            waves[rows] = _render_interrupts(t, s[rows], plan.sinusoids, waves[rows])
+
+        # Variant: circular time shift, then gain
+        source = (np.arange(N) - s['time_shift'][:, None]) % N
+        waves = np.take_along_axis(waves, source, axis=1) * s['gain'][:, None]
+
+        if clean_out is not None:
+            clean_out[start:start + len(s)] = waves
+        noisy = waves * s['mf'][:, None]
+        noisy_rows = ~np.isnan(s['snr_db'])
+        if noisy_rows.any():
+            noisy[noisy_rows] += _render_noise(s[noisy_rows], waves[noisy_rows])
+        out[start:start + len(s)] = noisy
+
+    if return_clean:
+        return out, clean_out
+    return out
@@ -0,0 +1,350 @@
+import json
+import os
+
+import numpy as np
+
+from SigVarGen.noise import envelopes
+from SigVarGen.noise.envelopes import EnvelopeSpec
+from SigVarGen.utils import DeviceCatalog
+
+ENVELOPE_FUNCS = {
+    'envelope_linear': envelopes.envelope_linear,
+    'envelope_sine': envelopes.envelope_sine,
+    'envelope_random_walk': envelopes.envelope_random_walk,
+    'envelope_blockwise': envelopes.envelope_blockwise,
+}
+
+_SWEEP_BUILDERS = {'linspace': np.linspace, 'arange': np.arange}
+
+
+class Scenario:
+    """
+    Validated generation settings, precompiled for the generator.
+
+    Created by `load_scenario`. Device and interrupt tables keep the nested-dict format used by
+    `EMBEDDED_DEVICE_RANGES` (with tuple ranges), and are also compiled into `DeviceCatalog`
+    objects for vectorized sampling. Levels are (k, 2) arrays, sweeps are arrays, and noise
+    envelopes are immutable `EnvelopeSpec` objects, so a scenario can be shared read-only
+    between workers.
+
+    Attributes
+    ----------
+    fs : float or None
+        Sampling frequency used for the Nyquist check.
+    split_ratios : tuple of float
+        Ratios used to compile the catalogs.
+    device_ranges, interrupt_ranges : dict
+        Device tables in the `generate_device_parameters` format.
+    device_catalog, interrupt_catalog : DeviceCatalog or None
+        Compiled tables (None if the table is absent).
+    param_sweeps : dict
+        {device: {transformation: numpy.ndarray}}.
+    npw_levels, mf_levels : numpy.ndarray
+        (k, 2) arrays of level ranges.
+    noise_funcs : tuple
+        None or `EnvelopeSpec` entries, like `config.noise_funcs`.
+    """
+
+    def __init__(self, fs, split_ratios, device_ranges, interrupt_ranges, param_sweeps,
+                 npw_levels, mf_levels, noise_funcs):
+        self.fs = fs
+        self.split_ratios = split_ratios
+        self.device_ranges = device_ranges
+        self.interrupt_ranges = interrupt_ranges
+        self.param_sweeps = param_sweeps
+        self.npw_levels = npw_levels
+        self.mf_levels = mf_levels
+        self.noise_funcs = noise_funcs
+        self.device_catalog = DeviceCatalog(device_ranges, split_ratios) if device_ranges else None
+        self.interrupt_catalog = DeviceCatalog(interrupt_ranges, split_ratios) if interrupt_ranges else None
+
+    def __repr__(self):
+        return (f"Scenario(fs={self.fs}, devices={len(self.device_ranges)}, "
+                f"interrupts={len(self.interrupt_ranges)}, split_ratios={self.split_ratios})")
+
+
+def _read(source):
+    if isinstance(source, dict):
+        return source
+    path = os.fspath(source)
+    if path.endswith('.toml'):
+        try:
+            import tomllib
+        except ImportError:  # Python < 3.11
+            try:
+                import tomli as tomllib
+            except ImportError:
+                raise ImportError("Reading TOML scenarios requires Python 3.11+ or the 'tomli' package.")
+        with open(path, 'rb') as f:
+            return tomllib.load(f)
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _collect_ranges(table, prefix, errors):
+    """
+    Flatten a device table into labels, kinds and bounds, recording structural problems.
+    """
+    labels, kinds, bounds = [], [], []
+
+    def add(label, kind, value):
+        if isinstance(value, (list, tuple)) and len(value) == 2:
+            labels.append(label)
+            kinds.append(kind)
+            bounds.append(value)
+        else:
+            errors.append(f"{label}: expected a [low, high] range, got {value!r}")
+
+    if not isinstance(table, dict):
+        errors.append(f"{prefix}: expected a table of devices")
+        return labels, kinds, bounds
+
+    for device, params in table.items():
+        if not isinstance(params, dict) or 'amplitude' not in params:
+            errors.append(f"{prefix}.{device}: missing 'amplitude'")
+            continue
+        add(f"{prefix}.{device}.amplitude", 'amplitude', params['amplitude'])
+        frequency = params.get('frequency')
+        if isinstance(frequency, dict):
+            for band, value in frequency.items():
+                add(f"{prefix}.{device}.frequency.{band}", 'frequency', value)
+        elif frequency is not None:
+            add(f"{prefix}.{device}.frequency", 'frequency', frequency)
+    return labels, kinds, bounds
+
+
+def _check_ranges(labels, bounds, errors, nonnegative=False, upper=None, upper_name=None):
+    """
+    Validate all (low, high) ranges at once.
+    """
+    if not labels:
+        return
+    try:
+        bounds = np.asarray(bounds, dtype=float).reshape(-1, 2)
+    except (TypeError, ValueError):
+        errors.extend(f"{label}: bounds must be numbers" for label in labels)
+        return
+
+    finite = np.isfinite(bounds).all(axis=1)
+    checks = [(~finite, "bounds must be finite"),
+              (finite & (bounds[:, 0] > bounds[:, 1]), "low bound exceeds high bound")]
+    if nonnegative:
+        checks.append((finite & (bounds[:, 0] < 0), "bounds must be non-negative"))
+    if upper is not None:
+        checks.append((finite & (bounds[:, 1] > upper), f"exceeds {upper_name} ({upper:g})"))
+
+    labels = np.asarray(labels, dtype=object)
+    for failed, message in checks:
+        errors.extend(f"{label}: {message}" for label in labels[failed])
+
+
+def _compile_table(table):
+    compiled = {}
+    for device, params in table.items():
+        entry = {'amplitude': tuple(params['amplitude'])}
+        frequency = params.get('frequency')
+        if isinstance(frequency, dict):
+            entry['frequency'] = {band: tuple(value) for band, value in frequency.items()}
+        elif frequency is not None:
+            entry['frequency'] = tuple(frequency)
+        compiled[device] = entry
+    return compiled
+
+
+def _is_number(value):
+    """
+    True for a real number; bools are rejected even though they are ints.
+    """
+    return isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, (bool, np.bool_))
+
+
+def _build_sweep(kind, args, label):
+    """
+    Call a sweep builder after checking its arguments, raising ValueError with the problem.
+    """
+    if kind not in _SWEEP_BUILDERS:
+        raise ValueError(f"{label}: unknown sweep '{kind}', expected 'linspace' or 'arange'")
+    if not isinstance(args, (list, tuple)) or not 2 <= len(args) <= 3 or not all(_is_number(a) for a in args):
+        raise ValueError(f"{label}: {kind} expects [start, stop, {'num' if kind == 'linspace' else 'step'}] numbers")
+    if not np.all(np.isfinite(args)):
+        raise ValueError(f"{label}: {kind} arguments must be finite")
+    if kind == 'arange' and len(args) == 3 and args[2] == 0:
+        raise ValueError(f"{label}: arange step must be non-zero")
+    if kind == 'linspace' and len(args) == 3 and (int(args[2]) != args[2] or args[2] <= 0):
+        raise ValueError(f"{label}: linspace num must be a positive integer")
+    if kind == 'linspace' and len(args) == 3:
+        args = (args[0], args[1], int(args[2]))
+    return _SWEEP_BUILDERS[kind](*args)
+
+
+def _compile_sweeps(sweeps, errors):
+    compiled = {}
+    if not isinstance(sweeps, dict):
+        errors.append("param_sweeps: expected a table of devices")
+        return compiled
+
+    for device, device_sweeps in sweeps.items():
+        if not isinstance(device_sweeps, dict):
+            errors.append(f"param_sweeps.{device}: expected a table of transformations")
+            continue
+        compiled[device] = {}
+        for name, spec in device_sweeps.items():
+            label = f"param_sweeps.{device}.{name}"
+            if isinstance(spec, dict) and len(spec) == 1:
+                (kind, args), = spec.items()
+                try:
+                    values = _build_sweep(kind, args, label)
+                except ValueError as e:
+                    errors.append(str(e))
+                    continue
+            elif isinstance(spec, np.ndarray) and spec.dtype.kind in 'iuf':
+                values = spec.astype(float)
+            elif isinstance(spec, (list, tuple)) and all(_is_number(v) for v in spec):
+                values = np.asarray(spec, dtype=float)
+            else:
+                errors.append(f"{label}: expected a list of values or {{'linspace'|'arange': [start, stop, num|step]}}")
+                continue
+            if values.ndim != 1 or values.size == 0 or not np.all(np.isfinite(values)):
+                errors.append(f"{label}: must be a non-empty list of finite values")
+                continue
+            compiled[device][name] = values
+    return compiled
+
+
+def _is_range(value):
+    """
+    True for a [low, high] pair of real numbers.
+    """
+    return (isinstance(value, (list, tuple)) and len(value) == 2
+            and all(isinstance(v, (int, float)) for v in value))
+
+
+def _compile_levels(levels, name, errors):
+    if not isinstance(levels, (list, tuple)):
+        errors.append(f"{name}: expected a list of [low, high] ranges")
+        return None
+    malformed = [i for i, level in enumerate(levels) if not _is_range(level)]
+    if malformed:
+        errors.extend(f"{name}[{i}]: expected a [low, high] range of numbers" for i in malformed)
+        return None
+    labels = [f"{name}[{i}]" for i in range(len(levels))]
+    before = len(errors)
+    _check_ranges(labels, levels, errors, nonnegative=True)
+    if len(errors) > before:
+        return None
+    return np.asarray(levels, dtype=float).reshape(-1, 2)
+
+
+def _compile_envelopes(entries, errors):
+    compiled = []
+    if not isinstance(entries, (list, tuple)):
+        errors.append("noise_envelopes: expected a list of envelopes")
+        return tuple(compiled)
+    for i, entry in enumerate(entries):
+        if entry is None or entry == 'none':
+            compiled.append(None)
+            continue
+        label = f"noise_envelopes[{i}]"
+        func = ENVELOPE_FUNCS.get(entry.get('func') if isinstance(entry, dict) else None)
+        if func is None:
+            errors.append(f"{label}: 'func' must be one of {sorted(ENVELOPE_FUNCS)}")
+            continue
+        param = entry.get('param')
+        if not _is_range(param) or not np.all(np.isfinite(param)):
+            errors.append(f"{label}: 'param' must be a [low, high] range of finite numbers")
+            continue
+        compiled.append(EnvelopeSpec(func, tuple(param)))
+    return tuple(compiled)
+
+
+def load_scenario(source, fs=None):
+    """
+    Load, validate and precompile a generation scenario from a JSON or TOML file.
+
+    The scenario may define any of the following keys; missing ones default to empty:
+
+    - `fs`: sampling frequency. If set (or passed as `fs`), every frequency must lie in
+      [0, fs / 2].
+    - `split_ratios`: positive ratios summing to 1 (default: [0.5, 0.5]).
+    - `device_ranges`, `interrupt_ranges`: tables in the `EMBEDDED_DEVICE_RANGES` format,
+      with [low, high] lists for ranges. Every interrupt device must also be a device.
+    - `param_sweeps`: {device: {name: [values...] or {"linspace": [start, stop, num]} or
+      {"arange": [start, stop, step]}}}.
+    - `npw_levels`, `mf_levels`: lists of non-negative [low, high] ranges.
+    - `noise_envelopes`: list of null (or "none", as TOML has no null) or
+      {"func": "envelope_sine", "param": [low, high]}.
+
+    All ranges are checked together with array operations, and every problem found is
+    reported at once, so a bad file fails immediately instead of partway through a run.
+
+    Parameters
+    ----------
+    source : str, os.PathLike or dict
+        Path to a `.json` or `.toml` file, or an already parsed dict.
+    fs : float, optional
+        Sampling frequency for the Nyquist check; overrides the file's `fs`.
+
+    Returns
+    -------
+    Scenario
+        Validated settings with compiled `DeviceCatalog` tables, array levels and sweeps,
+        and `EnvelopeSpec` noise envelopes.
+
+    Raises
+    ------
+    ValueError
+        If the scenario is invalid; the message lists every problem found.
+
+    Example
+    -------
+    >>> scenario = load_scenario('scenarios/drones.toml')
+    >>> domains, bands, amplitudes, frequencies = scenario.device_catalog.sample(1000, split=0)
+    """
+    data = _read(source)
+    errors = []
+
+    unknown = set(data) - {'fs', 'split_ratios', 'device_ranges', 'interrupt_ranges', 'param_sweeps',
+                           'npw_levels', 'mf_levels', 'noise_envelopes'}
+    errors.extend(f"{key}: unknown key" for key in sorted(unknown))
+
+    fs = data.get('fs') if fs is None else fs
+    if fs is not None and not (_is_number(fs) and np.isfinite(fs) and fs > 0):
+        errors.append(f"fs: must be a positive number, got {fs!r}")
+        fs = None
+
+    split_ratios = data.get('split_ratios', [0.5, 0.5])
+    if isinstance(split_ratios, (list, tuple)) and all(_is_number(r) for r in split_ratios):
+        ratios = np.asarray(split_ratios, dtype=float)
+    else:
+        ratios = np.array([np.nan])
+    if ratios.size == 0 or not np.all(np.isfinite(ratios)) or np.any(ratios <= 0) or not np.isclose(ratios.sum(), 1.0):
+        errors.append(f"split_ratios: must be positive numbers summing to 1.0, got {split_ratios!r}")
+
+    device_ranges = data.get('device_ranges', {})
+    interrupt_ranges = data.get('interrupt_ranges', {})
+    labels, kinds, bounds = _collect_ranges(device_ranges, 'device_ranges', errors)
+    for collected, values in zip((labels, kinds, bounds), _collect_ranges(interrupt_ranges, 'interrupt_ranges', errors)):
+        collected.extend(values)
+
+    is_frequency = [kind == 'frequency' for kind in kinds]
+    _check_ranges([l for l, f in zip(labels, is_frequency) if not f],
+                  [b for b, f in zip(bounds, is_frequency) if not f], errors)
+    _check_ranges([l for l, f in zip(labels, is_frequency) if f],
+                  [b for b, f in zip(bounds, is_frequency) if f], errors, nonnegative=True,
+                  upper=None if fs is None else fs / 2, upper_name="the Nyquist frequency")
+
+    if isinstance(device_ranges, dict) and isinstance(interrupt_ranges, dict):
+        errors.extend(f"interrupt_ranges.{device}: not defined in device_ranges"
+                      for device in interrupt_ranges if device not in device_ranges)
+
+    param_sweeps = _compile_sweeps(data.get('param_sweeps', {}), errors)
+    npw_levels = _compile_levels(data.get('npw_levels', []), 'npw_levels', errors)
+    mf_levels = _compile_levels(data.get('mf_levels', []), 'mf_levels', errors)
+    noise_funcs = _compile_envelopes(data.get('noise_envelopes', [None]), errors)
+
+    if errors:
+        raise ValueError("Invalid scenario:\n  " + "\n  ".join(errors))
+
+    return Scenario(fs=fs, split_ratios=tuple(ratios.tolist()),
+                    device_ranges=_compile_table(device_ranges), interrupt_ranges=_compile_table(interrupt_ranges),
+                    param_sweeps=param_sweeps, npw_levels=npw_levels, mf_levels=mf_levels, noise_funcs=noise_funcs)
@@ -1,10 +1,33 @@
-from .response_signals import (get_non_overlapping_interval, place_interrupt, apply_interrupt_modifications,
-                                blend_signal, generate_main_interrupt, add_complexity_to_inter,
-                                add_main_interrupt, add_smaller_interrupts, add_interrupt_with_params, add_interrupt_bursts)
-from .periodic_interrupts import (generate_semi_periodic_signal, add_periodic_interrupts)
-from .signal_generation import generate_signal
+import importlib
+
+# Public names and the submodule defining them, imported on first access (PEP 562)
+_LAZY_ATTRS = {
+    **dict.fromkeys(['get_non_overlapping_interval', 'place_interrupt', 'apply_interrupt_modifications',
+                     'blend_signal', 'generate_main_interrupt', 'add_complexity_to_inter',
+                     'add_main_interrupt', 'add_smaller_interrupts', 'add_interrupt_with_params',
+                     'add_interrupt_bursts'], 'response_signals'),
+    **dict.fromkeys(['generate_semi_periodic_signal', 'generate_semi_periodic_signals',
+                     'unpack_semi_periodic_signals', 'add_periodic_interrupts',
+                     'generate_semi_periodic_rle', 'signal_to_rle', 'rle_to_signal',
+                     'add_periodic_interrupts_rle'], 'periodic_interrupts'),
+    'generate_signal': 'signal_generation',
+    **dict.fromkeys(['InterruptLabels', 'interrupt_mask'], 'interrupt_labels'),
+}
 
 __all__ = ['get_non_overlapping_interval', 'place_interrupt', 'apply_interrupt_modifications', 
             'blend_signal', 'generate_main_interrupt', 'add_complexity_to_inter',
             'add_main_interrupt', 'add_smaller_interrupts', 'add_interrupt_with_params', 'add_interrupt_bursts',
-            'generate_semi_periodic_signal', 'add_periodic_interrupts', 'generate_signal']
\ No newline at end of file
+            'generate_semi_periodic_signal', 'generate_semi_periodic_signals',
+            'unpack_semi_periodic_signals', 'add_periodic_interrupts',
+            'generate_semi_periodic_rle', 'signal_to_rle', 'rle_to_signal', 'add_periodic_interrupts_rle', 'generate_signal',
+            'InterruptLabels', 'interrupt_mask']
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(f'.{_LAZY_ATTRS[name]}', __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,274 @@
+import numpy as np
+
+# Codes of the `type` column; names match the 'type' entries of interrupt parameter dicts
+INTERRUPT_TYPES = ('main', 'main_overlapping', 'small', 'burst')
+
+SINUSOID_DTYPE = np.dtype([('amp', np.float64), ('freq', np.float64), ('phase', np.float64)])
+
+_COLUMNS = ('sample', 'start_idx', 'duration_idx', 'offset', 'type', 'sinusoid_set')
+
+MASK_FORMATS = ('codes', 'packed')
+
+
+def _interval_masks(sample, start_idx, end_idx, types, n_samples, length, mask_format):
+    """
+    Masks of (sample, type) intervals via difference arrays: +1 at each start, -1 at each end,
+    then one cumulative sum per row, O(N + k) per sample and type.
+    """
+    if mask_format not in MASK_FORMATS:
+        raise ValueError(f"mask_format must be one of {MASK_FORMATS}, got {mask_format!r}.")
+    n_types = len(INTERRUPT_TYPES)
+    diff = np.zeros((n_samples, n_types, length + 1), dtype=np.int32)
+    np.add.at(diff, (sample, types, np.clip(start_idx, 0, length)), 1)
+    np.add.at(diff, (sample, types, np.clip(end_idx, 0, length)), -1)
+    active = np.cumsum(diff[..., :length], axis=-1) > 0
+
+    if mask_format == 'packed':
+        return np.packbits(active, axis=-1)
+    # Class code 1 + type index, later types winning where interrupts overlap
+    codes = np.arange(1, n_types + 1, dtype=np.uint8)[:, None]
+    return np.max(active * codes, axis=1)
+
+
+def interrupt_mask(start_idx, duration_idx, types, length, mask_format='codes'):
+    """
+    Ground-truth mask of the samples covered by interrupts of one signal.
+
+    Parameters
+    ----------
+    start_idx, duration_idx : array-like of int
+        Interrupt positions and lengths in samples.
+    types : array-like of str or int
+        Interrupt types, as names or codes into `INTERRUPT_TYPES`.
+    length : int
+        Signal length.
+    mask_format : {'codes', 'packed'}, optional
+        'codes' returns one uint8 class per sample: 0 for untouched samples, otherwise
+        1 + the type code, later types in `INTERRUPT_TYPES` taking precedence where
+        interrupts overlap. 'packed' returns one `np.packbits` bitset per type, of shape
+        (len(INTERRUPT_TYPES), ceil(length / 8)) (default: 'codes').
+
+    Returns
+    -------
+    numpy.ndarray
+        The mask, dtype uint8.
+
+    Example
+    -------
+    >>> interrupt_mask([2, 4], [5, 2], ['main', 'main_overlapping'], 10)
+    array([0, 0, 1, 1, 2, 2, 1, 0, 0, 0], dtype=uint8)
+    """
+    types = np.asarray(types)
+    if types.dtype.kind in 'US':
+        types = np.array([INTERRUPT_TYPES.index(name) for name in types], dtype=np.intp)
+    start_idx = np.asarray(start_idx, dtype=np.int64)
+    end_idx = start_idx + np.asarray(duration_idx, dtype=np.int64)
+    return _interval_masks(np.zeros(len(start_idx), dtype=np.intp), start_idx, end_idx,
+                           types.astype(np.intp), 1, length, mask_format)[0]
+
+
+def _params_mask(interrupt_params, length, mask_format):
+    """
+    `interrupt_mask` of a list of interrupt parameter dicts.
+    """
+    return interrupt_mask([p['start_idx'] for p in interrupt_params], [p['duration_idx'] for p in interrupt_params],
+                          [INTERRUPT_TYPES.index(p['type']) for p in interrupt_params], length, mask_format)
+
+
+class InterruptLabels:
+    """
+    Columnar interrupt labels for one or many signals.
+
+    Holds the same information as the list of dicts returned by `add_interrupt_with_params`,
+    as one fixed-width array per field plus a ragged store for sinusoid parameters. Sinusoid
+    lists shared between interrupts (a main interrupt and its overlapping parts) are stored
+    once. All state is plain numpy arrays, so labels pickle with protocol 5 out-of-band
+    buffers, save as `.npz`, and convert to DataFrame columns without copies.
+
+    Attributes
+    ----------
+    sample : numpy.ndarray
+        Index of the signal each interrupt belongs to (int64).
+    start_idx, duration_idx : numpy.ndarray
+        Interrupt position and length in samples (int64).
+    offset : numpy.ndarray
+        Applied offset (float64).
+    type : numpy.ndarray
+        Code into `INTERRUPT_TYPES` (uint8).
+    sinusoid_set : numpy.ndarray
+        Index of the interrupt's sinusoid set, -1 if none (int64).
+    set_offsets : numpy.ndarray
+        Set `i` is `sinusoids[set_offsets[i]:set_offsets[i + 1]]` (int64).
+    sinusoids : numpy.ndarray
+        `SINUSOID_DTYPE` records (amp, freq, phase) of all sets.
+    n_samples : int
+        Number of signals described (signals without interrupts included).
+    """
+
+    def __init__(self, sample, start_idx, duration_idx, offset, type, sinusoid_set, set_offsets, sinusoids,
+                 n_samples=None):
+        self.sample = np.asarray(sample, dtype=np.int64)
+        self.start_idx = np.asarray(start_idx, dtype=np.int64)
+        self.duration_idx = np.asarray(duration_idx, dtype=np.int64)
+        self.offset = np.asarray(offset, dtype=np.float64)
+        self.type = np.asarray(type, dtype=np.uint8)
+        self.sinusoid_set = np.asarray(sinusoid_set, dtype=np.int64)
+        self.set_offsets = np.asarray(set_offsets, dtype=np.int64)
+        self.sinusoids = np.asarray(sinusoids, dtype=SINUSOID_DTYPE)
+        if n_samples is None:
+            n_samples = int(self.sample.max()) + 1 if len(self.sample) else 0
+        self.n_samples = int(n_samples)
+
+    def __len__(self):
+        return len(self.start_idx)
+
+    def __repr__(self):
+        return f"InterruptLabels(n_samples={self.n_samples}, interrupts={len(self)}, sinusoids={len(self.sinusoids)})"
+
+    @property
+    def end_idx(self):
+        return self.start_idx + self.duration_idx
+
+    @property
+    def type_names(self):
+        """
+        Type names per interrupt, as in the 'type' entries of parameter dicts.
+        """
+        return np.asarray(INTERRUPT_TYPES)[self.type]
+
+    @classmethod
+    def from_params(cls, interrupt_params, sample=0):
+        """
+        Build labels from a list of interrupt parameter dicts of one signal.
+
+        Parameters
+        ----------
+        interrupt_params : list of dict
+            Dicts with 'start_idx', 'duration_idx', 'offset', 'type' and optionally
+            'sinusoids_params', as returned by `add_interrupt_with_params`.
+        sample : int, optional
+            Sample index stored in the `sample` column (default: 0).
+
+        Returns
+        -------
+        InterruptLabels
+        """
+        set_index, sets = {}, []
+        sinusoid_set = []
+        for params in interrupt_params:
+            sinusoids = params.get('sinusoids_params')
+            if sinusoids is None:
+                sinusoid_set.append(-1)
+                continue
+            # Lists shared by reference (main and main_overlapping) are stored once
+            if id(sinusoids) not in set_index:
+                set_index[id(sinusoids)] = len(sets)
+                sets.append(sinusoids)
+            sinusoid_set.append(set_index[id(sinusoids)])
+
+        counts = [len(s) for s in sets]
+        records = [(p['amp'], p['freq'], p['phase']) for s in sets for p in s]
+        return cls(
+            sample=np.full(len(interrupt_params), sample),
+            start_idx=[p['start_idx'] for p in interrupt_params],
+            duration_idx=[p['duration_idx'] for p in interrupt_params],
+            offset=[p['offset'] for p in interrupt_params],
+            type=[INTERRUPT_TYPES.index(p['type']) for p in interrupt_params],
+            sinusoid_set=sinusoid_set,
+            set_offsets=np.concatenate(([0], np.cumsum(counts, dtype=np.int64))),
+            sinusoids=np.array(records, dtype=SINUSOID_DTYPE),
+            n_samples=sample + 1,
+        )
+
+    @classmethod
+    def concatenate(cls, labels):
+        """
+        Stack labels of consecutive signals; sample indices and sinusoid sets are renumbered.
+        """
+        labels = list(labels)
+        sample_shift = np.cumsum([0] + [l.n_samples for l in labels])
+        set_shift = np.cumsum([0] + [len(l.set_offsets) - 1 for l in labels])
+        value_shift = np.cumsum([0] + [len(l.sinusoids) for l in labels])
+        return cls(
+            sample=np.concatenate([l.sample + s for l, s in zip(labels, sample_shift)] + [np.empty(0, np.int64)]),
+            start_idx=np.concatenate([l.start_idx for l in labels] + [np.empty(0, np.int64)]),
+            duration_idx=np.concatenate([l.duration_idx for l in labels] + [np.empty(0, np.int64)]),
+            offset=np.concatenate([l.offset for l in labels] + [np.empty(0)]),
+            type=np.concatenate([l.type for l in labels] + [np.empty(0, np.uint8)]),
+            sinusoid_set=np.concatenate([np.where(l.sinusoid_set >= 0, l.sinusoid_set + s, -1)
+                                         for l, s in zip(labels, set_shift)] + [np.empty(0, np.int64)]),
+            set_offsets=np.concatenate([[0]] + [l.set_offsets[1:] + s for l, s in zip(labels, value_shift)]),
+            sinusoids=np.concatenate([l.sinusoids for l in labels] + [np.empty(0, SINUSOID_DTYPE)]),
+            n_samples=sample_shift[-1],
+        )
+
+    def sinusoids_of(self, i):
+        """
+        Sinusoid records (a view) of interrupt `i`; empty if it has none.
+        """
+        k = self.sinusoid_set[i]
+        if k < 0:
+            return self.sinusoids[:0]
+        return self.sinusoids[self.set_offsets[k]:self.set_offsets[k + 1]]
+
+    def to_params(self, sample=0):
+        """
+        Rebuild the list of parameter dicts of one signal. Interrupts sharing a sinusoid set
+        share one list object, as in the original output.
+        """
+        lists = {}
+        params = []
+        for i in np.flatnonzero(self.sample == sample):
+            k = int(self.sinusoid_set[i])
+            if k not in lists:
+                lists[k] = None if k < 0 else [
+                    {'amp': amp, 'freq': freq, 'phase': phase} for amp, freq, phase in self.sinusoids_of(i).tolist()
+                ]
+            params.append({
+                'start_idx': int(self.start_idx[i]),
+                'duration_idx': int(self.duration_idx[i]),
+                'offset': float(self.offset[i]),
+                'sinusoids_params': lists[k],
+                'type': INTERRUPT_TYPES[self.type[i]],
+            })
+        return params
+
+    def masks(self, length, mask_format='codes'):
+        """
+        Ground-truth masks of all samples in one pass, as `interrupt_mask` computes them.
+
+        Returns an array of shape (n_samples, length) for 'codes' or
+        (n_samples, len(INTERRUPT_TYPES), ceil(length / 8)) for 'packed'.
+        """
+        return _interval_masks(self.sample, self.start_idx, self.end_idx, self.type.astype(np.intp),
+                               self.n_samples, length, mask_format)
+
+    def to_dict(self):
+        """
+        All columns and the ragged store as a dict of arrays (no copies).
+        """
+        arrays = {name: getattr(self, name) for name in _COLUMNS}
+        arrays.update(set_offsets=self.set_offsets, sinusoids=self.sinusoids, n_samples=np.int64(self.n_samples))
+        return arrays
+
+    @classmethod
+    def from_dict(cls, arrays):
+        return cls(**{name: arrays[name] for name in _COLUMNS + ('set_offsets', 'sinusoids')},
+                   n_samples=int(arrays['n_samples']))
+
+    def __reduce__(self):
+        return (self.__class__.from_dict, (self.to_dict(),))
+
+    def save(self, path):
+        """
+        Write the labels to an uncompressed `.npz` file.
+        """
+        np.savez(path, **self.to_dict())
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read labels written by `save`.
+        """
+        with np.load(path) as data:
+            return cls.from_dict(data)
@@ -1,9 +1,25 @@
 import numpy as np
-import random
 
-#from SigVarGen.utils import interpoling
+from SigVarGen.utils import _get_rng, _concat_ranges
 
-def generate_semi_periodic_signal(length=450, base_pattern=None, flip_probability=0.1, seed=None):
+# Flip rate below which flip positions are drawn sparsely instead of testing every sample
+SPARSE_FLIP_THRESHOLD = 0.15
+
+def _flip_positions(length, flip_probability, rng, sparse=None):
+    """
+    Draw the indices of flipped bits, each of `length` bits flipping with `flip_probability`.
+
+    The sparse mode draws geometric gaps between flips (see `_batch_flip_positions`), costing
+    O(p·N) instead of one uniform draw per sample.
+    """
+    if sparse is None:
+        sparse = flip_probability < SPARSE_FLIP_THRESHOLD
+
+    if sparse:
+        return _batch_flip_positions(length, np.array([flip_probability], dtype=float), rng)[1]
+    return np.flatnonzero(rng.random(length) < flip_probability)
+
+def generate_semi_periodic_signal(length=450, base_pattern=None, flip_probability=0.1, seed=None, sparse=None):
 
     """
     Generate a semi-periodic digital signal with optional bit-flipping noise.
@@ -19,8 +35,13 @@ def generate_semi_periodic_signal(length=450, base_pattern=None, flip_probabilit
         A binary list representing the repeating base pattern. If None, defaults to `[0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1]`.
     flip_probability : float, optional
         The probability of flipping each bit in the signal (default: 0.1).
-    seed : int, optional
-        Seed for random number generator to ensure reproducibility (default: None).
+    seed : int or numpy.random.Generator, optional
+        Seed for a local random number generator to ensure reproducibility (default: None).
+        The global numpy random state is not reseeded.
+    sparse : bool, optional
+        If True, flip positions are drawn from geometric gaps between flips (O(p·N)).
+        If False, every sample is compared with `flip_probability` (O(N)). If None, the sparse
+        mode is used for flip probabilities below `SPARSE_FLIP_THRESHOLD` (default: None).
 
     Returns:
     -------
@@ -42,9 +63,8 @@ def generate_semi_periodic_signal(length=450, base_pattern=None, flip_probabilit
     if base_pattern is None:
         base_pattern = [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1]
 
-    if seed is not None:
-        np.random.seed(seed)
-        
+    rng = _get_rng(seed)
+
     base_pattern = np.array(base_pattern, dtype=int)
     pattern_length = len(base_pattern)
     
@@ -52,13 +72,140 @@ def generate_semi_periodic_signal(length=450, base_pattern=None, flip_probabilit
     signal = np.tile(base_pattern, repeats_needed)[:length]
     
     # Introduce random flips (bits of 0 changed to 1 or vice versa)
-    random_flips = np.random.rand(length) < flip_probability
-    # Flip the bits where random_flips is True
+    random_flips = _flip_positions(length, flip_probability, rng, sparse)
+    # Flip the bits at the drawn positions
     signal[random_flips] = 1 - signal[random_flips]
     
-    return signal #np.array([round(i) for i in interpoling(signal, target_len=length)])
+    return signal
 
-def add_periodic_interrupts(base_signal, amplitude_range, inter_sig, start_idx, duration_idx, length=450, base_pattern=None, base_pattern_2=None, flip_probability=0.1, flip_probability_2=0.1, offset=0):
+def _batch_flip_positions(length, flip_probabilities, rng):
+    """
+    Sparse flip positions for a batch of rows, each with its own flip probability.
+
+    Gaps between flips of a Bernoulli(p) process are geometric, so positions are cumulative
+    sums of geometric draws. All rows are drawn together, topping up rows that have not yet
+    reached `length`. Returns (rows, cols) index arrays.
+    """
+    last = np.full(len(flip_probabilities), -1, dtype=np.int64)
+    active = np.flatnonzero(flip_probabilities > 0)
+    rows, cols = [], []
+
+    while active.size:
+        p = flip_probabilities[active]
+        expected = (length - 1 - last[active]) * p
+        width = int(np.max(np.ceil(expected + 6 * np.sqrt(expected) + 8)))
+
+        positions = last[active, None] + np.cumsum(rng.geometric(p[:, None], size=(active.size, width)), axis=1)
+        valid = positions < length
+        rows.append(np.repeat(active, valid.sum(axis=1)))
+        cols.append(positions[valid])
+
+        last[active] = positions[:, -1]
+        active = active[positions[:, -1] < length - 1]
+
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    return np.concatenate(rows), np.concatenate(cols)
+
+def generate_semi_periodic_signals(n, length=450, base_patterns=None, flip_probabilities=0.1, seed=None, sparse=None, packed=False):
+
+    """
+    Generate a batch of semi-periodic digital signals, each with its own pattern and flip probability.
+
+    Batched counterpart of `generate_semi_periodic_signal`. A shared pattern is expanded with one
+    `np.tile`, per-row patterns with one column gather per distinct pattern length, and flips are
+    applied to all rows at once.
+
+    Parameters:
+    ----------
+    n : int
+        Number of signals to generate.
+    length : int, optional
+        The length of each generated signal (default: 450).
+    base_patterns : list of int or list of lists of int, optional
+        A single binary pattern shared by all rows, or one pattern per row (patterns may have
+        different lengths). If None, defaults to `[0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1]`.
+    flip_probabilities : float or array-like, optional
+        Flip probability shared by all rows, or one per row (default: 0.1).
+    seed : int or numpy.random.Generator, optional
+        Seed for a local random number generator (default: None).
+    sparse : bool, optional
+        If True, flip positions are drawn from geometric gaps (O(p·N) per row). If False, every
+        sample is compared with its row's flip probability. If None, the sparse mode is used when
+        the mean flip probability is below `SPARSE_FLIP_THRESHOLD` (default: None).
+    packed : bool, optional
+        If True, return the signals bit-packed along the last axis with `np.packbits`
+        (uint8, 8× smaller). Use `unpack_semi_periodic_signals` to restore them (default: False).
+
+    Returns:
+    -------
+    numpy.ndarray
+        Array of shape (n, length) with values 0/1 (dtype uint8), or (n, ceil(length / 8))
+        packed bytes if `packed` is True.
+
+    Example:
+    -------
+    >>> signals = generate_semi_periodic_signals(1000, length=10000,
+    ...                                          base_patterns=[[0, 1], [0, 0, 1]] * 500,
+    ...                                          flip_probabilities=np.linspace(0, 0.1, 1000))
+    >>> packed = generate_semi_periodic_signals(1000, length=10000, packed=True)
+    """
+
+    if base_patterns is None:
+        base_patterns = [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1]
+
+    rng = _get_rng(seed)
+
+    # A flat list of ints is one shared pattern, otherwise one pattern per row
+    if np.ndim(base_patterns[0]) == 0:
+        signals = np.tile(np.asarray(base_patterns, dtype=np.uint8), (n, length // len(base_patterns) + 1))[:, :length]
+    elif len(base_patterns) != n:
+        raise ValueError("base_patterns must be a single pattern or contain one pattern per signal.")
+    else:
+        pattern_lengths = np.array([len(pattern) for pattern in base_patterns])
+        patterns = np.zeros((n, pattern_lengths.max()), dtype=np.uint8)
+        for i, pattern in enumerate(base_patterns):
+            patterns[i, :len(pattern)] = pattern
+
+        # Expand all rows sharing a pattern length with one column gather
+        signals = np.empty((n, length), dtype=np.uint8)
+        for pattern_length in np.unique(pattern_lengths):
+            rows = np.flatnonzero(pattern_lengths == pattern_length)
+            signals[rows] = patterns[rows][:, np.arange(length) % pattern_length]
+
+    flip_probabilities = np.broadcast_to(np.asarray(flip_probabilities, dtype=float), (n,))
+    if sparse is None:
+        sparse = np.mean(flip_probabilities) < SPARSE_FLIP_THRESHOLD
+
+    if sparse:
+        rows, cols = _batch_flip_positions(length, flip_probabilities, rng)
+        signals[rows, cols] ^= 1
+    else:
+        signals ^= (rng.random((n, length)) < flip_probabilities[:, None]).astype(np.uint8)
+
+    if packed:
+        return np.packbits(signals, axis=-1)
+    return signals
+
+def unpack_semi_periodic_signals(packed, length):
+    """
+    Restore signals packed by `generate_semi_periodic_signals(..., packed=True)`.
+
+    Parameters:
+    ----------
+    packed : numpy.ndarray
+        Bit-packed uint8 array, packed along the last axis.
+    length : int
+        Number of samples per signal before packing.
+
+    Returns:
+    -------
+    numpy.ndarray
+        0/1 array (dtype uint8) with last dimension `length`.
+    """
+    return np.unpackbits(packed, axis=-1, count=length)
+
+def add_periodic_interrupts(base_signal, amplitude_range, inter_sig, start_idx, duration_idx, length=450, base_pattern=None, base_pattern_2=None, flip_probability=0.1, flip_probability_2=0.1, offset=0, dig_sig=None, dig_sig_2=None, packed=False):
 
     """
     Add periodic digital interruptions to a continuous base signal.
@@ -71,23 +218,32 @@ def add_periodic_interrupts(base_signal, amplitude_range, inter_sig, start_idx,
     Parameters:
     ----------
     base_signal : numpy.ndarray
-        The original signal to which periodic interruptions will be added.
+        The original signal to which periodic interruptions will be added, modified in place.
+        May be a 2-D batch of shape (n, length).
     amplitude_range : list or tuple
-        Contains minimum and maximum aplitude of the device.
+        Contains minimum and maximum aplitude of the device. For batches, each bound may be
+        an array of length n.
     inter_sig : numpy.ndarray
-        The interrupt signal to be modulated and inserted into the base signal.
+        The interrupt signal to be modulated and inserted into the base signal. For batches,
+        either one shared signal of shape (length,) or one per row of shape (n, length).
     offset : float
-        The amplitude offset applied to the interruptions.
-    start_idx : int
-        The start index of the main interruption.
-    duration_idx : int
-        The duration (in samples) of the main interruption.
+        The amplitude offset applied to the interruptions. Currently unused.
+    start_idx : int or array-like
+        The start index of the main interruption (one per row for batches).
+    duration_idx : int or array-like
+        The duration (in samples) of the main interruption (one per row for batches).
     length : int, optional
         The length of the default periodic signal if `func` is None (default: 450).
     base_pattern, base_pattern_2 : list of int, optional
         A binary list representing the repeating base pattern. If None, defaults to `[0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1]`.
     flip_probability, flip_probability_2 : float, optional
         The probability of flipping each bit in the signal (default: 0.1).
+    dig_sig, dig_sig_2 : numpy.ndarray, optional
+        Precomputed digital patterns (e.g. from `generate_semi_periodic_signals`) used instead of
+        generating them from `base_pattern` / `base_pattern_2`. 2-D for batches.
+    packed : bool, optional
+        If True, `dig_sig` and `dig_sig_2` are bit-packed with `np.packbits` and are unpacked
+        to `length` samples (default: False).
 
     Returns:
     -------
@@ -106,24 +262,222 @@ def add_periodic_interrupts(base_signal, amplitude_range, inter_sig, start_idx,
     ------
     - The first phase of interruptions affects the signal **before and after** `start_idx` to `start_idx + duration_idx`.
     - The second phase introduces modulated interruptions **within the specified range**.
+    - Both phases are applied in a single pass: each sample takes its pattern from `dig_sig_2`
+      inside the main interruption and from `dig_sig` elsewhere, and the result is clipped in place.
+    """
+
+    base_signal = np.asarray(base_signal)
+    batched = base_signal.ndim == 2
+    n = base_signal.shape[0] if batched else None
+
+    def _pattern(dig, pattern, probability):
+        if dig is not None:
+            return unpack_semi_periodic_signals(dig, length) if packed else dig
+        if batched:
+            return generate_semi_periodic_signals(n, length=length, base_patterns=pattern, flip_probabilities=probability)
+        return generate_semi_periodic_signal(length=length, base_pattern=pattern, flip_probability=probability)
+
+    dig_sig1 = _pattern(dig_sig, base_pattern, flip_probability)
+    dig_sig2 = _pattern(dig_sig_2, base_pattern_2, flip_probability_2)
+
+    # Per-row window bounds broadcast against the sample axis
+    start = np.asarray(start_idx)
+    end = start + np.asarray(duration_idx)
+    if batched:
+        start, end = start.reshape(-1, 1), end.reshape(-1, 1)
+    samples = np.arange(base_signal.shape[-1])
+    in_window = (samples >= start) & (samples < end)
+
+    # Pattern 2 inside the main interruption, pattern 1 before and after it, in one pass
+    interrupts = inter_sig * np.where(in_window, dig_sig2, dig_sig1)
+    np.add(base_signal, interrupts, out=base_signal, casting='unsafe')
+
+    low, high = np.asarray(amplitude_range[0]), np.asarray(amplitude_range[1])
+    if batched:
+        low, high = low.reshape(-1, 1), high.reshape(-1, 1)
+    np.clip(base_signal, low, high, out=base_signal, casting='unsafe')
+
+    return base_signal
+
+def signal_to_rle(signal):
+    """
+    Convert a digital signal to its run-length encoding.
+
+    Parameters:
+    ----------
+    signal : numpy.ndarray
+        1-D array of 0/1 values.
+
+    Returns:
+    -------
+    tuple of numpy.ndarray
+        (starts, lengths, values): start index, length and value of every run.
     """
+    signal = np.asarray(signal)
+    starts = np.flatnonzero(np.concatenate([[signal.size > 0], signal[1:] != signal[:-1]]))
+    lengths = np.diff(starts, append=len(signal))
+    return starts, lengths, signal[starts].astype(np.uint8)
 
-    dig_sig1 = generate_semi_periodic_signal(length=length, base_pattern=base_pattern, flip_probability=flip_probability)
+def rle_to_signal(rle, start=0, stop=None):
+    """
+    Render samples [start, stop) of a run-length encoded digital signal.
 
-    dig_sig2 = generate_semi_periodic_signal(length=length, base_pattern=base_pattern_2, flip_probability=flip_probability_2)
+    Only the runs overlapping the requested range are expanded, so slices of very long
+    signals are rendered in time proportional to the slice.
 
-    offset1 = (offset/1.3)*dig_sig1
-    interrupts = (inter_sig.copy() * dig_sig1)
+    Parameters:
+    ----------
+    rle : tuple of numpy.ndarray
+        (starts, lengths, values) as returned by `generate_semi_periodic_rle` or `signal_to_rle`.
+    start : int, optional
+        First sample to render (default: 0).
+    stop : int, optional
+        End of the rendered range, exclusive (default: full length).
 
-    base_signal[:start_idx] = base_signal[:start_idx] + interrupts[:start_idx]
-    base_signal[start_idx+duration_idx:] = base_signal[start_idx+duration_idx:] + interrupts[start_idx+duration_idx:]
+    Returns:
+    -------
+    numpy.ndarray
+        0/1 array (dtype uint8) of length stop - start.
+    """
+    starts, lengths, values = rle
+    total = int(starts[-1] + lengths[-1]) if len(starts) else 0
+    stop = total if stop is None else min(stop, total)
+    if stop <= start:
+        return np.empty(0, dtype=np.uint8)
+
+    first = np.searchsorted(starts, start, side='right') - 1
+    last = np.searchsorted(starts, stop, side='left')
+    run_starts = np.maximum(starts[first:last], start)
+    run_ends = np.minimum(starts[first:last] + lengths[first:last], stop)
+    return np.repeat(values[first:last].astype(np.uint8), run_ends - run_starts)
+
+def generate_semi_periodic_rle(length=450, base_pattern=None, flip_probability=0.1, seed=None, flips=None):
+
+    """
+    Generate a semi-periodic digital signal directly in run-length encoded form.
+
+    Equivalent to `generate_semi_periodic_signal`, but the dense signal is never built. Run
+    boundaries are the change points of the tiled `base_pattern` together with the flipped
+    positions and the samples right after them; the value at each candidate boundary is looked
+    up in the pattern and the sorted flip list. Cost and memory are proportional to the number
+    of runs and flips (O(p·N) for drawing random flips), not to one operation per sample.
+
+    Parameters:
+    ----------
+    length : int, optional
+        The total length of the generated signal (default: 450).
+    base_pattern : list of int, optional
+        A binary list representing the repeating base pattern. If None, defaults to `[0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1]`.
+    flip_probability : float, optional
+        The probability of flipping each bit in the signal (default: 0.1).
+    seed : int or numpy.random.Generator, optional
+        Seed for a local random number generator (default: None).
+    flips : array-like of int, optional
+        Explicit flip positions. If given, `flip_probability` and `seed` are ignored.
+
+    Returns:
+    -------
+    tuple of numpy.ndarray
+        (starts, lengths, values) of every run; use `rle_to_signal` to render it.
+
+    Example:
+    -------
+    >>> rle = generate_semi_periodic_rle(length=3600 * 10000, base_pattern=[0] * 5000 + [1] * 5000,
+    ...                                  flip_probability=1e-5)
+    >>> window = rle_to_signal(rle, start=10**6, stop=10**6 + 20000)
+    """
+
+    if base_pattern is None:
+        base_pattern = [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1]
+
+    pattern = np.array(base_pattern, dtype=np.uint8)
+    pattern_length = len(pattern)
+
+    if flips is None:
+        flips = _flip_positions(length, flip_probability, _get_rng(seed), sparse=True)
+    flips = np.unique(np.asarray(flips, dtype=np.int64))
+
+    # Change points of the tiled pattern, including the wrap between periods
+    changes = np.flatnonzero(pattern != np.roll(pattern, 1))
+    periods = np.arange(-(-length // pattern_length))[:, None] * pattern_length
+    pattern_changes = (periods + changes[None, :]).ravel()
+
+    candidates = np.unique(np.concatenate([pattern_changes, flips, flips + 1]))
+    candidates = candidates[(candidates > 0) & (candidates < length)]
+
+    def value_at(idx):
+        return pattern[idx % pattern_length] ^ np.isin(idx, flips)
+
+    boundaries = candidates[value_at(candidates) != value_at(candidates - 1)]
+    starts = np.concatenate([[0], boundaries]) if length > 0 else np.empty(0, dtype=np.int64)
+    lengths = np.diff(starts, append=length)
+    return starts, lengths, value_at(starts).astype(np.uint8)
+
+def _active_ranges(rle, lo, hi):
+    """
+    Start indices and lengths of the 1-valued runs of `rle` clipped to [lo, hi).
+    """
+    starts, lengths, values = rle
+    first = max(np.searchsorted(starts, lo, side='right') - 1, 0)
+    last = np.searchsorted(starts, hi, side='left')
+    ones = first + np.flatnonzero(values[first:last])
+    run_starts = np.maximum(starts[ones], lo)
+    run_ends = np.minimum(starts[ones] + lengths[ones], hi)
+    keep = run_ends > run_starts
+    return run_starts[keep], (run_ends - run_starts)[keep]
+
+def add_periodic_interrupts_rle(base_signal, amplitude_range, inter_sig, start_idx, duration_idx, rle, rle_2, chunk_start=0):
+
+    """
+    Add periodic digital interruptions given as run-length encoded patterns.
+
+    Run-length encoded counterpart of `add_periodic_interrupts`: `rle` is active before and after
+    the main interruption, `rle_2` inside it. Interrupts are added only to the samples covered by
+    1-valued runs, located from the run list in O(runs) without rendering the dense patterns.
+    `base_signal` may be a chunk of a longer (e.g. memory-mapped) trace starting at sample
+    `chunk_start`.
+
+    Parameters:
+    ----------
+    base_signal : numpy.ndarray
+        Signal chunk to modify in place.
+    amplitude_range : list or tuple
+        Contains minimum and maximum aplitude of the device.
+    inter_sig : numpy.ndarray
+        Interrupt signal aligned with `base_signal`.
+    start_idx : int
+        The start index of the main interruption, in samples of the full trace.
+    duration_idx : int
+        The duration (in samples) of the main interruption.
+    rle, rle_2 : tuple of numpy.ndarray
+        (starts, lengths, values) patterns for outside and inside the main interruption.
+    chunk_start : int, optional
+        Index of `base_signal[0]` in the full trace (default: 0).
+
+    Returns:
+    -------
+    numpy.ndarray
+        The modified base signal.
+
+    Notes:
+    ------
+    - As in `add_periodic_interrupts`, the whole chunk is then clipped to `amplitude_range`,
+      the only step that is linear in `len(base_signal)`.
+    """
 
-    rand1 = random.uniform(offset/1.6, offset/1.85)
-    offset2 = (rand1)*dig_sig2
-    interrupts = (inter_sig.copy() * dig_sig2)
+    chunk_end = chunk_start + len(base_signal)
+    end_idx = start_idx + duration_idx
 
-    base_signal[start_idx:start_idx+duration_idx] = base_signal[start_idx:start_idx+duration_idx] + interrupts[start_idx:start_idx+duration_idx]
+    ranges = [
+        _active_ranges(rle, chunk_start, min(start_idx, chunk_end)),
+        _active_ranges(rle_2, max(start_idx, chunk_start), min(end_idx, chunk_end)),
+        _active_ranges(rle, max(end_idx, chunk_start), chunk_end),
+    ]
+    starts = np.concatenate([r[0] for r in ranges])
+    lengths = np.concatenate([r[1] for r in ranges])
 
-    base_signal = np.clip(base_signal, amplitude_range[0], amplitude_range[1])
+    idx = _concat_ranges(starts - chunk_start, lengths)
+    base_signal[idx] += inter_sig[idx]
+    np.clip(base_signal, amplitude_range[0], amplitude_range[1], out=base_signal)
 
-    return base_signal
\ No newline at end of file
+    return base_signal
@@ -2,8 +2,17 @@ import numpy as np
 import random
 
 from SigVarGen.signal.signal_generation import generate_signal
+from SigVarGen.signal.interrupt_labels import INTERRUPT_TYPES, InterruptLabels, interrupt_mask, _params_mask
 from SigVarGen.variations.baseline_drift import apply_baseline_drift_middle_peak
 
+def _with_mask(outputs, interrupt_params, length, mask_format):
+    """
+    Append the ground-truth mask of `interrupt_params` to a function's outputs if requested.
+    """
+    if mask_format is None:
+        return outputs
+    return outputs + (_params_mask(interrupt_params, length, mask_format),)
+
 def get_non_overlapping_interval(signal_length, duration_idx, occupied_intervals, max_tries=1000, buffer=1):
     """
     Attempt to find a start_idx for a new interrupt interval that does not overlap
@@ -280,7 +289,8 @@ def add_main_interrupt(
     complex_iter=0,
     blend_factor=0.5,
     shrink_complex=False,
-    shrink_factor=0.9
+    shrink_factor=0.9,
+    mask_format=None
 ):
     """
     Add a main response signal to the base signal, with optional addition of complex response.
@@ -321,6 +331,10 @@ def add_main_interrupt(
         If True, each successive smaller interrupt is shorter than the previous.
     shrink_factor : float, optional
         Fraction to shrink the duration of each smaller interrupt (default = 0.9).
+    mask_format : {'codes', 'packed'}, optional
+        If given, also return a ground-truth mask of the samples covered by the main interrupt and its overlapping parts, built by
+        `interrupt_mask` ('codes': uint8 class per sample, 'packed': `np.packbits` bitset per
+        interrupt type). Default: None, no mask.
 
     Returns
     -------
@@ -336,6 +350,8 @@ def add_main_interrupt(
             - type (str): "main" for primary interrupt.
     occupied_intervals : list of tuple
         Updated list of (start_idx, end_idx) representing all occupied intervals after adding interrupts.
+    mask : np.ndarray
+        Only returned if `mask_format` is given.
     """
 
     # Generate the main interrupt signal (raw)
@@ -358,7 +374,7 @@ def add_main_interrupt(
 
     # If no space, return original
     if start_idx is None:
-        return base_signal, [], occupied_intervals
+        return _with_mask((base_signal, [], occupied_intervals), [], len(base_signal), mask_format)
 
     # Slice out the portion of the main interrupt
     inter_part_raw = main_interrupt_signal[start_idx:end_idx]
@@ -367,7 +383,7 @@ def add_main_interrupt(
     base_slice = base_signal[start_idx:end_idx]
 
     if base_slice.size <= 1 or inter_part_raw.size <= 1:
-        return base_signal, [], occupied_intervals
+        return _with_mask((base_signal, [], occupied_intervals), [], len(base_signal), mask_format)
 
     inter_part_modified, offset_val = apply_interrupt_modifications(
         inter_part=inter_part_raw.copy(),
@@ -424,7 +440,7 @@ def add_main_interrupt(
             interrupt_params.append(complex_param)
         
 
-    return base_signal, interrupt_params, occupied_intervals
+    return _with_mask((base_signal, interrupt_params, occupied_intervals), interrupt_params, len(base_signal), mask_format)
 
 def add_complexity_to_inter(
     base_signal,
@@ -437,7 +453,8 @@ def add_complexity_to_inter(
     drop,
     old_offset,
     sinusoids_params,
-    blend_factor=0.5
+    blend_factor=0.5,
+    mask_format=None
 ):
     """
     Adds one 'complex' (overlapping) interrupt within the main interrupt region.
@@ -466,18 +483,24 @@ def add_complexity_to_inter(
         The metadata describing how the main interrupt was generated (reuse if you want).
     blend_factor : float, optional
         Blend weight between base and interrupt (default = 0.5).
-    
+    mask_format : {'codes', 'packed'}, optional
+        If given, also return a ground-truth mask of the samples covered by the added interrupt, built by
+        `interrupt_mask` ('codes': uint8 class per sample, 'packed': `np.packbits` bitset per
+        interrupt type). Default: None, no mask.
+
     Returns
     -------
     updated_base_signal : np.ndarray
         The base signal after adding the new overlapping interrupt.
     interrupt_params : dict
         Metadata describing the smaller interrupt that was added.
+    mask : np.ndarray
+        Only returned if `mask_format` is given.
     """
     length_main = end_main - start_main
     if length_main <= 1:
         # No room to add a complex interrupt
-        return base_signal, None
+        return _with_mask((base_signal, None), [], len(base_signal), mask_format)
 
     min_small_len = max(1, length_main // 5)
     max_small_len = max(1, length_main // 3)
@@ -490,7 +513,7 @@ def add_complexity_to_inter(
     inter_part2_raw = full_interrupt_signal[start_idx2:end_idx2]
 
     if base_slice2.size <= 1 or inter_part2_raw.size <= 1:
-        return base_signal, None
+        return _with_mask((base_signal, None), [], len(base_signal), mask_format)
 
     # Optionally apply drift + offset with bounding logic
     inter_part2_modified, final_offset2 = apply_interrupt_modifications(
@@ -523,7 +546,7 @@ def add_complexity_to_inter(
         'type': 'main_overlapping'
     }
 
-    return base_signal, interrupt_params
+    return _with_mask((base_signal, interrupt_params), [interrupt_params], len(base_signal), mask_format)
 
 def add_smaller_interrupts(
     t,
@@ -538,7 +561,8 @@ def add_smaller_interrupts(
     small_duration_ratio,
     n_sinusoids=None,
     non_overlap=True,
-    buffer=1
+    buffer=1,
+    mask_format=None
 ):
     """
     Add secondary (smaller) interrupts to a base signal.
@@ -575,6 +599,10 @@ def add_smaller_interrupts(
     buffer : int, optional
         Minimum spacing (in samples) to keep between interrupts when non_overlap=True.
         Default is 1 sample, can be adjusted to enforce larger gaps.
+    mask_format : {'codes', 'packed'}, optional
+        If given, also return a ground-truth mask of the samples covered by the added interrupts, built by
+        `interrupt_mask` ('codes': uint8 class per sample, 'packed': `np.packbits` bitset per
+        interrupt type). Default: None, no mask.
 
     Returns
     -------
@@ -588,6 +616,8 @@ def add_smaller_interrupts(
             - offset (float): Applied offset.
             - sinusoids_params (dict): Parameters used to generate the sinusoid.
             - type (str): "small" indicating this is a smaller interrupt.
+    mask : np.ndarray
+        Only returned if `mask_format` is given.
     """
 
     interrupt_params = []
@@ -622,8 +652,9 @@ def add_smaller_interrupts(
         base_slice = base_signal[start_idx:end_idx]
         s_inter_raw = small_interrupt_signal[start_idx:end_idx]
 
+        # Skip interrupts clipped to a single sample at the signal end, keeping those already placed
         if base_slice.size <= 1 or s_inter_raw.size <= 1:
-            return base_signal, []
+            continue
 
         # Apply signal modifications (e.g., dispersal, offset shift, clipping to device limits)
         s_inter_modified, s_offset = apply_interrupt_modifications(
@@ -650,13 +681,13 @@ def add_smaller_interrupts(
         # Mark interval as occupied to prevent future overlap
         occupied_intervals.append((start_idx, end_idx))
 
-    return base_signal, interrupt_params
+    return _with_mask((base_signal, interrupt_params), interrupt_params, len(base_signal), mask_format)
 
 
 def add_interrupt_with_params(t, base_signal, domain, DEVICE_RANGES, INTERRUPT_RANGES, 
                             temp, drop=True, disperse=True, duration_ratio=None, n_smaller_interrupts=None, 
                             n_sinusoids=None, non_overlap=True, complex_iter=0, blend_factor=0.5, 
-                            shrink_complex=False, shrink_factor=0.9, buffer=1):
+                            shrink_complex=False, shrink_factor=0.9, buffer=1, columnar=False, mask_format=None):
     """
     Add one main interrupt and between 0 to 2 smaller interrupts to the signal.
 
@@ -695,12 +726,18 @@ def add_interrupt_with_params(t, base_signal, domain, DEVICE_RANGES, INTERRUPT_R
     buffer : int, optional
         Minimum spacing (in samples) to keep between interrupts when non_overlap=True.
         Default is 1 sample, can be adjusted to enforce larger gaps.
+    columnar : bool, optional
+        If True, return the metadata as `InterruptLabels` (fixed-width columns plus a ragged
+        sinusoid store) instead of a list of dicts (default: False).
+    mask_format : {'codes', 'packed'}, optional
+        If given, also return a ground-truth mask of the samples covered by all added
+        interrupts, built by `interrupt_mask`. Default: None, no mask.
 
     Returns:
     -------
     base_signal : numpy.ndarray
         The modified signal with added interrupts.
-    interrupt_params : list of dict
+    interrupt_params : list of dict or InterruptLabels
         Metadata describing the smaller interrupt that was added.
         Metadata for each added interrupt, contains:
             - start_idx (int): Start index of interrupt.
@@ -708,6 +745,8 @@ def add_interrupt_with_params(t, base_signal, domain, DEVICE_RANGES, INTERRUPT_R
             - offset (float): Applied offset.
             - sinusoids_params (dict): Parameters used to generate the sinusoid.
             - type (str): "small" indicating this is a smaller interrupt.
+    mask : numpy.ndarray
+        Only returned if `mask_format` is given.
     """
     if duration_ratio is None:
         duration_ratio = random.uniform(0.06, 0.12)
@@ -750,7 +789,9 @@ def add_interrupt_with_params(t, base_signal, domain, DEVICE_RANGES, INTERRUPT_R
                 non_overlap=non_overlap,
                 buffer=buffer)
 
-    return base_signal, main_interrupt_params + small_interrupt_params
+    interrupt_params = main_interrupt_params + small_interrupt_params
+    labels = InterruptLabels.from_params(interrupt_params) if columnar else interrupt_params
+    return _with_mask((base_signal, labels), interrupt_params, len(base_signal), mask_format)
 
 
 def add_interrupt_bursts(
@@ -765,7 +806,8 @@ def add_interrupt_bursts(
     end_idx=0,
     n_small_interrupts=None,
     non_overlap=False,
-    small_duration_ratio_range=None
+    small_duration_ratio_range=None,
+    mask_format=None
 ):
     """
     Add multiple small interrupts to the signal within a specified time window.
@@ -796,12 +838,17 @@ def add_interrupt_bursts(
         If True, prevents overlap between bursts.
     small_duration_ratio_range : tuple of floats, optional (default: random from 0.001 to 0.005)
         Interrupt burst duration in relationship to t.
+    mask_format : {'codes', 'packed'}, optional
+        If given, also return a ground-truth mask of the samples covered by bursts, built by
+        `interrupt_mask`. Default: None, no mask.
 
 
     Returns
     -------
     base_signal : np.ndarray
         The modified signal with added small interrupts.
+    mask : np.ndarray
+        Only returned if `mask_format` is given.
     """
     if end_idx == 0:
         end_idx = len(t)
@@ -871,4 +918,7 @@ def add_interrupt_bursts(
     # Ensure final signal respects device limits
     base_signal = np.clip(base_signal, device_min, device_max)
 
+    if mask_format is not None:
+        starts, ends = np.array(occupied_intervals, dtype=np.int64).reshape(-1, 2).T
+        return base_signal, interrupt_mask(starts, ends - starts, np.full(len(starts), INTERRUPT_TYPES.index('burst')), len(base_signal), mask_format)
     return base_signal
\ No newline at end of file
@@ -1,5 +1,28 @@
 import numpy as np
-from scipy.interpolate import interp1d
+from functools import lru_cache
+from math import gcd
+
+def _get_rng(seed=None):
+    """
+    Return a local numpy Generator for `seed` (int, Generator or None).
+
+    Without a seed the generator is seeded from the global numpy state, so `np.random.seed`
+    still makes a whole generation pipeline reproducible without functions reseeding it.
+    """
+    if isinstance(seed, np.random.Generator):
+        return seed
+    if seed is None:
+        seed = np.random.randint(0, 2**32, dtype=np.int64)
+    return np.random.default_rng(seed)
+
+def _concat_ranges(starts, counts):
+    """
+    Concatenate np.arange(s, s + c) for every (s, c) pair without a Python loop.
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    counts = np.asarray(counts, dtype=np.int64)
+    offsets = np.cumsum(counts) - counts
+    return np.arange(counts.sum()) - np.repeat(offsets - starts, counts)
 
 def calculate_SNR(signal, noisy_signal):
     noise = noisy_signal - signal
@@ -7,19 +30,842 @@ def calculate_SNR(signal, noisy_signal):
     noise_power = np.abs(np.mean(noise ** 2))
     return 10 * np.log10(signal_power / noise_power)
 
+def calculate_SNR_batch(signals, noisy_signals):
+    """
+    Row-wise version of `calculate_SNR` for stacks of shape (n, N).
+
+    Returns
+    -------
+    numpy.ndarray
+        SNR in dB for every row, shape (n,).
+    """
+    signals = np.atleast_2d(signals)
+    noise = np.atleast_2d(noisy_signals) - signals
+    signal_power = np.einsum('ij,ij->i', signals, signals) / signals.shape[-1]
+    noise_power = np.einsum('ij,ij->i', noise, noise) / noise.shape[-1]
+    return 10 * np.log10(signal_power / noise_power)
+
+def _merge_moments(stats, chunk, count):
+    """
+    Merge the mean and sum of squared deviations of `chunk` (along its last axis) into the
+    running `stats` over `count` samples (Chan et al. pairwise update).
+    """
+    chunk_n = chunk.shape[-1]
+    chunk_mean = chunk.mean(axis=-1)
+    chunk_m2 = np.sum((chunk - chunk_mean[..., None]) ** 2, axis=-1)
+    if stats is None:
+        return chunk_mean, chunk_m2
+
+    mean, m2 = stats
+    total = count + chunk_n
+    delta = chunk_mean - mean
+    return mean + delta * (chunk_n / total), m2 + chunk_m2 + delta ** 2 * (count * chunk_n / total)
+
+class SNRAccumulator:
+    """
+    Streaming signal and noise power, updated chunk by chunk.
+
+    Keeps a running count, mean and sum of squared deviations for the clean signal and for the
+    noise (noisy - clean), merging each chunk's statistics Welford/Chan-style. Memory use is
+    constant, so the SNR of memory-mapped recordings far larger than RAM can be measured in one
+    pass. Chunks may be 1-D, or 2-D (n, chunk) to track n recordings at once.
+
+    Example
+    -------
+    >>> acc = SNRAccumulator()
+    >>> for start in range(0, len(clean), 2**20):
+    ...     acc.update(clean[start:start + 2**20], noisy[start:start + 2**20])
+    >>> acc.snr()  # equals calculate_SNR(clean, noisy)
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._stats = {'signal': None, 'noise': None}
+
+    def update(self, signal_chunk, noisy_chunk):
+        """
+        Add the next chunk of the clean and noisy signal.
+        """
+        signal_chunk = np.asarray(signal_chunk, dtype=float)
+        noise_chunk = np.asarray(noisy_chunk, dtype=float) - signal_chunk
+        if signal_chunk.shape[-1] == 0:
+            return self
+        self._stats['signal'] = _merge_moments(self._stats['signal'], signal_chunk, self.count)
+        self._stats['noise'] = _merge_moments(self._stats['noise'], noise_chunk, self.count)
+        self.count += signal_chunk.shape[-1]
+        return self
+
+    def _power(self, key):
+        mean, m2 = self._stats[key]
+        return m2 / self.count + mean ** 2
+
+    def signal_power(self):
+        """Mean squared value of the clean signal seen so far."""
+        return self._power('signal')
+
+    def noise_power(self):
+        """Mean squared value of the noise seen so far."""
+        return self._power('noise')
+
+    def noise_variance(self):
+        """Variance of the noise seen so far."""
+        return self._stats['noise'][1] / self.count
+
+    def snr(self):
+        """SNR in dB, as `calculate_SNR` would compute it on the full signals."""
+        return 10 * np.log10(self.signal_power() / self.noise_power())
+
+def calculate_SNR_streaming(signal, noisy_signal, chunk_size=2**20):
+    """
+    `calculate_SNR` for signals too large for memory (e.g. numpy.memmap), read in chunks.
+
+    Accepts 1-D signals or (n, N) stacks (returning one SNR per row).
+    """
+    acc = SNRAccumulator()
+    length = np.shape(signal)[-1]
+    for start in range(0, length, chunk_size):
+        acc.update(signal[..., start:start + chunk_size], noisy_signal[..., start:start + chunk_size])
+    return acc.snr()
+
+def local_snr(signal, noisy_signal, window, step=1, mode='valid'):
+    """
+    Sliding-window SNR profile, for checking non-stationary (envelope-modulated) noise.
+
+    Window sums of the squared signal and squared noise are taken as differences of cumulative
+    sums, so the whole profile costs O(N) regardless of the window length.
+
+    Parameters
+    ----------
+    signal : numpy.ndarray
+        Clean signal(s), shape (N,) or (n, N).
+    noisy_signal : numpy.ndarray
+        Noisy signal(s) of the same shape.
+    window : int
+        Window length in samples.
+    step : int, optional
+        Stride between consecutive output values (default: 1).
+    mode : str, optional
+        - 'valid': one value per full window; value k covers samples [k*step, k*step + window).
+        - 'same': one value per sample (before striding), from a window centered on it and
+          truncated at the signal edges.
+        Default is 'valid'.
+
+    Returns
+    -------
+    numpy.ndarray
+        SNR in dB along the last axis. Windows without noise give +inf, windows without
+        signal -inf, and windows where both are zero NaN, all without warnings.
+
+    Example
+    -------
+    >>> profile = local_snr(wave, noisy_wave, window=500, step=100)
+    """
+    signal = np.asarray(signal, dtype=float)
+    noise = np.asarray(noisy_signal, dtype=float) - signal
+    length = signal.shape[-1]
+    if not 1 <= window <= length:
+        raise ValueError("window must be between 1 and the signal length.")
+
+    pad = [(0, 0)] * (signal.ndim - 1) + [(1, 0)]
+    signal_energy = np.pad(np.cumsum(signal ** 2, axis=-1), pad)
+    noise_energy = np.pad(np.cumsum(noise ** 2, axis=-1), pad)
+
+    if mode == 'valid':
+        lo = np.arange(0, length - window + 1, step)
+        hi = lo + window
+    elif mode == 'same':
+        centers = np.arange(0, length, step)
+        lo = np.clip(centers - window // 2, 0, length)
+        hi = np.clip(centers - window // 2 + window, 0, length)
+    else:
+        raise ValueError(f"Unknown mode '{mode}'. Expected 'valid' or 'same'.")
+
+    # Window lengths cancel in the power ratio
+    signal_window = signal_energy[..., hi] - signal_energy[..., lo]
+    noise_window = noise_energy[..., hi] - noise_energy[..., lo]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        snr = 10 * np.log10(signal_window / noise_window)
+    # All-zero windows have no defined SNR
+    return np.where((signal_window == 0) & (noise_window == 0), np.nan, snr)
+
 def calculate_ED(X, Y):
     return np.linalg.norm(X - Y)
 
+def calculate_DTW(X, Y, band=None):
+    """
+    Dynamic time warping distance with a Sakoe-Chiba band.
+
+    Aligned samples are compared with the squared difference and the distance is the square
+    root of the accumulated cost, so with `band=0` the result equals `calculate_ED` for
+    signals of the same length. The cost matrix is swept one anti-diagonal at a time, with all
+    cells of a diagonal and all pairs of a batch updated together; only the last two diagonals
+    are kept, so memory is O(n_pairs * N) and the work is O(n_pairs * N * band).
+
+    Parameters
+    ----------
+    X : numpy.ndarray
+        Signal(s) of shape (N,) or (n_pairs, N).
+    Y : numpy.ndarray
+        Signal(s) of shape (M,) or (n_pairs, M). A single signal is compared against every row of `X`.
+    band : int, optional
+        Maximum allowed |i - j| between aligned samples. It is widened to |N - M| if needed
+        so that a warping path exists. If None, the band is unconstrained (default: None).
+
+    Returns
+    -------
+    float or numpy.ndarray
+        DTW distance for each pair.
+
+    Example
+    -------
+    >>> d = calculate_DTW(wave, warped_variants, band=50)  # one distance per variant
+    """
+    X = np.asarray(X, dtype=float)
+    Y = np.asarray(Y, dtype=float)
+    single = X.ndim == 1 and Y.ndim == 1
+    X, Y = np.atleast_2d(X), np.atleast_2d(Y)
+    n_pairs = max(len(X), len(Y))
+    if len(X) != len(Y):
+        X = np.broadcast_to(X, (n_pairs, X.shape[1]))
+        Y = np.broadcast_to(Y, (n_pairs, Y.shape[1]))
+
+    N, M = X.shape[1], Y.shape[1]
+    w = max(N, M) if band is None else max(int(band), abs(N - M))
+
+    # Diagonal buffers indexed by i + 1; column 0 stands for the (infinite) row i = -1
+    prev2 = np.full((n_pairs, N + 1), np.inf)
+    prev1 = np.full((n_pairs, N + 1), np.inf)
+    cur = np.full((n_pairs, N + 1), np.inf)
+    written = {id(prev2): (0, 0), id(prev1): (0, 0), id(cur): (0, 0)}
+
+    for d in range(N + M - 1):
+        lo = max(0, d - M + 1, -((w - d) // 2))
+        hi = min(N - 1, d, (d + w) // 2)
+
+        # Clear what this buffer held two diagonals ago
+        old_lo, old_hi = written[id(cur)]
+        cur[:, old_lo:old_hi] = np.inf
+
+        cost = X[:, lo:hi + 1] - Y[:, d - hi:d - lo + 1][:, ::-1]
+        cost *= cost
+        if d == 0:
+            cur[:, 1] = cost[:, 0]
+        else:
+            # Neighbours (i-1, j), (i, j-1) on the previous diagonal, (i-1, j-1) two back
+            best = np.minimum(prev1[:, lo:hi + 1], prev1[:, lo + 1:hi + 2])
+            np.minimum(best, prev2[:, lo:hi + 1], out=best)
+            cur[:, lo + 1:hi + 2] = cost + best
+        written[id(cur)] = (lo + 1, hi + 2)
+
+        prev2, prev1, cur = prev1, cur, prev2
+
+    distance = np.sqrt(prev1[:, N])
+    return distance[0] if single else distance
+
+def pairwise_ed(A, B=None, max_memory=256 * 2**20, rtol=1e-6, out=None):
+    """
+    Euclidean distance matrix between the rows of two stacks of signals.
+
+    Uses the identity ‖a - b‖² = ‖a‖² + ‖b‖² - 2a·bᵀ so that the bulk of the work is one matrix
+    product per block of rows. Rows of `A` are processed in blocks sized to keep the temporaries
+    below `max_memory` bytes, and `out` may be a memory-mapped array, so arbitrarily large sets
+    can be compared.
+
+    The identity loses precision for nearly identical signals (the difference of two large,
+    almost equal numbers). Entries whose squared distance falls below `rtol` times ‖a‖² + ‖b‖²
+    are therefore recomputed directly from the differences, negative round-off is clipped to
+    zero, and a self-comparison has an exactly zero diagonal and is exactly symmetric.
+
+    Parameters
+    ----------
+    A : numpy.ndarray
+        Signals of shape (n, N) (or a single signal of shape (N,)).
+    B : numpy.ndarray, optional
+        Signals of shape (m, N). If None, distances between the rows of `A` are computed.
+    max_memory : int, optional
+        Approximate memory budget in bytes for the per-block temporaries (default: 256 MiB).
+    rtol : float, optional
+        Relative threshold below which distances are recomputed directly (default: 1e-6).
+    out : numpy.ndarray, optional
+        Array of shape (n, m) receiving the result, e.g. a numpy.memmap.
+
+    Returns
+    -------
+    numpy.ndarray
+        Distance matrix D of shape (n, m) with D[i, j] = calculate_ED(A[i], B[j]).
+
+    Example
+    -------
+    >>> D = pairwise_ed(np.stack(variants))
+    >>> mean_distance = D[np.triu_indices(len(D), k=1)].mean()
+    """
+    A = np.atleast_2d(np.asarray(A, dtype=float))
+    symmetric = B is None
+    B = A if symmetric else np.atleast_2d(np.asarray(B, dtype=float))
+    if A.shape[1] != B.shape[1]:
+        raise ValueError("A and B must contain signals of the same length.")
+
+    n, m = len(A), len(B)
+    if out is None:
+        out = np.empty((n, m))
+
+    sq_A = np.einsum('ij,ij->i', A, A)
+    sq_B = sq_A if symmetric else np.einsum('ij,ij->i', B, B)
+
+    # Two (rows, m) float64 temporaries per block
+    rows = max(1, int(max_memory // (16 * max(m, 1))))
+    for start in range(0, n, rows):
+        stop = min(start + rows, n)
+        scale = sq_A[start:stop, None] + sq_B[None, :]
+        d2 = scale - 2 * (A[start:stop] @ B.T)
+
+        # Recompute near-zero distances without cancellation
+        close_i, close_j = np.nonzero(d2 <= rtol * scale)
+        for k in range(0, close_i.size, rows):
+            i, j = close_i[k:k + rows], close_j[k:k + rows]
+            diff = A[start + i] - B[j]
+            d2[i, j] = np.einsum('ij,ij->i', diff, diff)
+
+        np.maximum(d2, 0, out=d2)
+        out[start:stop] = np.sqrt(d2)
+
+    if symmetric:
+        # Blocks see different BLAS reduction orders; mirror the upper triangle so D == D.T exactly
+        for start in range(0, n, rows):
+            stop = min(start + rows, n)
+            out[start:stop, :start] = out[:start, start:stop].T
+            block = out[start:stop, start:stop]
+            block[...] = np.triu(block) + np.triu(block, k=1).T
+        np.fill_diagonal(out, 0)
+    return out
+
+class CrossCorrelationAligner:
+    """
+    Find the lag between a reference signal and its time-shifted variants.
+
+    Cross-correlations are computed in the frequency domain: the reference spectrum is computed
+    once and cached, and each call costs one real FFT per variant plus one inverse FFT. The lag
+    of a variant is the shift `k` maximizing the correlation, i.e. the variant is closest to
+    `np.roll(reference, k)`, matching the convention of `apply_time_shift`.
+
+    Parameters
+    ----------
+    reference : numpy.ndarray
+        1-D reference signal of length N.
+    max_lag : int, optional
+        Only lags with |k| <= max_lag are considered (default: None, all lags).
+    circular : bool, optional
+        If True (default), correlate circularly, as for the wrap-around shifts produced by
+        `apply_time_shift`. If False, signals are zero-padded and shifted content is not
+        wrapped, which suits variants cut from longer recordings.
+
+    Example
+    -------
+    >>> aligner = CrossCorrelationAligner(base_wave, max_lag=200)
+    >>> lags = aligner.lags(variants)                # shape (n_variants,)
+    >>> distances = aligner.distances(variants)      # shift-invariant Euclidean distances
+    """
+
+    def __init__(self, reference, max_lag=None, circular=True):
+        self.reference = np.asarray(reference, dtype=float)
+        if self.reference.ndim != 1:
+            raise ValueError("reference must be a 1-D signal.")
+        self.max_lag = max_lag
+        self.circular = circular
+
+        N = len(self.reference)
+        self.nfft = N if circular else 1 << (2 * N - 2).bit_length()
+        self._reference_spectrum = np.conj(np.fft.rfft(self.reference, n=self.nfft))
+        self._reference_energy = np.dot(self.reference, self.reference)
+
+        # Lag represented by each bin of the correlation
+        j = np.arange(self.nfft)
+        if circular:
+            self._lag_values = np.where(j <= N // 2, j, j - N)
+            valid = np.ones(self.nfft, dtype=bool)
+        else:
+            self._lag_values = np.where(j < N, j, j - self.nfft)
+            valid = (j < N) | (j > self.nfft - N)
+        if max_lag is not None:
+            valid &= np.abs(self._lag_values) <= max_lag
+        self._invalid = ~valid
+
+    def _check(self, variants):
+        variants = np.asarray(variants, dtype=float)
+        if variants.shape[-1] != len(self.reference):
+            raise ValueError("variants must have the same length as the reference.")
+        return variants
+
+    def correlate(self, variants):
+        """
+        Cross-correlation of each variant with the reference.
+
+        Returns
+        -------
+        numpy.ndarray
+            Correlations of shape (..., nfft); bin `j` holds the lag `lag_values[j]`.
+        """
+        variants = self._check(variants)
+        spectrum = np.fft.rfft(variants, n=self.nfft, axis=-1)
+        spectrum *= self._reference_spectrum
+        return np.fft.irfft(spectrum, n=self.nfft, axis=-1)
+
+    @property
+    def lag_values(self):
+        return self._lag_values
+
+    def _best(self, variants):
+        corr = self.correlate(variants)
+        corr[..., self._invalid] = -np.inf
+        best = np.argmax(corr, axis=-1)
+        return self._lag_values[best], np.take_along_axis(corr, best[..., None], axis=-1)[..., 0]
+
+    def lags(self, variants):
+        """
+        Best lag of each variant relative to the reference.
+
+        Parameters
+        ----------
+        variants : numpy.ndarray
+            Signals of shape (N,) or (n_variants, N).
+
+        Returns
+        -------
+        int or numpy.ndarray
+            Lag(s) `k` such that the variant best matches `np.roll(reference, k)`.
+        """
+        return self._best(variants)[0]
+
+    def align(self, variants, lags=None):
+        """
+        Shift the variants back onto the reference.
+
+        Parameters
+        ----------
+        variants : numpy.ndarray
+            Signals of shape (N,) or (n_variants, N).
+        lags : array-like, optional
+            Lags to undo. If None, they are estimated with `lags`.
+
+        Returns
+        -------
+        numpy.ndarray
+            Aligned variants. With `circular=False`, samples shifted in from outside are zero.
+        """
+        variants = self._check(variants)
+        if lags is None:
+            lags = self.lags(variants)
+        N = len(self.reference)
+        source = np.arange(N) + np.asarray(lags)[..., None]
+
+        if self.circular:
+            return np.take_along_axis(variants, source % N, axis=-1)
+        inside = (source >= 0) & (source < N)
+        return np.where(inside, np.take_along_axis(variants, np.clip(source, 0, N - 1), axis=-1), 0.0)
+
+    def distances(self, variants, return_lags=False, rtol=1e-6):
+        """
+        Shift-invariant Euclidean distance between each variant and the reference.
+
+        With `circular=True` the squared distance is taken from the correlation peak as
+        ‖ref‖² + ‖v‖² - 2·peak, which cancels catastrophically for near-identical signals. As in
+        `pairwise_ed`, squared distances below `rtol` times ‖ref‖² + ‖v‖² are recomputed directly
+        on the aligned variant, so a variant identical to the shifted reference gives exactly 0.
+
+        Parameters
+        ----------
+        variants : numpy.ndarray
+            Signals of shape (N,) or (n_variants, N).
+        return_lags : bool, optional
+            If True, also return the lags (default: False).
+        rtol : float, optional
+            Relative threshold below which distances are recomputed directly (default: 1e-6).
+
+        Returns
+        -------
+        distances : float or numpy.ndarray
+            `calculate_ED(reference, aligned_variant)` for each variant.
+        lags : int or numpy.ndarray
+            Only returned if `return_lags` is True.
+        """
+        variants = self._check(variants)
+        lags, peak = self._best(variants)
+
+        if self.circular:
+            # A circular shift preserves energy, so the distance follows from the peak alone
+            scale = self._reference_energy + np.einsum('...i,...i->...', variants, variants)
+            squared = np.asarray(scale - 2 * peak)
+            close = squared <= rtol * scale
+            if np.any(close):
+                diff = self.align(variants[close], np.asarray(lags)[close]) - self.reference
+                squared[close] = np.einsum('...i,...i->...', diff, diff)
+            distances = np.sqrt(np.maximum(squared, 0))
+        else:
+            diff = self.align(variants, lags) - self.reference
+            distances = np.sqrt(np.einsum('...i,...i->...', diff, diff))
+
+        if return_lags:
+            return distances, lags
+        return distances
+
+def align_to_reference(reference, variants, max_lag=None, circular=True, return_distances=False):
+    """
+    Estimate the lag of each variant relative to `reference` by FFT cross-correlation.
+
+    Convenience wrapper around `CrossCorrelationAligner` for one-off comparisons; build the
+    aligner directly to reuse the cached reference spectrum across calls.
+
+    Parameters
+    ----------
+    reference : numpy.ndarray
+        1-D reference signal.
+    variants : numpy.ndarray
+        Signals of shape (N,) or (n_variants, N).
+    max_lag : int, optional
+        Maximum absolute lag considered (default: None).
+    circular : bool, optional
+        Circular (default) or zero-padded correlation.
+    return_distances : bool, optional
+        If True, also return the shift-invariant Euclidean distances (default: False).
+
+    Returns
+    -------
+    lags : int or numpy.ndarray
+        Lag(s) `k` such that the variant best matches `np.roll(reference, k)`.
+    distances : float or numpy.ndarray
+        Only returned if `return_distances` is True.
+
+    Example
+    -------
+    >>> lags, distances = align_to_reference(base_wave, np.stack(variants), max_lag=100, return_distances=True)
+    """
+    aligner = CrossCorrelationAligner(reference, max_lag=max_lag, circular=circular)
+    if return_distances:
+        distances, lags = aligner.distances(variants, return_lags=True)
+        return lags, distances
+    return aligner.lags(variants)
+
+_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+def sketch_signals(waves, n_bits=256, seed=None, chunk_size=4096):
+    """
+    Sign random-projection (SimHash) sketches of normalized signals.
+
+    Each signal is z-normalized as in `normalization` and projected onto `n_bits` random
+    Gaussian directions; the sketch keeps the sign of every projection, packed into bytes.
+    The fraction of differing bits between two sketches estimates the angle between the
+    normalized signals, so Hamming distance on sketches approximates their correlation.
+    Signs are unaffected by the positive std scaling, so only the mean is removed, and that
+    is folded into the projection instead of copying the data.
+
+    Parameters
+    ----------
+    waves : numpy.ndarray
+        Signals of shape (n, N); may be a numpy.memmap.
+    n_bits : int, optional
+        Sketch length in bits, a multiple of 8 (default: 256).
+    seed : int or numpy.random.Generator, optional
+        Seed for the projection basis. Sketches are only comparable when built with the same
+        seed and signal length (default: None).
+    chunk_size : int, optional
+        Number of rows projected at a time (default: 4096).
+
+    Returns
+    -------
+    numpy.ndarray
+        Packed sketches of shape (n, n_bits // 8), dtype uint8.
+    """
+    if n_bits % 8:
+        raise ValueError("n_bits must be a multiple of 8.")
+    if not isinstance(waves, np.ndarray):
+        waves = np.asarray(waves, dtype=float)
+    n, N = waves.shape
+    basis = _get_rng(seed).standard_normal((N, n_bits))
+    basis_sum = basis.sum(axis=0)
+
+    sketches = np.empty((n, n_bits // 8), dtype=np.uint8)
+    for start in range(0, n, chunk_size):
+        chunk = np.asarray(waves[start:start + chunk_size], dtype=float)
+        projection = chunk @ basis - chunk.mean(axis=1, keepdims=True) * basis_sum
+        sketches[start:start + len(chunk)] = np.packbits(projection >= 0, axis=1)
+    return sketches
+
+def _lsh_candidate_pairs(sketches, n_bands, max_bucket_size):
+    n, n_bytes = sketches.shape
+    if n_bytes % n_bands or n_bytes // n_bands > 8:
+        raise ValueError("n_bits / n_bands must be a multiple of 8 and at most 64.")
+    band_bytes = n_bytes // n_bands
+
+    pair_codes = []
+    for band in range(n_bands):
+        # Bytes of the band as one integer key per signal
+        keys = np.zeros((n, 8), dtype=np.uint8)
+        keys[:, :band_bytes] = sketches[:, band * band_bytes:(band + 1) * band_bytes]
+        keys = keys.view(np.uint64)[:, 0]
+
+        order = np.argsort(keys, kind='stable')
+        boundaries = np.flatnonzero(np.diff(keys[order])) + 1
+        starts = np.concatenate(([0], boundaries))
+        sizes = np.diff(np.concatenate((starts, [n])))
+
+        # All pairs within each bucket, one vectorized step per distinct bucket size
+        for size in np.unique(sizes[(sizes > 1) & (sizes <= max_bucket_size)]):
+            first, second = np.triu_indices(size, k=1)
+            bucket_starts = starts[sizes == size][:, None]
+            i = order[bucket_starts + first].ravel()
+            j = order[bucket_starts + second].ravel()
+            pair_codes.append(np.minimum(i, j) * n + np.maximum(i, j))
+
+    if not pair_codes:
+        return np.empty((0, 2), dtype=np.int64)
+    codes = np.unique(np.concatenate(pair_codes))
+    return np.stack((codes // n, codes % n), axis=1)
+
+def find_near_duplicates(waves, min_similarity=0.95, n_bits=256, n_bands=8, max_bucket_size=1000,
+                         seed=None, chunk_size=4096, sketches=None):
+    """
+    Find pairs of near-identical signals without comparing all pairs.
+
+    Signals are sketched with `sketch_signals` and bucketed with locality-sensitive hashing:
+    the sketch is cut into `n_bands` bands and signals sharing any band land in the same
+    bucket. Only pairs within a bucket are scored, using the correlation estimated from the
+    Hamming distance of their sketches, so the cost grows near-linearly with the number of
+    signals. Results are candidates; confirm them with an exact comparison if needed.
+
+    Parameters
+    ----------
+    waves : numpy.ndarray
+        Signals of shape (n, N); may be a numpy.memmap. Ignored if `sketches` is given.
+    min_similarity : float, optional
+        Minimum estimated correlation of the normalized signals for a pair to be reported
+        (default: 0.95).
+    n_bits : int, optional
+        Sketch length in bits (default: 256).
+    n_bands : int, optional
+        Number of LSH bands; each band holds n_bits / n_bands bits, which must be a multiple
+        of 8 and at most 64. More bands find more candidates at a higher cost (default: 8).
+    max_bucket_size : int, optional
+        Buckets larger than this are skipped to keep the number of scored pairs bounded,
+        e.g. for flat signals that all share one sketch (default: 1000).
+    seed : int or numpy.random.Generator, optional
+        Seed for the projection basis (default: None).
+    chunk_size : int, optional
+        Number of rows projected at a time (default: 4096).
+    sketches : numpy.ndarray, optional
+        Precomputed output of `sketch_signals`, e.g. accumulated over several files.
+
+    Returns
+    -------
+    pairs : numpy.ndarray
+        Index pairs (i, j), i < j, of shape (k, 2).
+    similarity : numpy.ndarray
+        Estimated correlation of each pair, shape (k,).
+
+    Example
+    -------
+    >>> pairs, similarity = find_near_duplicates(dataset, min_similarity=0.99, seed=0)
+    >>> print(f"{len(np.unique(pairs))} signals have a near-duplicate")
+    """
+    if sketches is None:
+        sketches = sketch_signals(waves, n_bits=n_bits, seed=seed, chunk_size=chunk_size)
+    n_bits = sketches.shape[1] * 8
+
+    pairs = _lsh_candidate_pairs(sketches, n_bands, max_bucket_size)
+    hamming = _POPCOUNT[sketches[pairs[:, 0]] ^ sketches[pairs[:, 1]]].sum(axis=1)
+    similarity = np.cos(np.pi * hamming / n_bits)
+
+    keep = similarity >= min_similarity
+    return pairs[keep], similarity[keep]
+
+@lru_cache(maxsize=64)
+def _linear_resampling_grid(src_len, target_len):
+    """
+    Left source index and interpolation weight for every target sample, cached per length pair.
+
+    Target sample i sits at position i * (src_len - 1) / (target_len - 1) on the source grid,
+    i.e. both signals span the same [0, 1] interval as in `interpoling`.
+    """
+    if target_len == 1:
+        positions = np.zeros(1)
+    else:
+        positions = np.arange(target_len) * ((src_len - 1) / (target_len - 1))
+    idx = np.minimum(positions.astype(np.int64), max(src_len - 2, 0))
+    weights = positions - idx
+    idx.setflags(write=False)
+    weights.setflags(write=False)
+    return idx, weights
+
+def resample_signals(signals, target_len=10000, method='linear'):
+    """
+    Resample one signal or a batch of signals to `target_len` samples along the last axis.
+
+    Parameters
+    ----------
+    signals : numpy.ndarray
+        Signal of shape (N,) or batch of shape (n, N).
+    target_len : int, optional
+        Desired output length (default: 10000).
+    method : str, optional
+        - 'linear': linear interpolation between the first and last sample, identical to
+          `interpoling`. Source indices and weights are precomputed and cached per
+          (N, target_len), so resampling is two gathers and a weighted sum.
+        - 'poly': polyphase filtering with `scipy.signal.resample_poly` (anti-aliased, for
+          band-limited signals).
+        - 'fft': Fourier resampling with `scipy.signal.resample` (assumes a periodic signal).
+        Default is 'linear'.
+
+    Returns
+    -------
+    numpy.ndarray
+        Resampled signal(s) with last dimension `target_len`.
+    """
+    signals = np.asarray(signals)
+    src_len = signals.shape[-1]
+
+    if method == 'linear':
+        if src_len == 1:
+            return np.repeat(signals.astype(float), target_len, axis=-1)
+        idx, weights = _linear_resampling_grid(src_len, target_len)
+        left = signals[..., idx]
+        right = signals[..., idx + 1]
+        return left + (right - left) * weights
+    elif method == 'poly':
+        # scipy is only imported when a filtering resampler is actually used
+        from scipy.signal import resample_poly
+        factor = gcd(src_len, target_len)
+        return resample_poly(signals, target_len // factor, src_len // factor, axis=-1)
+    elif method == 'fft':
+        from scipy.signal import resample as fft_resample
+        return fft_resample(signals, target_len, axis=-1)
+    raise ValueError(f"Unknown resampling method '{method}'. Expected 'linear', 'poly' or 'fft'.")
+
 def interpoling(res, target_len=10000):
-    target_indices = np.linspace(0, 1, target_len)
-    original_indices = np.linspace(0, 1, len(res))
-    interpolator = interp1d(original_indices, res, kind='linear')
-    res1_i = interpolator(target_indices)
-    return res1_i
+    return resample_signals(res, target_len=target_len)
 
-def normalization(signal1):
-    signal1_norm = (signal1 - np.mean(signal1)) / np.std(signal1)
-    return signal1_norm
+def _normalize(signal1, axis, out, min_std):
+    signal1 = np.asarray(signal1)
+    mean = np.mean(signal1, axis=axis, keepdims=True)
+    if out is None:
+        out = np.subtract(signal1, mean, dtype=np.result_type(signal1, np.float64))
+    else:
+        np.subtract(signal1, mean, out=out)
+
+    if axis is None:
+        flat = out.ravel()
+        std = np.sqrt(np.dot(flat, flat) / flat.size)
+    else:
+        centered = np.moveaxis(out, axis, -1)
+        std = np.sqrt(np.einsum('...i,...i->...', centered, centered) / centered.shape[-1])
+    if min_std is not None:
+        # np.where also covers the 0-d std of a 1-D signal or of axis=None
+        std = np.where(std <= min_std, 1.0, std)
+    out /= std if axis is None else np.expand_dims(std, axis)
+    return out
+
+def normalization(signal1, axis=None, out=None):
+    """
+    Z-score normalization (zero mean, unit variance) along `axis`.
+
+    Parameters
+    ----------
+    signal1 : numpy.ndarray
+        Signal of shape (N,), or a stack such as (n, N).
+    axis : int, optional
+        Axis along which the mean and std are computed. None (default) uses the whole array,
+        as before; pass -1 to normalize a stack row by row.
+    out : numpy.ndarray, optional
+        Array receiving the result. Pass `signal1` itself to normalize in place.
+
+    Returns
+    -------
+    numpy.ndarray
+        Normalized signal(s). Constant signals give NaN; see `safe_normalization`.
+    """
+    return _normalize(signal1, axis, out, min_std=None)
+
+def safe_normalization(signal1, axis=None, out=None, min_std=0.0):
+    """
+    `normalization` that leaves constant signals at zero instead of dividing by a zero std.
+
+    Signals whose std is at most `min_std` are only mean-centered.
+    """
+    return _normalize(signal1, axis, out, min_std=min_std)
+
+class StreamingNormalizer:
+    """
+    Z-score normalization for signals too large for memory, in two chunked passes.
+
+    The first pass (`update` or `fit`) accumulates the mean and variance over chunks along the
+    last axis; the second (`transform` or `normalize`) applies them chunk by chunk, so a whole
+    memory-mapped dataset is normalized with bounded memory. Chunks may be 1-D, or (n, chunk)
+    to keep separate statistics per row.
+
+    Parameters
+    ----------
+    min_std : float, optional
+        Standard deviations at or below this are replaced by 1, as in `safe_normalization`
+        (default: 0.0).
+
+    Example
+    -------
+    >>> normalizer = StreamingNormalizer().fit(recording)          # recording: numpy.memmap
+    >>> normalizer.normalize(recording, out=normalized_memmap)
+    """
+
+    def __init__(self, min_std=0.0):
+        self.min_std = min_std
+        self.count = 0
+        self._stats = None
+
+    def update(self, chunk):
+        """
+        Add the next chunk to the running mean and variance.
+        """
+        chunk = np.asarray(chunk, dtype=float)
+        if chunk.shape[-1] == 0:
+            return self
+        self._stats = _merge_moments(self._stats, chunk, self.count)
+        self.count += chunk.shape[-1]
+        return self
+
+    @property
+    def mean(self):
+        return self._stats[0]
+
+    @property
+    def std(self):
+        std = np.sqrt(self._stats[1] / self.count)
+        return np.where(std <= self.min_std, 1.0, std)
+
+    def transform(self, chunk, out=None):
+        """
+        Normalize a chunk with the accumulated statistics. `out` may be `chunk` itself.
+        """
+        mean, std = np.asarray(self.mean)[..., None], np.asarray(self.std)[..., None]
+        if out is None:
+            return (np.asarray(chunk, dtype=float) - mean) / std
+        np.subtract(chunk, mean, out=out)
+        out /= std
+        return out
+
+    def fit(self, signal, chunk_size=2**20):
+        """
+        Run `update` over `signal` (e.g. a numpy.memmap) in chunks along the last axis.
+        """
+        for start in range(0, np.shape(signal)[-1], chunk_size):
+            self.update(signal[..., start:start + chunk_size])
+        return self
+
+    def normalize(self, signal, out=None, chunk_size=2**20):
+        """
+        Run `transform` over `signal` in chunks. `out` may be `signal` itself or a writable memmap.
+        """
+        if out is None:
+            out = np.empty(np.shape(signal), dtype=np.float64)
+        for start in range(0, np.shape(signal)[-1], chunk_size):
+            chunk = (Ellipsis, slice(start, start + chunk_size))
+            self.transform(signal[chunk], out=out[chunk])
+        return out
 
 def generate_device_parameters(device_params, drop=False, frequency_follows_amplitude=True, split_ratios=[0.5, 0.5]):
     """
@@ -110,3 +956,235 @@ def generate_device_parameters(device_params, drop=False, frequency_follows_ampl
 
     return split_param_sets
 
+
+def _split_bounds(low, high, ratios, drop):
+    # Same accumulation order as generate_device_parameters, so the results match exactly
+    bounds = np.cumsum(np.concatenate(([low], np.asarray(ratios) * (high - low))))
+    if drop:
+        bounds = bounds[::-1]
+    return tuple(zip(np.minimum(bounds[:-1], bounds[1:]).tolist(), np.maximum(bounds[:-1], bounds[1:]).tolist()))
+
+@lru_cache(maxsize=1024)
+def _domain_splits(amplitude, frequency, banded, drop, frequency_follows_amplitude, split_ratios):
+    def split_range(value_range):
+        return _split_bounds(*value_range, split_ratios, drop)
+
+    def split_frequency(frequency_range):
+        if frequency_follows_amplitude:
+            return split_range(frequency_range)
+        return (frequency_range,) * len(split_ratios)
+
+    if frequency is None:
+        frequency_splits = None
+    elif banded:
+        # Frozen as ((band, range), ...)
+        frequency_splits = tuple((band, split_frequency(frequency_range)) for band, frequency_range in frequency)
+    else:
+        frequency_splits = split_frequency(frequency)
+    return split_range(amplitude), frequency_splits
+
+def generate_domain_parameters(device_params, domain, drop=False, frequency_follows_amplitude=True, split_ratios=(0.5, 0.5)):
+    """
+    Split the parameters of a single device, memoized.
+
+    Equivalent to `[split[domain] for split in generate_device_parameters(...)]`, but only the
+    requested device is processed, its boundaries are computed with array operations, and
+    results are cached on the device's ranges and the split settings. Calling it once per
+    sample with a few recurring split ratios therefore costs little more than a dict lookup.
+
+    Parameters
+    ----------
+    device_params : dict
+        Device table in the format accepted by `generate_device_parameters`.
+    domain : str
+        Device to split.
+    drop : bool, optional
+        If True, the first split gets the upper amplitude range (default: False).
+    frequency_follows_amplitude : bool, optional
+        If True, frequency ranges are split like the amplitude; otherwise every split gets the
+        full frequency range (default: True).
+    split_ratios : sequence of float, optional
+        Proportions of each split, summing to 1.0 (default: (0.5, 0.5)).
+
+    Returns
+    -------
+    List[dict]
+        One {'amplitude': ..., 'frequency': ...} dict per split. The dicts are new on every
+        call and may be modified freely.
+
+    Example
+    -------
+    >>> ratio = np.random.uniform(0.3, 0.7)
+    >>> signal_range, interrupt_range = generate_domain_parameters(EMBEDDED_DEVICE_RANGES, 'Drones',
+    ...                                                            split_ratios=(ratio, 1 - ratio))
+    """
+    split_ratios = tuple(float(ratio) for ratio in split_ratios)
+    # np.isclose(sum, 1.0) without its per-call array overhead
+    if not split_ratios or abs(sum(split_ratios) - 1.0) > 1e-8 + 1e-5:
+        raise ValueError("split_ratios must be a non-empty list and sum to 1.0")
+
+    params = device_params[domain]
+    frequency = params.get('frequency')
+    banded = isinstance(frequency, dict)
+    if banded:
+        frequency = tuple((band, tuple(frequency_range)) for band, frequency_range in frequency.items())
+    elif frequency is not None:
+        frequency = tuple(frequency)
+
+    amplitude_splits, frequency_splits = _domain_splits(tuple(params['amplitude']), frequency, banded, bool(drop),
+                                                        bool(frequency_follows_amplitude), split_ratios)
+
+    result = [{'amplitude': amplitude} for amplitude in amplitude_splits]
+    for i, split in enumerate(result):
+        if banded:
+            split['frequency'] = {band: ranges[i] for band, ranges in frequency_splits}
+        elif frequency_splits is not None:
+            split['frequency'] = frequency_splits[i]
+    return result
+
+class DeviceCatalog:
+    """
+    Device parameter tables compiled into flat arrays for vectorized sampling.
+
+    `EMBEDDED_DEVICE_RANGES`-style tables are nested dicts where a device's frequency is
+    either one range or a dict of ranges keyed by band. The catalog splits them once with
+    `generate_device_parameters` and flattens every (split, device, band) combination into a
+    row of contiguous amplitude and frequency bound arrays, so that whole batches of
+    (domain, band, amplitude, frequency) draws take a few array operations instead of a dict
+    walk per sample.
+
+    Parameters
+    ----------
+    device_params : dict
+        Device table in the format accepted by `generate_device_parameters`.
+    split_ratios : sequence of float, optional
+        Split ratios passed to `generate_device_parameters` (default: (1.0,), i.e. no split).
+    drop : bool, optional
+        Passed to `generate_device_parameters` (default: False).
+    frequency_follows_amplitude : bool, optional
+        Passed to `generate_device_parameters` (default: True).
+
+    Attributes
+    ----------
+    domain_names : numpy.ndarray
+        Device names, in table order.
+    band_names : numpy.ndarray
+        Band key of every row (object array); 0 for devices with a single frequency range,
+        matching the `temp` convention of the interrupt functions.
+    amplitude_bounds, frequency_bounds : numpy.ndarray
+        (n_rows, 2) arrays of lower and upper bounds. Devices without a frequency give NaN.
+
+    Example
+    -------
+    >>> catalog = DeviceCatalog(EMBEDDED_DEVICE_RANGES, split_ratios=[0.5, 0.5])
+    >>> domains, bands, amplitudes, frequencies = catalog.sample(10000, split=0, seed=0)
+    """
+
+    def __init__(self, device_params, split_ratios=(1.0,), drop=False, frequency_follows_amplitude=True):
+        splits = generate_device_parameters(device_params, drop=drop,
+                                            frequency_follows_amplitude=frequency_follows_amplitude,
+                                            split_ratios=list(split_ratios))
+        self.domain_names = np.array(list(device_params))
+        self.n_splits = len(splits)
+
+        domains, bands, amplitude_bounds, frequency_bounds = [], [], [], []
+        for split_params in splits:
+            for d, name in enumerate(self.domain_names):
+                params = split_params[name]
+                frequency = params.get('frequency', (np.nan, np.nan))
+                ranges = frequency.items() if isinstance(frequency, dict) else [(0, frequency)]
+                for band, frequency_range in ranges:
+                    domains.append(d)
+                    bands.append(band)
+                    amplitude_bounds.append(params['amplitude'])
+                    frequency_bounds.append(frequency_range)
+
+        self.domains = np.array(domains, dtype=np.intp)
+        self.band_names = np.empty(len(bands), dtype=object)
+        self.band_names[:] = bands
+        self.amplitude_bounds = np.array(amplitude_bounds, dtype=float)
+        self.frequency_bounds = np.array(frequency_bounds, dtype=float)
+
+        # Rows are laid out split-major, then device, then band
+        self.rows_per_split = len(self.domains) // self.n_splits
+        self.n_bands = np.bincount(self.domains[:self.rows_per_split], minlength=len(self.domain_names))
+        self._offsets = np.concatenate(([0], np.cumsum(self.n_bands)[:-1]))
+        self._domain_index = {name: d for d, name in enumerate(self.domain_names)}
+
+    def __len__(self):
+        return len(self.domains)
+
+    def _domain_indices(self, domain, n, rng):
+        if domain is None:
+            return rng.integers(0, len(self.domain_names), size=n)
+        if isinstance(domain, str):
+            return np.full(n, self._domain_index[domain], dtype=np.intp)
+        domain = np.asarray(domain)
+        if domain.dtype.kind in 'US':
+            domain = np.array([self._domain_index[name] for name in domain])
+        return np.broadcast_to(domain, (n,)).astype(np.intp)
+
+    def rows(self, domain, band_index=0, split=0):
+        """
+        Row indices for domain index(es), band position(s) within the device and split(s).
+        """
+        return np.asarray(split) * self.rows_per_split + self._offsets[domain] + band_index
+
+    def lookup(self, domain, band=0, split=0):
+        """
+        Amplitude and frequency range of one (domain, band, split) as tuples.
+        """
+        d = self._domain_index[domain]
+        start = self.rows(d, 0, split)
+        block = list(self.band_names[start:start + self.n_bands[d]])
+        row = start + block.index(band)
+        return tuple(self.amplitude_bounds[row].tolist()), tuple(self.frequency_bounds[row].tolist())
+
+    def _sample_rows(self, n, split, domain, rng):
+        domain_idx = self._domain_indices(domain, n, rng)
+        band_idx = (rng.random(n) * self.n_bands[domain_idx]).astype(np.intp)
+        return domain_idx, self.rows(domain_idx, band_idx, split)
+
+    def sample_rows(self, n, split=0, domain=None, seed=None):
+        """
+        Draw `n` catalog rows (domain uniform unless given, then band uniform), as `sample`
+        does, without drawing values. Index `domain_names`, `band_names` and the bound arrays
+        with the result.
+        """
+        return self._sample_rows(n, split, domain, _get_rng(seed))[1]
+
+    def sample(self, n, split=0, domain=None, seed=None):
+        """
+        Draw `n` (domain, band, amplitude, frequency) tuples in one vectorized pass.
+
+        The domain is drawn uniformly over devices (unless given), the band uniformly over
+        the device's bands, and amplitude and frequency uniformly within the row's bounds.
+
+        Parameters
+        ----------
+        n : int
+            Number of draws.
+        split : int or array-like, optional
+            Split index, scalar or one per draw (default: 0).
+        domain : str, int or array-like, optional
+            Fix the domain(s) by name or index instead of drawing them (default: None).
+        seed : int or numpy.random.Generator, optional
+            Seed or generator (default: None, follows numpy's global random state).
+
+        Returns
+        -------
+        domains : numpy.ndarray
+            Device names, shape (n,).
+        bands : numpy.ndarray
+            Band keys (0 for single-range devices), object array of shape (n,).
+        amplitudes, frequencies : numpy.ndarray
+            Sampled values, shape (n,).
+        """
+        rng = _get_rng(seed)
+        domain_idx, rows = self._sample_rows(n, split, domain, rng)
+
+        amp_lo, amp_hi = self.amplitude_bounds[rows].T
+        freq_lo, freq_hi = self.frequency_bounds[rows].T
+        amplitudes = amp_lo + rng.random(n) * (amp_hi - amp_lo)
+        frequencies = freq_lo + rng.random(n) * (freq_hi - freq_lo)
+        return self.domain_names[domain_idx], self.band_names[rows], amplitudes, frequencies
@@ -1,13 +1,16 @@
-from .baseline_drift import (apply_baseline_drift_region, apply_baseline_drift_polynomial, 
-                            apply_baseline_drift_piecewise, apply_baseline_drift_quadratic, 
-                            apply_baseline_drift_middle_peak)
+import importlib
 
-from .variations import (generate_parameter_variations, generate_variation)
-
-from .transformations import (apply_time_shift, apply_time_warp, apply_gain_variation,
-                            apply_amplitude_modulation, apply_baseline_drift, 
-                            apply_amplitude_modulation_region, transform_wave_with_score,
-                            apply_nonlinear_distortion, apply_quantization_noise)
+# Public names and the submodule defining them, imported on first access (PEP 562)
+_LAZY_ATTRS = {
+    **dict.fromkeys(['apply_baseline_drift_region', 'apply_baseline_drift_polynomial',
+                     'apply_baseline_drift_piecewise', 'apply_baseline_drift_quadratic',
+                     'apply_baseline_drift_middle_peak'], 'baseline_drift'),
+    **dict.fromkeys(['generate_parameter_variations', 'generate_variation'], 'variations'),
+    **dict.fromkeys(['apply_time_shift', 'apply_time_warp', 'apply_gain_variation',
+                     'apply_amplitude_modulation', 'apply_baseline_drift',
+                     'apply_amplitude_modulation_region', 'transform_wave_with_score',
+                     'apply_nonlinear_distortion', 'apply_quantization_noise'], 'transformations'),
+}
 
 __all__ = ['apply_baseline_drift_region', 'apply_baseline_drift_polynomial', 
             'apply_baseline_drift_piecewise', 'apply_baseline_drift_quadratic', 
@@ -15,4 +18,14 @@ __all__ = ['apply_baseline_drift_region', 'apply_baseline_drift_polynomial',
             'apply_time_shift', 'apply_time_warp', 'apply_gain_variation',
             'apply_amplitude_modulation', 'apply_baseline_drift', 
             'apply_amplitude_modulation_region', 'transform_wave_with_score',
-            'apply_nonlinear_distortion', 'apply_quantization_noise']
\ No newline at end of file
+            'apply_nonlinear_distortion', 'apply_quantization_noise']
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(f'.{_LAZY_ATTRS[name]}', __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,3 +1,5 @@
+import random
+
 import numpy as np
 import pytest
 from SigVarGen import generate_signal
@@ -10,8 +12,11 @@ from SigVarGen import (
     add_main_interrupt,
     add_smaller_interrupts,
     add_interrupt_with_params,
-    add_interrupt_bursts
+    add_interrupt_bursts,
+    InterruptLabels,
+    interrupt_mask,
 )
+from SigVarGen.signal.interrupt_labels import INTERRUPT_TYPES
 
 # -------------------------------------
 # Tests for get_non_overlapping_interval
@@ -315,6 +320,24 @@ def test_add_main_interrupt_with_complex_iter(sample_time_vector, sample_device_
     assert all('sinusoids_params' in p for p in interrupt_params), "Each interrupt should have sinusoid parameters"
     assert np.any(modified_signal != base_signal), "Signal should be modified"
 
+def test_add_main_interrupt_mask(sample_time_vector, sample_device_params, sample_interrupt_ranges_rise):
+    """
+    The mask marks the main interrupt with code 1 and its overlapping parts with code 2.
+    """
+    t = sample_time_vector
+    modified_signal, interrupt_params, _, mask = add_main_interrupt(
+        t, np.zeros_like(t), "DeviceA", sample_device_params, sample_interrupt_ranges_rise, "low",
+        duration_ratio=0.1, complex_iter=2, mask_format='codes'
+    )
+
+    expected = np.zeros(len(t), dtype=np.uint8)
+    for p in sorted(interrupt_params, key=lambda p: p['type']):
+        expected[p['start_idx']:p['start_idx'] + p['duration_idx']] = 1 if p['type'] == 'main' else 2
+    assert mask.dtype == np.uint8
+    np.testing.assert_array_equal(mask, expected)
+    assert np.all(modified_signal[mask == 0] == 0), "Samples outside the mask should be untouched"
+
+
 # -------------------------------------
 # Tests for add_smaller_interrupts
 # -------------------------------------
@@ -435,6 +458,34 @@ def test_add_smaller_interrupts_with_drop(sample_time_vector, sample_interrupt_r
     assert len(interrupt_params) == 1, "One small interrupt should be added"
     assert interrupt_params[0]['type'] == 'small', "Interrupt should be classified as 'small'"
 
+def test_add_smaller_interrupts_skips_clipped_interrupt(sample_time_vector, sample_interrupt_ranges_rise, monkeypatch):
+    """
+    An interrupt clipped to one sample at the signal end is skipped; earlier ones are kept and masked.
+    """
+    t = sample_time_vector
+    positions = iter([(100, 150), (len(t) - 1, len(t)), (300, 340)])
+    monkeypatch.setattr("SigVarGen.signal.response_signals.place_interrupt", lambda *args, **kwargs: next(positions))
+
+    modified_signal, interrupt_params, mask = add_smaller_interrupts(
+        t=t,
+        base_signal=np.zeros_like(t),
+        INTERRUPT_RANGES=sample_interrupt_ranges_rise,
+        domain="DeviceA",
+        temp="low",
+        n_smaller_interrupts=3,
+        occupied_intervals=[],
+        disperse=False,
+        drop=False,
+        small_duration_ratio=0.05,
+        mask_format='codes'
+    )
+
+    assert [(p['start_idx'], p['duration_idx']) for p in interrupt_params] == [(100, 50), (300, 40)]
+    expected = np.zeros(len(t), dtype=np.uint8)
+    expected[100:150] = expected[300:340] = INTERRUPT_TYPES.index('small') + 1
+    np.testing.assert_array_equal(mask, expected)
+    assert modified_signal[len(t) - 1] == 0
+
 def test_add_multiple_smaller_interrupts(sample_time_vector, sample_interrupt_ranges_rise):
     """
     Test adding multiple smaller interrupts.
@@ -544,6 +595,65 @@ def test_add_interrupt_with_params_long_response(sample_time_vector, sample_devi
     assert modified_signal.shape == base_signal.shape, "Signal length should remain unchanged"
     assert len(interrupt_params) == 1, "Only one interrupt should be added"
 
+def test_add_interrupt_with_params_columnar(sample_time_vector, sample_device_params, sample_interrupt_ranges_rise):
+    """
+    Columnar labels hold the same metadata as the dicts, with shared sinusoid lists stored once.
+    """
+    t = sample_time_vector
+    np.random.seed(7)
+    random.seed(7)
+    _, params = add_interrupt_with_params(t, np.zeros_like(t), "DeviceA", sample_device_params,
+                                          sample_interrupt_ranges_rise, "low", complex_iter=2, n_smaller_interrupts=2)
+    np.random.seed(7)
+    random.seed(7)
+    _, labels = add_interrupt_with_params(t, np.zeros_like(t), "DeviceA", sample_device_params,
+                                          sample_interrupt_ranges_rise, "low", complex_iter=2, n_smaller_interrupts=2,
+                                          columnar=True)
+
+    assert isinstance(labels, InterruptLabels)
+    assert len(labels) == len(params)
+    np.testing.assert_array_equal(labels.start_idx, [p['start_idx'] for p in params])
+    np.testing.assert_array_equal(labels.type_names, [p['type'] for p in params])
+    assert labels.to_params() == params
+
+    # main and main_overlapping entries share one sinusoid set
+    shared = {id(p['sinusoids_params']) for p in params}
+    assert len(labels.set_offsets) - 1 == len(shared)
+    rebuilt = labels.to_params()
+    main_lists = {id(p['sinusoids_params']) for p in rebuilt if p['type'].startswith('main')}
+    assert len(main_lists) == 1
+
+def test_interrupt_labels_concatenate_and_serialize(tmp_path):
+    """
+    Concatenated labels renumber samples and sinusoid sets and survive pickling and saving.
+    """
+    import pickle
+
+    sinusoids = [{'amp': 1.0, 'freq': 5.0, 'phase': 0.1}, {'amp': 0.5, 'freq': 9.0, 'phase': 2.0}]
+    first = InterruptLabels.from_params([
+        {'start_idx': 10, 'duration_idx': 40, 'offset': 0.3, 'sinusoids_params': sinusoids, 'type': 'main'},
+        {'start_idx': 20, 'duration_idx': 10, 'offset': 0.1, 'sinusoids_params': sinusoids, 'type': 'main_overlapping'},
+    ])
+    empty = InterruptLabels.from_params([])
+    second = InterruptLabels.from_params([
+        {'start_idx': 70, 'duration_idx': 5, 'offset': -0.2, 'sinusoids_params': sinusoids[:1], 'type': 'small'},
+    ])
+    labels = InterruptLabels.concatenate([first, empty, second])
+
+    assert labels.n_samples == 3
+    np.testing.assert_array_equal(labels.sample, [0, 0, 2])
+    np.testing.assert_array_equal(labels.sinusoid_set, [0, 0, 1])
+    np.testing.assert_array_equal(labels.sinusoids_of(2)['freq'], [5.0])
+    assert labels.to_params(sample=1) == []
+    assert labels.to_params(sample=2)[0]['sinusoids_params'] == sinusoids[:1]
+
+    restored = pickle.loads(pickle.dumps(labels, protocol=5))
+    np.testing.assert_array_equal(restored.sinusoids, labels.sinusoids)
+    labels.save(tmp_path / 'labels.npz')
+    loaded = InterruptLabels.load(tmp_path / 'labels.npz')
+    assert loaded.n_samples == 3
+    assert loaded.to_params(sample=0) == first.to_params()
+
 # -------------------------------------
 # --- Tests for add_interrupt_bursts ---
 # -------------------------------------
@@ -738,3 +848,57 @@ def test_add_interrupt_bursts_non_overlap_enforced(sample_time_vector, sample_de
     # Ensure final signal is within device limits
     assert np.min(modified_signal) >= device_min, f"Signal should not go below device minimum {device_min}"
     assert np.max(modified_signal) <= device_max, f"Signal should not exceed device maximum {device_max}"
+
+def test_add_interrupt_bursts_mask(sample_time_vector, sample_device_params):
+    """
+    Burst masks use the 'burst' bit of the packed format and nothing else.
+    """
+    t = sample_time_vector
+    _, packed = add_interrupt_bursts(t, np.zeros_like(t), "DeviceA", sample_device_params, -10, 10, "low",
+                                     n_small_interrupts=5, non_overlap=True, mask_format='packed')
+    bits = np.unpackbits(packed, axis=-1, count=len(t)).astype(bool)
+    assert packed.shape == (4, -(-len(t) // 8))
+    assert not bits[:3].any()
+    assert bits[3].any()
+
+# -------------------------------------
+# Tests for interrupt masks
+# -------------------------------------
+
+def test_interrupt_mask_matches_loop():
+    rng = np.random.default_rng(0)
+    length = 101
+    starts = rng.integers(0, length, 30)
+    durations = rng.integers(0, 20, 30)
+    types = rng.integers(0, 4, 30)
+
+    codes = interrupt_mask(starts, durations, types, length)
+    bits = np.unpackbits(interrupt_mask(starts, durations, types, length, mask_format='packed'),
+                         axis=-1, count=length).astype(bool)
+
+    expected_bits = np.zeros((4, length), dtype=bool)
+    for s, d, k in zip(starts, durations, types):
+        expected_bits[k, s:s + d] = True
+    expected_codes = np.zeros(length, dtype=np.uint8)
+    for k in range(4):
+        expected_codes[expected_bits[k]] = k + 1
+    np.testing.assert_array_equal(bits, expected_bits)
+    np.testing.assert_array_equal(codes, expected_codes)
+
+    with pytest.raises(ValueError):
+        interrupt_mask(starts, durations, types, length, mask_format='dense')
+
+def test_interrupt_labels_masks_match_per_sample():
+    params = [
+        [{'start_idx': 5, 'duration_idx': 10, 'offset': 0.0, 'type': 'main'},
+         {'start_idx': 8, 'duration_idx': 3, 'offset': 0.0, 'type': 'main_overlapping'}],
+        [],
+        [{'start_idx': 0, 'duration_idx': 4, 'offset': 0.0, 'type': 'small'}],
+    ]
+    labels = InterruptLabels.concatenate(InterruptLabels.from_params(p) for p in params)
+    masks = labels.masks(30)
+    assert masks.shape == (3, 30)
+    for i, p in enumerate(params):
+        np.testing.assert_array_equal(masks[i], interrupt_mask([q['start_idx'] for q in p], [q['duration_idx'] for q in p],
+                                                               [q['type'] for q in p] or np.zeros(0, int), 30))
+    assert labels.masks(30, mask_format='packed').shape == (3, 4, 4)
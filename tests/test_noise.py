@@ -1,13 +1,22 @@
+import gc
+
 import numpy as np
 import pytest
 from SigVarGen import (
     generate_noise_power,
+    generate_noise_power_batch,
     add_colored_noise,
     envelope_linear,
     envelope_sine,
     envelope_random_walk,
     envelope_blockwise,
-    apply_time_shift 
+    EnvelopeSpec,
+    apply_time_shift,
+    ColoredNoiseStream,
+    NoiseBank,
+    harmonic_peaks,
+    HarmonicPeaksFilter,
+    MeasuredNoiseColor
 )
 
 # Noise tests generated with OpenAI o3-mini-high 
@@ -79,6 +88,22 @@ def test_generate_noise_power_fixed_snr():
     assert np.allclose(noise_power, expected_noise_power, atol=1e-8), "Noise power calculation is incorrect for fixed SNR"
 
 
+def test_generate_noise_power_batch():
+    """
+    Verify that one SNR is drawn per row and each row's noise power matches generate_noise_power.
+    """
+    waves = np.random.randn(6, 1000) * np.arange(1, 7)[:, None]
+    noise_power, snr_used = generate_noise_power_batch(waves, snr_range=(-10, 20))
+    assert noise_power.shape == snr_used.shape == (6,)
+    assert np.all((snr_used >= -10) & (snr_used <= 20))
+    assert len(np.unique(snr_used)) == 6, "Each row should get its own SNR"
+    expected = (np.std(waves, axis=1) * 10 ** (-snr_used / 20)) ** 2
+    np.testing.assert_allclose(noise_power, expected)
+
+    fixed_power, fixed_snr = generate_noise_power_batch(waves, snr_range=(-30, -30))
+    for wave, power in zip(waves, fixed_power):
+        assert np.isclose(power, generate_noise_power(wave, (-30, -30))[0])
+
 # -------------------------------------
 # Tests for add_colored_noise
 # -------------------------------------
@@ -217,3 +242,321 @@ def test_envelope_blockwise():
     
     # Check that each block's value is within the specified range.
     assert np.all(env >= npw_range[0]) and np.all(env <= npw_range[1]), "Envelope block values should be within bounds."
+
+@pytest.mark.parametrize("func, param", [
+    (envelope_linear, True),
+    (envelope_sine, 0.005),
+    (envelope_random_walk, 0.01),
+    (envelope_blockwise, 10),
+])
+def test_envelope_batch_shape(func, param):
+    """
+    Test that every noise_funcs envelope accepts an (n_envelopes, num_samples) request.
+    """
+    env = func(num_samples=55, npw=(0, 1), param=param, n_envelopes=4)
+    assert env.shape == (4, 55), "Batched envelope shape mismatch."
+    assert np.all(env >= -1e-8) and np.all(env <= 1 + 1e-8), "Batched envelope values exceed specified bounds."
+
+def test_envelope_blockwise_batch_blocks():
+    """
+    Test that each row of a batched blockwise envelope is piecewise constant with its own values.
+    """
+    np.random.seed(7)
+    env = envelope_blockwise(55, (0, 1), param=10, n_envelopes=3)
+    blocks = env[:, :50].reshape(3, 5, 10)
+    assert np.allclose(blocks, blocks[..., :1]), "Blocks are not constant within a row."
+    assert np.allclose(env[:, 50:], env[:, 50:51]), "Remainder block is not constant."
+    assert not np.allclose(env[0], env[1]), "Rows should be drawn independently."
+
+def test_envelope_sine_shift_folded_into_phase():
+    """
+    Test that the sine envelope matches a phase-shifted sine with a shift in [-max_shift, max_shift).
+    """
+    np.random.seed(3)
+    env = envelope_sine(200, (0, 2), param=0.01, max_shift=50)
+    np.random.seed(3)
+    shift = np.random.randint(-50, 50)
+    expected = 1 + np.sin(2 * np.pi * 0.01 * (np.arange(200) - shift))
+    assert np.allclose(env, expected), "Sine envelope shift should be applied through the phase."
+
+def test_envelope_sine_zero_max_shift():
+    """
+    Test that max_shift=0 means no shift, for single and batched envelopes.
+    """
+    expected = 1 + np.sin(2 * np.pi * 0.01 * np.arange(200))
+    assert np.allclose(envelope_sine(200, (0, 2), param=0.01, max_shift=0), expected)
+    batch = envelope_sine(200, (0, 2), param=0.01, max_shift=0, n_envelopes=3)
+    assert batch.shape == (3, 200) and np.allclose(batch, expected)
+
+# -------------------------------------
+# Tests for ColoredNoiseStream
+# -------------------------------------
+
+@pytest.mark.parametrize("color", ["white", "pink", "brown", "blue", "violet"])
+def test_colored_noise_stream_power(color):
+    """
+    Test that the stationary output of the stream has the requested noise power.
+    """
+    stream = ColoredNoiseStream(color, noise_power=0.01, seed=0)
+    noise = stream.generate(200000)
+    assert noise.shape == (200000,)
+    assert np.isclose(np.var(noise), 0.01, rtol=0.2), f"Stream variance {np.var(noise)} differs from noise_power."
+
+@pytest.mark.parametrize("color", ["white", "pink", "brown", "blue", "violet"])
+def test_colored_noise_stream_chunk_continuity(color):
+    """
+    Test that chunked generation reproduces one long draw exactly.
+    """
+    whole = ColoredNoiseStream(color, seed=1).generate(1000)
+    stream = ColoredNoiseStream(color, seed=1)
+    rng = stream.rng
+    chunks = [stream.generate(n) for n in (1, 250, 0, 749)]
+    assert stream.rng is rng
+    assert np.allclose(np.concatenate(chunks), whole), "Chunks should join into a continuous realization."
+
+def test_colored_noise_stream_spectral_slope():
+    """
+    Test that pink noise carries more low- than high-frequency power, and blue the opposite.
+    """
+    for color, low_dominates in (("pink", True), ("blue", False)):
+        noise = ColoredNoiseStream(color, seed=2).generate(1 << 16)
+        spectrum = np.abs(np.fft.rfft(noise)) ** 2
+        low, high = spectrum[1:1000].mean(), spectrum[-1000:].mean()
+        assert (low > high) == low_dominates, f"Unexpected spectral tilt for {color} noise."
+
+def test_colored_noise_stream_add_to_in_place(zero_wave):
+    """
+    Test that add_to writes the noisy signal into the provided output array.
+    """
+    out = zero_wave.copy()
+    stream = ColoredNoiseStream('pink', noise_power=0.01, seed=3)
+    res = stream.add_to(out, out=out, chunk_size=64)
+    assert res is out
+    assert np.allclose(out, ColoredNoiseStream('pink', noise_power=0.01, seed=3).generate(len(zero_wave)))
+
+def test_colored_noise_stream_invalid_color():
+    with pytest.raises(ValueError):
+        ColoredNoiseStream('green')
+
+# -------------------------------------
+# Tests for NoiseBank
+# -------------------------------------
+
+def test_noise_bank_draw_power():
+    """
+    Test that served windows have zero mean and exactly the requested noise power.
+    """
+    bank = NoiseBank(num_samples=1000, fs=1, colors=('pink', 'brown'), bank_factor=8, seed=0)
+    noise = bank.draw('pink', noise_power=0.01)
+    assert noise.shape == (1000,)
+    assert np.isclose(np.mean(noise), 0, atol=1e-10)
+    assert np.isclose(np.var(noise), 0.01)
+
+    batch = bank.draw('brown', noise_power=[0.01, 0.04, 1.0], n=3)
+    assert batch.shape == (3, 1000)
+    assert np.allclose(np.var(batch, axis=1), [0.01, 0.04, 1.0])
+
+def test_noise_bank_windows_come_from_realization():
+    """
+    Test that each served window is a sign-flipped, rescaled slice of the stored realization.
+    """
+    bank = NoiseBank(num_samples=100, fs=1, colors=('pink',), bank_factor=4, seed=1)
+    noise, offsets, signs = bank.draw('pink', n=5, return_offsets=True)
+    realization = bank._banks['pink']
+    for row, offset, sign in zip(noise, offsets, signs):
+        window = realization[offset:offset + 100]
+        window = sign * (window - window.mean()) / window.std()
+        assert np.allclose(row, window)
+
+def test_noise_bank_memmap(tmp_path):
+    bank = NoiseBank(num_samples=100, fs=1, colors=('white',), bank_factor=2, memmap_dir=str(tmp_path), seed=2)
+    assert isinstance(bank._banks['white'], np.memmap)
+    assert bank.draw('white', n=2).shape == (2, 100)
+
+def test_noise_bank_memmap_files_do_not_collide(tmp_path):
+    first = NoiseBank(num_samples=100, fs=1, colors=('white',), bank_factor=2, memmap_dir=str(tmp_path), seed=4)
+    second = NoiseBank(num_samples=100, fs=1, colors=('white',), bank_factor=2, memmap_dir=str(tmp_path), seed=5)
+    assert first._banks['white'].filename != second._banks['white'].filename
+    assert not np.array_equal(first._banks['white'], second._banks['white'])
+
+def test_noise_bank_close_removes_memmap_files(tmp_path):
+    bank = NoiseBank(num_samples=100, fs=1, colors=('white', 'pink'), bank_factor=2, memmap_dir=str(tmp_path), seed=6)
+    assert len(list(tmp_path.iterdir())) == 2
+    bank.close()
+    assert list(tmp_path.iterdir()) == [] and bank.closed
+    bank.close()
+    with pytest.raises(ValueError):
+        bank.draw('white')
+
+    with NoiseBank(num_samples=100, fs=1, colors=('white',), bank_factor=2, memmap_dir=str(tmp_path), seed=7) as bank:
+        assert bank.draw('white', n=2).shape == (2, 100)
+    assert list(tmp_path.iterdir()) == []
+
+    NoiseBank(num_samples=100, fs=1, colors=('white',), bank_factor=2, memmap_dir=str(tmp_path), seed=8)
+    gc.collect()
+    assert list(tmp_path.iterdir()) == []
+
+def test_noise_bank_unknown_color():
+    bank = NoiseBank(num_samples=100, fs=1, colors=('pink',), bank_factor=2, seed=3)
+    with pytest.raises(KeyError):
+        bank.draw('brown')
+
+def test_noise_bank_diagnostics():
+    """
+    Test that the diagnostic reports sensible overlap and correlation statistics.
+    """
+    bank = NoiseBank(num_samples=200, fs=1, colors=('brown',), bank_factor=4, seed=4)
+    stats = bank.diagnostics('brown', n_windows=64)
+    assert 0 < stats['overlap_probability'] <= 1
+    assert 0 <= stats['mean_overlap'] <= stats['max_overlap'] <= 1
+    assert 0 <= stats['mean_abs_corr'] <= stats['max_abs_corr'] <= 1 + 1e-12
+    assert stats['mean_abs_corr_overlapping'] > stats['mean_abs_corr_disjoint']
+
+def test_add_colored_noise_with_noise_bank(zero_wave):
+    bank = NoiseBank(num_samples=len(zero_wave), fs=1, colors=('pink',), bank_factor=4, seed=5)
+    res, noise = add_colored_noise(zero_wave, 1, 0.01, (1, 1), (1, 1), color='pink', noise_bank=bank)
+    assert res.shape == zero_wave.shape
+    assert np.isclose(np.var(noise), 0.01)
+
+    short_bank = NoiseBank(num_samples=10, fs=1, colors=('pink',), bank_factor=2, seed=5)
+    with pytest.raises(ValueError):
+        add_colored_noise(zero_wave, 1, 0.01, (1, 1), (1, 1), color='pink', noise_bank=short_bank)
+
+    other_fs_bank = NoiseBank(num_samples=len(zero_wave), fs=1000, colors=('pink',), bank_factor=2, seed=5)
+    with pytest.raises(ValueError, match="sampling frequency"):
+        add_colored_noise(zero_wave, 1, 0.01, (1, 1), (1, 1), color='pink', noise_bank=other_fs_bank)
+
+# -------------------------------------
+# Tests for harmonic_peaks
+# -------------------------------------
+
+def test_harmonic_peaks_matches_full_evaluation():
+    """
+    Test that the windowed evaluation matches the full Gaussian sum within the truncation error.
+    """
+    freqs = np.fft.rfftfreq(4096, d=1/1000)
+    freqs[0] = freqs[1]
+    windowed = harmonic_peaks(freqs, base_freq=100, num_harmonics=5, width=5)
+    full = harmonic_peaks(freqs, base_freq=100, num_harmonics=5, width=5, k=None)
+    expected = sum(np.exp(-((freqs - 100 * i) ** 2) / (2 * 5**2)) for i in range(1, 6))
+    assert windowed.shape == freqs.shape
+    assert np.allclose(full, expected)
+    assert np.allclose(windowed, expected, atol=1e-7)
+
+def test_harmonic_peaks_overlapping_and_out_of_band():
+    """
+    Test that overlapping peaks add up and harmonics above the last bin are ignored.
+    """
+    freqs = np.fft.rfftfreq(1000, d=1/100)
+    filter = harmonic_peaks(freqs, base_freq=2, num_harmonics=40, width=3)
+    expected = sum(np.exp(-((freqs - 2 * i) ** 2) / (2 * 3**2)) for i in range(1, 41))
+    assert np.allclose(filter, expected, atol=1e-6)
+
+def test_harmonic_peaks_filter_cache(zero_wave):
+    """
+    Test that HarmonicPeaksFilter caches per frequency grid and works as a color callable.
+    """
+    color = HarmonicPeaksFilter(base_freq=50, num_harmonics=3, width=2)
+    freqs = np.fft.rfftfreq(1000, d=1/1000)
+    first = color(freqs)
+    assert color(freqs.copy()) is first
+    assert color(np.fft.rfftfreq(500, d=1/1000)) is not first
+    assert np.allclose(first, harmonic_peaks(freqs, 50, 3, 2))
+
+    res, _ = add_colored_noise(zero_wave, 1000, 0.01, (1, 1), (1, 1), color=color)
+    assert res.shape == zero_wave.shape
+    assert np.isclose(np.mean(res**2), 0.01, rtol=0.2)
+
+def test_cached_spectral_filter_requires_compute():
+    """
+    Test that a filter without `_compute` fails when it is created, not when it is first called.
+    """
+    from SigVarGen.noise.noise import _CachedSpectralFilter
+
+    class Incomplete(_CachedSpectralFilter):
+        pass
+
+    with pytest.raises(TypeError):
+        _CachedSpectralFilter()
+    with pytest.raises(TypeError):
+        Incomplete()
+
+# -------------------------------------
+# Tests for MeasuredNoiseColor
+# -------------------------------------
+
+def test_measured_noise_color_reproduces_spectrum():
+    """
+    Test that noise shaped from a measured brown-noise recording keeps its low-frequency tilt.
+    """
+    np.random.seed(0)
+    recording, _ = add_colored_noise(np.zeros(1 << 15), 1000, 1.0, (1, 1), (1, 1), color='brown')
+    color = MeasuredNoiseColor(recording=recording, fs=1000, nperseg=1024)
+
+    _, noise = add_colored_noise(np.zeros(1 << 14), 1000, 0.01, (1, 1), (1, 1), color=color)
+    spectrum = np.abs(np.fft.rfft(noise)) ** 2
+    assert np.isclose(np.var(noise), 0.01)
+    assert spectrum[1:200].mean() > 100 * spectrum[-2000:].mean(), "Measured brown tilt should be reproduced."
+
+def test_measured_noise_color_from_psd_and_cache():
+    """
+    Test interpolation of a precomputed PSD and caching per frequency grid.
+    """
+    color = MeasuredNoiseColor(psd=np.array([4.0, 1.0, 0.0]), psd_freqs=np.array([0.0, 10.0, 20.0]))
+    freqs = np.array([0.0, 5.0, 10.0, 15.0, 30.0])
+    assert np.allclose(color(freqs), [2.0, 1.5, 1.0, 0.5, 0.0])
+    assert color(freqs.copy()) is color(freqs)
+
+@pytest.mark.parametrize("kwargs", [
+    {},
+    {'recording': np.zeros(10)},
+    {'psd': np.ones(3)},
+    {'psd': np.ones(3), 'psd_freqs': np.array([0.0, 2.0, 1.0])},
+    {'psd': -np.ones(3), 'psd_freqs': np.arange(3.0)},
+    {'recording': np.zeros(10), 'fs': 1, 'psd': np.ones(3), 'psd_freqs': np.arange(3.0)},
+])
+def test_measured_noise_color_invalid(kwargs):
+    with pytest.raises(ValueError):
+        MeasuredNoiseColor(**kwargs)
+
+# -------------------------------------
+# EnvelopeSpec
+# -------------------------------------
+
+def test_envelope_spec_is_immutable():
+    """
+    Test that specs cannot be modified in place, but can derive new ranges.
+    """
+    spec = EnvelopeSpec(envelope_sine, [0.001, 0.01])
+    assert spec['param'] == (0.001, 0.01) and spec['func'] is envelope_sine
+    with pytest.raises(AttributeError):
+        spec.param = (0, 1)
+    with pytest.raises(TypeError):
+        spec['param'][0] = 0.5
+
+    narrowed = spec.with_param(0.002, 0.003)
+    assert narrowed.param == (0.002, 0.003) and spec.param == (0.001, 0.01)
+    with pytest.raises(ValueError):
+        EnvelopeSpec(envelope_sine, [0.1])
+
+def test_envelope_spec_sample_and_pickle():
+    import pickle
+    spec = EnvelopeSpec(envelope_blockwise, (50, 1000))
+    values = [spec.sample(np.random.default_rng(i)) for i in range(20)]
+    assert all(50 <= v <= 1000 for v in values)
+    assert spec.sample(3) == spec.sample(3)
+    assert pickle.loads(pickle.dumps(spec)) == spec
+    assert spec.envelope(100, (0.5, 1.5), rng=0, n_envelopes=2).shape == (2, 100)
+
+def test_envelope_spec_sample_reversed_range():
+    # config.noise_funcs uses (True, False) for the linear envelope direction
+    spec = EnvelopeSpec(envelope_linear, (True, False))
+    values = [spec.sample(i) for i in range(20)]
+    assert all(0 <= v <= 1 for v in values)
+
+def test_noise_funcs_entries_work_with_add_colored_noise(sample_wave):
+    from SigVarGen import noise_funcs
+    for spec in noise_funcs:
+        res, noise = add_colored_noise(sample_wave, 1000, 0.01, (1, 1), (1, 1), color='white', mod_envelope=spec)
+        assert res.shape == sample_wave.shape
+    assert all(spec is None or isinstance(spec, EnvelopeSpec) for spec in noise_funcs)
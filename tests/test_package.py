@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+import SigVarGen
+import SigVarGen.noise
+import SigVarGen.signal
+import SigVarGen.variations
+
+IMPORT_TIME_BUDGET = 0.5  # seconds, generous to stay stable on loaded CI machines
+
+def _run_fresh(code):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(SigVarGen.__file__)))
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, cwd=root)
+    return result.stdout.split()
+
+def test_import_time_budget():
+    elapsed, heavy = _run_fresh(
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import SigVarGen\n"
+        "elapsed = time.perf_counter() - start\n"
+        "heavy = [m for m in ('numpy', 'scipy', 'SigVarGen.utils', 'SigVarGen.config') if m in sys.modules]\n"
+        "print(elapsed, ','.join(heavy) or '-')\n"
+    )
+    assert heavy == '-', f"eagerly imported: {heavy}"
+    assert float(elapsed) < IMPORT_TIME_BUDGET
+
+def test_scipy_deferred_until_used():
+    before, after = _run_fresh(
+        "import sys\n"
+        "from SigVarGen import interpoling, resample_signals, add_colored_noise, ColoredNoiseStream\n"
+        "interpoling([0.0, 1.0, 2.0], target_len=10)\n"
+        "print('scipy' in sys.modules)\n"
+        "resample_signals([0.0, 1.0, 2.0, 3.0], target_len=8, method='fft')\n"
+        "print('scipy' in sys.modules)\n"
+    )
+    assert (before, after) == ('False', 'True')
+
+@pytest.mark.parametrize("package", [SigVarGen, SigVarGen.noise, SigVarGen.signal, SigVarGen.variations])
+def test_lazy_names_cover_all(package):
+    lazy = set(package._LAZY_ATTRS) | set(getattr(package, '_SUBMODULES', ()))
+    assert set(package.__all__) <= lazy
+    assert set(package.__all__) <= set(dir(package))
+
+def test_lazy_attribute_access():
+    from SigVarGen import generate_signal, NoiseBank, apply_time_shift, calculate_SNR, param_sweeps
+    from SigVarGen.signal.signal_generation import generate_signal as direct
+    assert generate_signal is direct
+    assert SigVarGen.NoiseBank is NoiseBank is SigVarGen.noise.NoiseBank
+    assert SigVarGen.variations.apply_time_shift is apply_time_shift
+    assert callable(calculate_SNR) and isinstance(param_sweeps, dict)
+
+    with pytest.raises(AttributeError):
+        SigVarGen.not_a_function
+    with pytest.raises(AttributeError):
+        SigVarGen.noise.not_a_function
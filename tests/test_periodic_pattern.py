@@ -2,7 +2,9 @@ import numpy as np
 import random
 import pytest
 
-from SigVarGen import add_periodic_interrupts, generate_semi_periodic_signal
+from SigVarGen import (add_periodic_interrupts, generate_semi_periodic_signal,
+                       generate_semi_periodic_signals, unpack_semi_periodic_signals,
+                       generate_semi_periodic_rle, signal_to_rle, rle_to_signal, add_periodic_interrupts_rle)
 
 # -------------------------------------
 # Tests for add_periodic_interrupts
@@ -288,3 +290,223 @@ def test_generate_semi_periodic_signal_flip_probability():
     # Count differences between the two signals.
     flips = np.sum(signal_low_flip != signal_high_flip)
     assert flips > 0, "Higher flip probability should result in more bit flips"
+
+def test_generate_semi_periodic_signal_does_not_reseed_global_state():
+    """
+    Test that a seed only affects a local generator, not the global numpy random state.
+    """
+    np.random.seed(0)
+    expected = np.random.rand(5)
+    np.random.seed(0)
+    generate_semi_periodic_signal(length=200, seed=42)
+    np.testing.assert_array_equal(np.random.rand(5), expected)
+
+def test_generate_semi_periodic_signal_global_seed_reproducible():
+    """
+    Test that without a seed, np.random.seed still makes the signal reproducible.
+    """
+    np.random.seed(7)
+    signal1 = generate_semi_periodic_signal(length=200)
+    np.random.seed(7)
+    signal2 = generate_semi_periodic_signal(length=200)
+    np.testing.assert_array_equal(signal1, signal2)
+
+@pytest.mark.parametrize("sparse", [True, False])
+def test_generate_semi_periodic_signal_flip_rate(sparse):
+    """
+    Test that both sampling modes flip bits at the requested rate.
+    """
+    length = 200000
+    base = generate_semi_periodic_signal(length=length, flip_probability=0.0, seed=1)
+    signal = generate_semi_periodic_signal(length=length, flip_probability=0.05, seed=1, sparse=sparse)
+    assert set(np.unique(signal)) <= {0, 1}
+    assert np.isclose(np.mean(signal != base), 0.05, atol=0.003)
+
+@pytest.mark.parametrize("flip_probability", [0.0, 1.0])
+def test_generate_semi_periodic_signal_sparse_edge_probabilities(flip_probability):
+    base = generate_semi_periodic_signal(length=100, flip_probability=0.0, seed=1)
+    signal = generate_semi_periodic_signal(length=100, flip_probability=flip_probability, seed=1, sparse=True)
+    np.testing.assert_array_equal(signal, base if flip_probability == 0 else 1 - base)
+
+# -------------------------------------
+# Tests for generate_semi_periodic_signals
+# -------------------------------------
+
+def test_generate_semi_periodic_signals_shared_pattern():
+    """
+    Test that without flips every row is the tiled shared pattern.
+    """
+    signals = generate_semi_periodic_signals(4, length=50, base_patterns=[0, 1, 1], flip_probabilities=0.0, seed=0)
+    expected = generate_semi_periodic_signal(length=50, base_pattern=[0, 1, 1], flip_probability=0.0)
+    assert signals.shape == (4, 50)
+    assert signals.dtype == np.uint8
+    np.testing.assert_array_equal(signals, np.tile(expected, (4, 1)))
+
+def test_generate_semi_periodic_signals_per_row_patterns():
+    patterns = [[1, 0], [0, 0, 1], [1], [0, 1, 0, 1, 1]]
+    signals = generate_semi_periodic_signals(4, length=37, base_patterns=patterns, flip_probabilities=0.0, seed=0)
+    for row, pattern in zip(signals, patterns):
+        np.testing.assert_array_equal(row, np.tile(pattern, 37)[:37])
+
+    with pytest.raises(ValueError):
+        generate_semi_periodic_signals(3, length=10, base_patterns=patterns)
+
+@pytest.mark.parametrize("sparse", [True, False])
+def test_generate_semi_periodic_signals_per_row_flip_rates(sparse):
+    """
+    Test that each row flips at its own rate in both sampling modes.
+    """
+    rates = np.array([0.0, 0.01, 0.05, 0.2, 1.0])
+    base = generate_semi_periodic_signals(5, length=100000, flip_probabilities=0.0, seed=0)
+    signals = generate_semi_periodic_signals(5, length=100000, flip_probabilities=rates, seed=1, sparse=sparse)
+    observed = np.mean(signals != base, axis=1)
+    assert np.allclose(observed, rates, atol=0.005)
+
+def test_generate_semi_periodic_signals_seed():
+    kwargs = dict(n=3, length=200, flip_probabilities=[0.01, 0.1, 0.3])
+    np.testing.assert_array_equal(generate_semi_periodic_signals(seed=5, **kwargs),
+                                  generate_semi_periodic_signals(seed=5, **kwargs))
+
+def test_generate_semi_periodic_signals_packed_roundtrip():
+    """
+    Test that packed output is 8x smaller and unpacks to the same signals.
+    """
+    signals = generate_semi_periodic_signals(6, length=1003, flip_probabilities=0.1, seed=2)
+    packed = generate_semi_periodic_signals(6, length=1003, flip_probabilities=0.1, seed=2, packed=True)
+    assert packed.shape == (6, 126)
+    assert packed.dtype == np.uint8
+    np.testing.assert_array_equal(unpack_semi_periodic_signals(packed, 1003), signals)
+
+def test_add_periodic_interrupts_accepts_packed_patterns():
+    """
+    Test that add_periodic_interrupts gives the same result for packed and unpacked patterns.
+    """
+    length = 300
+    dig = generate_semi_periodic_signals(2, length=length, flip_probabilities=0.1, seed=3)
+    packed = np.packbits(dig, axis=-1)
+    base_signal = np.full(length, 0.5)
+    inter_sig = np.ones(length)
+
+    random.seed(0)
+    unpacked_res = add_periodic_interrupts(base_signal.copy(), (0, 2), inter_sig, 100, 50, length=length,
+                                           offset=1.0, dig_sig=dig[0], dig_sig_2=dig[1])
+    random.seed(0)
+    packed_res = add_periodic_interrupts(base_signal.copy(), (0, 2), inter_sig, 100, 50, length=length,
+                                         offset=1.0, dig_sig=packed[0], dig_sig_2=packed[1], packed=True)
+    np.testing.assert_allclose(unpacked_res, packed_res)
+    np.testing.assert_allclose(unpacked_res[:100], 0.5 + dig[0][:100])
+    np.testing.assert_allclose(unpacked_res[100:150], 0.5 + dig[1][100:150])
+
+def test_add_periodic_interrupts_fused_matches_regions():
+    """
+    Test that the fused injection uses pattern 1 outside and pattern 2 inside the window, clipped.
+    """
+    length = 200
+    dig = generate_semi_periodic_signals(2, length=length, flip_probabilities=0.2, seed=4)
+    base_signal = np.linspace(0, 1.5, length)
+    inter_sig = np.linspace(0.5, 1.0, length)
+
+    res = add_periodic_interrupts(base_signal.copy(), (0, 2), inter_sig, 60, 40, length=length,
+                                  dig_sig=dig[0], dig_sig_2=dig[1])
+    pattern = dig[0].copy()
+    pattern[60:100] = dig[1][60:100]
+    np.testing.assert_allclose(res, np.clip(base_signal + inter_sig * pattern, 0, 2))
+
+def test_add_periodic_interrupts_batch():
+    """
+    Test that a 2-D batch gives the same rows as per-signal calls, with per-row windows.
+    """
+    n, length = 4, 150
+    dig1 = generate_semi_periodic_signals(n, length=length, flip_probabilities=0.1, seed=5)
+    dig2 = generate_semi_periodic_signals(n, length=length, flip_probabilities=0.3, seed=6)
+    base = np.random.uniform(0, 1, size=(n, length))
+    inter_sig = np.random.uniform(0, 1, size=(n, length))
+    starts, durations = np.array([0, 10, 50, 140]), np.array([20, 30, 0, 50])
+    highs = np.array([1.2, 1.5, 2.0, 1.0])
+
+    batch = add_periodic_interrupts(base.copy(), (0, highs), inter_sig, starts, durations, length=length,
+                                    dig_sig=np.packbits(dig1, axis=-1), dig_sig_2=np.packbits(dig2, axis=-1),
+                                    packed=True)
+    assert batch.shape == (n, length)
+    for i in range(n):
+        row = add_periodic_interrupts(base[i].copy(), (0, highs[i]), inter_sig[i], starts[i], durations[i],
+                                      length=length, dig_sig=dig1[i], dig_sig_2=dig2[i])
+        np.testing.assert_allclose(batch[i], row)
+
+def test_add_periodic_interrupts_batch_generates_patterns():
+    base = np.zeros((3, 100))
+    res = add_periodic_interrupts(base, (0, 5), np.ones(100), [10, 20, 30], 10, length=100)
+    assert res is base
+    assert set(np.unique(res)) <= {0.0, 1.0}
+
+# -------------------------------------
+# Tests for run-length encoded patterns
+# -------------------------------------
+
+@pytest.mark.parametrize("length, pattern", [(1, [1]), (37, [1, 0]), (500, [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 1]), (90, [1, 1, 1])])
+def test_generate_semi_periodic_rle_matches_dense(length, pattern):
+    """
+    Test that the RLE built from a pattern and a flip list renders to the dense semi-periodic signal.
+    """
+    flips = np.array([0, 3, 4, 10, length - 1]) % length
+    dense = np.tile(pattern, length // len(pattern) + 1)[:length]
+    dense[np.unique(flips)] ^= 1
+
+    rle = generate_semi_periodic_rle(length, base_pattern=pattern, flips=flips)
+    np.testing.assert_array_equal(rle_to_signal(rle), dense)
+    for expected, actual in zip(signal_to_rle(dense), rle):
+        np.testing.assert_array_equal(actual, expected)
+    assert np.all(rle[2][1:] != rle[2][:-1]), "Adjacent runs should have different values."
+
+def test_generate_semi_periodic_rle_random_flips():
+    starts, lengths, values = generate_semi_periodic_rle(100000, base_pattern=[0] * 50 + [1] * 50,
+                                                         flip_probability=0.001, seed=0)
+    assert lengths.sum() == 100000
+    assert np.all(lengths > 0)
+    assert 2000 < len(starts) < 2800, "Expected about 2000 pattern runs plus two boundaries per flip."
+
+def test_rle_to_signal_slices():
+    dense = generate_semi_periodic_signal(length=300, flip_probability=0.1, seed=2)
+    rle = signal_to_rle(dense)
+    for start, stop in [(0, 300), (17, 18), (5, 250), (299, 300), (120, 120)]:
+        np.testing.assert_array_equal(rle_to_signal(rle, start, stop), dense[start:stop])
+
+def test_add_periodic_interrupts_rle_matches_dense():
+    """
+    Test that per-run injection matches the dense version, also when applied chunk by chunk.
+    """
+    length = 400
+    dig1 = generate_semi_periodic_signal(length=length, flip_probability=0.1, seed=3)
+    dig2 = generate_semi_periodic_signal(length=length, base_pattern=[1, 1, 0], flip_probability=0.1, seed=4)
+    base = np.random.uniform(0.2, 1.0, length)
+    inter_sig = np.random.uniform(0, 1.5, length)
+
+    dense = add_periodic_interrupts(base.copy(), (0, 2), inter_sig, 150, 100, length=length,
+                                    dig_sig=dig1, dig_sig_2=dig2)
+    rle_res = add_periodic_interrupts_rle(base.copy(), (0, 2), inter_sig, 150, 100,
+                                          signal_to_rle(dig1), signal_to_rle(dig2))
+    np.testing.assert_allclose(rle_res, dense)
+
+    chunked = base.copy()
+    for chunk_start in range(0, length, 64):
+        chunk = slice(chunk_start, chunk_start + 64)
+        add_periodic_interrupts_rle(chunked[chunk], (0, 2), inter_sig[chunk], 150, 100,
+                                    signal_to_rle(dig1), signal_to_rle(dig2), chunk_start=chunk_start)
+    np.testing.assert_allclose(chunked, dense)
+
+def test_add_periodic_interrupts_rle_clips_like_dense():
+    """
+    Out-of-range base samples are clipped by both versions, also outside active runs.
+    """
+    length = 300
+    rng = np.random.default_rng(5)
+    dig1 = generate_semi_periodic_signal(length=length, flip_probability=0.1, seed=6)
+    dig2 = generate_semi_periodic_signal(length=length, base_pattern=[1, 0], flip_probability=0.1, seed=7)
+    base = rng.uniform(-1.0, 3.0, length)
+    inter_sig = rng.uniform(0, 1.5, length)
+
+    dense = add_periodic_interrupts(base.copy(), (0, 2), inter_sig, 100, 80, length=length,
+                                    dig_sig=dig1, dig_sig_2=dig2)
+    rle_res = add_periodic_interrupts_rle(base.copy(), (0, 2), inter_sig, 100, 80,
+                                          signal_to_rle(dig1), signal_to_rle(dig2))
+    np.testing.assert_allclose(rle_res, dense)
@@ -0,0 +1,141 @@
+import numpy as np
+import pytest
+
+from SigVarGen import (
+    plan_batch,
+    render_plan,
+    SignalPlan,
+    generate_signal,
+    apply_interrupt_modifications,
+    DeviceCatalog,
+    EnvelopeSpec,
+    envelope_sine,
+    envelope_random_walk,
+    envelope_blockwise,
+    envelope_linear,
+)
+
+DEVICE_RANGES = {
+    'DeviceA': {'amplitude': (0, 10), 'frequency': {'low': (1, 5), 'high': (20, 40)}},
+    'DeviceB': {'amplitude': (5, 15), 'frequency': (2, 30)},
+}
+INTERRUPT_RANGES = {
+    'DeviceA': {'amplitude': (0.2, 1.0), 'frequency': {'low': (5, 15), 'high': (20, 50)}},
+    'DeviceB': {'amplitude': (1, 3), 'frequency': (10, 20)},
+}
+NOISE_FUNCS = (None, EnvelopeSpec(envelope_linear, (True, False)), EnvelopeSpec(envelope_sine, (0.0001, 0.01)),
+               EnvelopeSpec(envelope_random_walk, (0.01, 0.15)), EnvelopeSpec(envelope_blockwise, (50, 300)))
+
+@pytest.fixture
+def t():
+    return np.linspace(0, 1, 500)
+
+@pytest.fixture
+def plan(t):
+    return plan_batch(60, t, DEVICE_RANGES, INTERRUPT_RANGES, snr_range=(0, 20), colors=('white', 'pink', 'brown'),
+                      noise_funcs=NOISE_FUNCS, max_time_shift=20, max_gain_variation=0.1, mf=(0.9, 1.1), seed=0)
+
+def test_plan_batch_is_reproducible(t, plan):
+    again = plan_batch(60, t, DEVICE_RANGES, INTERRUPT_RANGES, snr_range=(0, 20), colors=('white', 'pink', 'brown'),
+                       noise_funcs=NOISE_FUNCS, max_time_shift=20, max_gain_variation=0.1, mf=(0.9, 1.1), seed=0)
+    np.testing.assert_array_equal(plan.samples, again.samples)
+    np.testing.assert_array_equal(plan.sinusoids, again.sinusoids)
+
+def test_plan_batch_respects_ranges(t, plan):
+    s = plan.samples
+    catalog = DeviceCatalog(DEVICE_RANGES)
+    np.testing.assert_array_equal(s['domain'], catalog.domains[s['row']])
+    assert np.all((s['sin_count'] >= 50) & (s['sin_count'] <= 100))
+    assert np.all((s['interrupt_sin_count'] >= 2) & (s['interrupt_sin_count'] <= 10))
+    assert np.all(s['interrupt_start'] + s['interrupt_duration'] <= len(t))
+    assert np.all((s['snr_db'] >= 0) & (s['snr_db'] <= 20))
+    assert np.all(np.abs(s['time_shift']) <= 20)
+    assert len(plan.sinusoids) == s['sin_count'].sum() + s['interrupt_sin_count'].sum()
+    assert set(np.unique(s['envelope'])) <= {-1, 0, 1, 2, 3}
+
+def test_plan_batch_requires_matching_interrupts(t):
+    with pytest.raises(ValueError):
+        plan_batch(5, t, DEVICE_RANGES, {'DeviceA': INTERRUPT_RANGES['DeviceA']}, seed=0)
+
+def test_render_plan_base_matches_generate_signal(t, monkeypatch):
+    clean_plan = plan_batch(3, t, DEVICE_RANGES, seed=1)
+    rendered = render_plan(clean_plan)
+
+    for i, record in enumerate(clean_plan.samples):
+        sinusoids = clean_plan.sinusoids[record['sin_start']:record['sin_start'] + record['sin_count']]
+        draws = iter(np.column_stack((sinusoids['amp'], sinusoids['freq'], sinusoids['phase'])).ravel())
+        monkeypatch.setattr(np.random, 'uniform', lambda *args, **kwargs: next(draws))
+        expected, _ = generate_signal(t, len(sinusoids), (record['amp_low'], record['amp_high']), (1, 2))
+        monkeypatch.undo()
+        np.testing.assert_array_equal(rendered[i], expected)
+
+def test_render_plan_interrupt_matches_modifications(t):
+    plan = plan_batch(4, t, DEVICE_RANGES, INTERRUPT_RANGES, disperse=False, blend_factor=0.0, seed=2)
+    base = render_plan(plan_batch(4, t, DEVICE_RANGES, INTERRUPT_RANGES, blend_factor=1.0, seed=2))
+    rendered = render_plan(plan)
+
+    for i, record in enumerate(plan.samples):
+        start, end = record['interrupt_start'], record['interrupt_start'] + record['interrupt_duration']
+        np.testing.assert_array_equal(rendered[i, :start], base[i, :start])
+        np.testing.assert_array_equal(rendered[i, end:], base[i, end:])
+
+        interrupt = render_plan(SignalPlan(_as_base(plan.samples[i:i + 1]), plan.sinusoids, t, plan.domain_names))[0]
+        expected, _ = apply_interrupt_modifications(interrupt[start:end].copy(), base[i, start:end],
+                                                    record['device_min'], record['device_max'], drop=False)
+        np.testing.assert_allclose(rendered[i, start:end], expected)
+
+def _as_base(samples):
+    # Render a plan's interrupt sinusoids as a plain base signal
+    samples = samples.copy()
+    samples['sin_start'], samples['sin_count'] = samples['interrupt_sin_start'], samples['interrupt_sin_count']
+    samples['amp_low'], samples['amp_high'] = samples['interrupt_amp_low'], samples['interrupt_amp_high']
+    samples['has_interrupt'] = False
+    return samples
+
+def test_render_plan_subsets_match_full_render(plan):
+    full, clean = render_plan(plan, chunk_size=16, return_clean=True)
+    assert np.all(np.isfinite(full))
+    assert not np.allclose(full, clean)
+
+    idx = np.array([41, 3, 59, 3, 17])
+    np.testing.assert_array_equal(render_plan(plan[idx]), full[idx])
+    mask = plan.samples['drop'] | (plan.samples['envelope'] == 2)
+    np.testing.assert_array_equal(render_plan(plan[mask], chunk_size=4), full[mask])
+
+def test_render_plan_noise_follows_snr(t):
+    plan = plan_batch(40, t, DEVICE_RANGES, snr_range=(10, 10), colors=('white',), seed=3)
+    noisy, clean = render_plan(plan, return_clean=True)
+    snr = 20 * np.log10(clean.std(axis=1) / (noisy - clean).std(axis=1))
+    np.testing.assert_allclose(snr, 10)
+
+def test_signal_plan_save_load(tmp_path, plan):
+    path = tmp_path / 'plan.npz'
+    plan.save(path)
+    loaded = SignalPlan.load(path)
+    assert len(loaded) == len(plan)
+    np.testing.assert_array_equal(loaded.samples, plan.samples)
+    np.testing.assert_array_equal(render_plan(loaded[:5]), render_plan(plan[:5]))
+
+def test_render_plan_into_out(t, plan):
+    out = np.zeros((len(plan), len(t)))
+    assert render_plan(plan, out=out) is out
+    np.testing.assert_array_equal(out, render_plan(plan))
+
+def test_render_envelopes_batched_draws():
+    from SigVarGen.plan import _render_envelopes, ENVELOPES
+    n, N = 6, 1000
+    codes = np.repeat([ENVELOPES.index(envelope_blockwise), ENVELOPES.index(envelope_random_walk)], 3)
+    params = np.array([50, 120, 300, 0.05, 0.05, 0.05])
+    low, high = np.full(n, 0.5), np.full(n, 2.0)
+    seeds = np.arange(n, dtype=np.uint64)
+    env = _render_envelopes(codes, params, N, low, high, seeds)
+
+    assert np.all((env >= 0.5) & (env <= 2.0))
+    for row, block_size in zip(env[:3], (50, 120, 300)):
+        blocks = np.split(row, np.arange(block_size, N, block_size))
+        assert all(np.all(block == block[0]) for block in blocks)
+        assert len(np.unique(row)) == len(blocks)
+    assert len({tuple(row) for row in env[3:]}) == 3
+
+    # Each row depends only on its own seed
+    np.testing.assert_array_equal(_render_envelopes(codes[::-1], params[::-1], N, low, high, seeds[::-1]), env[::-1])
@@ -0,0 +1,125 @@
+import json
+
+import numpy as np
+import pytest
+
+from SigVarGen import load_scenario, EnvelopeSpec, envelope_sine, generate_device_parameters
+
+@pytest.fixture
+def scenario_dict():
+    return {
+        'fs': 10000,
+        'split_ratios': [0.4, 0.6],
+        'device_ranges': {
+            'DeviceA': {'amplitude': [0, 10], 'frequency': {'low': [100, 200], 'high': [500, 1000]}},
+            'DeviceB': {'amplitude': [5, 15], 'frequency': [50, 150]},
+        },
+        'interrupt_ranges': {
+            'DeviceA': {'amplitude': [0.2, 1.0], 'frequency': {'low': [5, 15], 'high': [20, 50]}},
+        },
+        'param_sweeps': {
+            'DeviceA': {'time_shift': {'arange': [1, 301, 50]}, 'time_warp': {'linspace': [0, 0.07, 8]},
+                        'gain_variation': [0, 0.2, 0.4]},
+        },
+        'npw_levels': [[1, 1], [0.9, 1.1]],
+        'mf_levels': [[0.75, 0.85]],
+        'noise_envelopes': [None, {'func': 'envelope_sine', 'param': [0.0001, 0.01]}],
+    }
+
+def test_load_scenario_compiles_structures(scenario_dict):
+    scenario = load_scenario(scenario_dict)
+    assert scenario.device_ranges == {
+        'DeviceA': {'amplitude': (0, 10), 'frequency': {'low': (100, 200), 'high': (500, 1000)}},
+        'DeviceB': {'amplitude': (5, 15), 'frequency': (50, 150)},
+    }
+    assert scenario.split_ratios == (0.4, 0.6)
+    np.testing.assert_array_equal(scenario.param_sweeps['DeviceA']['time_shift'], np.arange(1, 301, 50))
+    np.testing.assert_array_equal(scenario.param_sweeps['DeviceA']['time_warp'], np.linspace(0, 0.07, 8))
+    assert scenario.npw_levels.shape == (2, 2) and scenario.mf_levels.shape == (1, 2)
+    assert scenario.noise_funcs == (None, EnvelopeSpec(envelope_sine, (0.0001, 0.01)))
+
+    split = generate_device_parameters(scenario.device_ranges, split_ratios=[0.4, 0.6])[1]
+    assert scenario.device_catalog.lookup('DeviceA', 'high', split=1)[1] == split['DeviceA']['frequency']['high']
+    assert len(scenario.interrupt_catalog) == 4
+
+@pytest.mark.parametrize("suffix", [".json", ".toml"])
+def test_load_scenario_from_file(scenario_dict, tmp_path, suffix):
+    path = tmp_path / f"scenario{suffix}"
+    if suffix == ".json":
+        path.write_text(json.dumps(scenario_dict))
+    else:
+        path.write_text(
+            'fs = 10000\n'
+            'split_ratios = [0.4, 0.6]\n'
+            'npw_levels = [[1, 1], [0.9, 1.1]]\n'
+            'noise_envelopes = ["none", { func = "envelope_sine", param = [0.0001, 0.01] }]\n'
+            '[device_ranges.DeviceB]\n'
+            'amplitude = [5, 15]\n'
+            'frequency = [50, 150]\n'
+            '[param_sweeps.DeviceB]\n'
+            'time_warp = { linspace = [0, 0.07, 8] }\n'
+        )
+    scenario = load_scenario(path)
+    assert scenario.device_ranges['DeviceB'] == {'amplitude': (5, 15), 'frequency': (50, 150)}
+    assert scenario.noise_funcs[0] is None and scenario.noise_funcs[1].func is envelope_sine
+
+def test_load_scenario_reports_all_problems(scenario_dict):
+    scenario_dict['split_ratios'] = [0.5, 0.6]
+    scenario_dict['device_ranges']['DeviceA']['amplitude'] = [10, 0]
+    scenario_dict['device_ranges']['DeviceB']['frequency'] = [50, 6000]
+    scenario_dict['interrupt_ranges']['DeviceC'] = {'amplitude': [0, 1]}
+    scenario_dict['param_sweeps']['DeviceA']['time_shift'] = {'logspace': [0, 1, 5]}
+    scenario_dict['npw_levels'].append([1, float('nan')])
+    scenario_dict['noise_envelopes'].append({'func': 'envelope_square', 'param': [0, 1]})
+    scenario_dict['colour'] = 'pink'
+
+    with pytest.raises(ValueError) as excinfo:
+        load_scenario(scenario_dict)
+    message = str(excinfo.value)
+    for expected in ["split_ratios", "device_ranges.DeviceA.amplitude: low bound exceeds high bound",
+                     "device_ranges.DeviceB.frequency: exceeds the Nyquist frequency",
+                     "interrupt_ranges.DeviceC: not defined in device_ranges",
+                     "param_sweeps.DeviceA.time_shift", "npw_levels[2]: bounds must be finite",
+                     "noise_envelopes[2]", "colour: unknown key"]:
+        assert expected in message
+
+def test_load_scenario_nyquist_is_optional(scenario_dict):
+    del scenario_dict['fs']
+    scenario_dict['device_ranges']['DeviceB']['frequency'] = [50, 2.4e9]
+    assert load_scenario(scenario_dict).fs is None
+    with pytest.raises(ValueError, match="Nyquist"):
+        load_scenario(scenario_dict, fs=1000)
+
+@pytest.mark.parametrize("key, value, expected", [
+    ('param_sweeps', {'DeviceA': [0, 0.1, 0.2]}, "param_sweeps.DeviceA: expected a table"),
+    ('npw_levels', 5, "npw_levels: expected a list"),
+    ('mf_levels', [[1, 2, 3]], "mf_levels[0]: expected a [low, high] range"),
+    ('noise_envelopes', None, "noise_envelopes: expected a list"),
+    ('noise_envelopes', [{'func': 'envelope_sine', 'param': ['a', 'b']}], "noise_envelopes[0]: 'param'"),
+])
+def test_load_scenario_rejects_malformed_sections(scenario_dict, key, value, expected):
+    scenario_dict[key] = value
+    scenario_dict['split_ratios'] = [0.5, 0.6]
+    with pytest.raises(ValueError) as excinfo:
+        load_scenario(scenario_dict)
+    # Structural problems are reported together with the other errors
+    assert expected in str(excinfo.value) and "split_ratios" in str(excinfo.value)
+
+@pytest.mark.parametrize("key, value, expected", [
+    ('fs', "abc", "fs: must be a positive number"),
+    ('fs', True, "fs: must be a positive number"),
+    ('split_ratios', ["a", "b"], "split_ratios: must be positive numbers"),
+    ('split_ratios', [True, False], "split_ratios: must be positive numbers"),
+    ('param_sweeps', {'DeviceA': {'time_shift': {'arange': [0, 1, 0]}}}, "arange step must be non-zero"),
+    ('param_sweeps', {'DeviceA': {'time_shift': {'arange': [0, float('inf'), 1]}}}, "arguments must be finite"),
+    ('param_sweeps', {'DeviceA': {'time_warp': {'linspace': [0, 1, 0]}}}, "linspace num must be a positive integer"),
+    ('param_sweeps', {'DeviceA': {'time_warp': {'linspace': [0, 1, -3]}}}, "linspace num must be a positive integer"),
+    ('param_sweeps', {'DeviceA': {'time_warp': {'logspace': [0, 1, 5]}}}, "unknown sweep 'logspace'"),
+])
+def test_load_scenario_rejects_bad_values(scenario_dict, key, value, expected):
+    scenario_dict[key] = value
+    scenario_dict['mf_levels'] = [[2, 1]]
+    with pytest.raises(ValueError) as excinfo:
+        load_scenario(scenario_dict)
+    # Reported in the combined message, not raised on their own
+    assert expected in str(excinfo.value) and "mf_levels[0]" in str(excinfo.value)
@@ -1,3 +1,4 @@
+import warnings
 import pytest
 import numpy as np
 
@@ -67,7 +68,12 @@ def test_euclidean_distance():
 
 import numpy as np
 import pytest
-from SigVarGen.utils import calculate_SNR, interpoling, normalization
+from SigVarGen.utils import (calculate_SNR, interpoling, normalization, resample_signals, pairwise_ed, calculate_ED,
+                             calculate_SNR_batch, SNRAccumulator, calculate_SNR_streaming, local_snr,
+                             CrossCorrelationAligner, align_to_reference, calculate_DTW,
+                             sketch_signals, find_near_duplicates,
+                             safe_normalization, StreamingNormalizer, DeviceCatalog,
+                             generate_domain_parameters)
 
 def test_calculate_SNR():
     signal = np.ones(100)
@@ -85,3 +91,325 @@ def test_normalization():
     norm_signal = normalization(signal)
     assert np.isclose(np.mean(norm_signal), 0, atol=1e-5)
     assert np.isclose(np.std(norm_signal), 1, atol=1e-5)
+
+def test_interpoling_values():
+    res = np.array([0.0, 1.0, 4.0])
+    np.testing.assert_allclose(interpoling(res, target_len=5), [0.0, 0.5, 1.0, 2.5, 4.0])
+
+def test_resample_signals_batch_matches_rows():
+    batch = np.random.randn(6, 97)
+    resampled = resample_signals(batch, target_len=250)
+    assert resampled.shape == (6, 250)
+    for row, expected in zip(batch, resampled):
+        np.testing.assert_allclose(interpoling(row, target_len=250), expected)
+        assert row[0] == expected[0] and np.isclose(row[-1], expected[-1])
+
+def test_resample_signals_constant_and_single_sample():
+    np.testing.assert_allclose(resample_signals(np.full(10, 3.0), target_len=7), np.full(7, 3.0))
+    np.testing.assert_allclose(resample_signals(np.array([[2.0], [5.0]]), target_len=3), [[2, 2, 2], [5, 5, 5]])
+
+@pytest.mark.parametrize("method", ["poly", "fft"])
+def test_resample_signals_band_limited(method):
+    """
+    Test that band-limited resampling preserves a slow periodic sine.
+    """
+    t_src = np.arange(400) / 400
+    t_dst = np.arange(1000) / 1000
+    batch = np.stack([np.sin(2 * np.pi * 3 * t_src), np.cos(2 * np.pi * 5 * t_src)])
+    resampled = resample_signals(batch, target_len=1000, method=method)
+    expected = np.stack([np.sin(2 * np.pi * 3 * t_dst), np.cos(2 * np.pi * 5 * t_dst)])
+    assert resampled.shape == (2, 1000)
+    np.testing.assert_allclose(resampled[:, 100:-100], expected[:, 100:-100], atol=1e-2)
+
+def test_resample_signals_invalid_method():
+    with pytest.raises(ValueError):
+        resample_signals(np.zeros(10), target_len=5, method='cubic')
+
+def test_pairwise_ed_matches_calculate_ED():
+    A = np.random.randn(7, 50)
+    B = np.random.randn(4, 50)
+    D = pairwise_ed(A, B)
+    assert D.shape == (7, 4)
+    expected = np.array([[calculate_ED(a, b) for b in B] for a in A])
+    np.testing.assert_allclose(D, expected)
+
+def test_pairwise_ed_self_and_blocking():
+    """
+    Test the self-distance matrix with a memory budget small enough to force one row per block.
+    """
+    A = np.random.randn(9, 30)
+    D = pairwise_ed(A, max_memory=1)
+    expected = np.linalg.norm(A[:, None, :] - A[None, :, :], axis=-1)
+    np.testing.assert_allclose(D, expected)
+    assert np.all(np.diag(D) == 0)
+    np.testing.assert_array_equal(D, D.T)
+
+def test_pairwise_ed_near_zero_precision():
+    """
+    Test that nearly identical large-norm signals keep an accurate, non-negative distance.
+    """
+    base = 1e4 + np.random.randn(1, 1000)
+    A = np.vstack([base, base + 1e-6, base])
+    D = pairwise_ed(A)
+    assert np.isclose(D[0, 1], 1e-6 * np.sqrt(1000), rtol=1e-3)
+    assert D[0, 2] == 0
+    assert np.all(D >= 0)
+
+def test_pairwise_ed_out_and_shape_mismatch(tmp_path):
+    A = np.random.randn(5, 20)
+    out = np.memmap(tmp_path / "D.dat", dtype=np.float64, mode="w+", shape=(5, 5))
+    assert pairwise_ed(A, out=out) is out
+    np.testing.assert_allclose(out, pairwise_ed(A))
+    with pytest.raises(ValueError):
+        pairwise_ed(A, np.zeros((2, 21)))
+
+def test_calculate_SNR_batch_matches_rows():
+    signals = np.random.randn(5, 200) + 1
+    noisy = signals + np.random.normal(0, 0.3, size=signals.shape)
+    np.testing.assert_allclose(calculate_SNR_batch(signals, noisy),
+                               [calculate_SNR(s, n) for s, n in zip(signals, noisy)])
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 100, 1000])
+def test_calculate_SNR_streaming_matches_full(chunk_size):
+    signal = np.sin(np.linspace(0, 20, 1000)) + 0.5
+    noisy = signal + np.random.normal(0.1, 0.2, size=1000)
+    assert np.isclose(calculate_SNR_streaming(signal, noisy, chunk_size=chunk_size), calculate_SNR(signal, noisy))
+
+def test_snr_accumulator_batch_and_variance():
+    """
+    Test row-wise accumulation and the running noise variance.
+    """
+    signals = np.random.randn(3, 500)
+    noisy = signals + np.random.normal(0, [[0.1], [0.5], [1.0]], size=(3, 500))
+    acc = SNRAccumulator()
+    for start in range(0, 500, 64):
+        acc.update(signals[:, start:start + 64], noisy[:, start:start + 64])
+    assert acc.count == 500
+    np.testing.assert_allclose(acc.snr(), calculate_SNR_batch(signals, noisy))
+    np.testing.assert_allclose(acc.noise_variance(), np.var(noisy - signals, axis=1))
+
+@pytest.mark.parametrize("step", [1, 3])
+def test_local_snr_valid_matches_windows(step):
+    signal = np.sin(np.linspace(0, 30, 300)) + 1
+    noisy = signal + np.random.normal(0, 0.2, size=300) * np.linspace(0.1, 2, 300)
+    profile = local_snr(signal, noisy, window=40, step=step)
+    expected = [calculate_SNR(signal[k:k + 40], noisy[k:k + 40]) for k in range(0, 261, step)]
+    np.testing.assert_allclose(profile, expected)
+    assert profile[0] > profile[-1], "SNR should fall as the noise envelope grows"
+
+def test_local_snr_same_mode_and_batch():
+    """
+    Test centered per-sample windows truncated at the edges, on a batch.
+    """
+    signals = np.random.randn(2, 50) + 2
+    noisy = signals + np.random.normal(0, 0.5, size=(2, 50))
+    profile = local_snr(signals, noisy, window=10, mode='same')
+    assert profile.shape == (2, 50)
+    for row in range(2):
+        for i in (0, 3, 25, 49):
+            lo, hi = max(i - 5, 0), min(i + 5, 50)
+            assert np.isclose(profile[row, i], calculate_SNR(signals[row, lo:hi], noisy[row, lo:hi]))
+
+def test_local_snr_zero_windows():
+    signal = np.concatenate([np.zeros(20), np.ones(20), np.zeros(20)])
+    noise = np.concatenate([np.zeros(30), np.full(30, 0.5)])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        profile = local_snr(signal, signal + noise, window=10, step=10)
+    np.testing.assert_array_equal(profile[[0, 2, 4, 5]], [np.nan, np.inf, -np.inf, -np.inf])
+    assert np.isnan(profile[1]) and np.isclose(profile[3], 10 * np.log10(1 / 0.25))
+
+def test_local_snr_invalid_arguments():
+    with pytest.raises(ValueError):
+        local_snr(np.ones(10), np.ones(10), window=11)
+    with pytest.raises(ValueError):
+        local_snr(np.ones(10), np.ones(10), window=5, mode='full')
+
+def test_aligner_recovers_circular_shifts():
+    reference = np.random.randn(256)
+    shifts = np.array([-40, -3, 0, 17, 100])
+    variants = np.stack([np.roll(reference, k) for k in shifts])
+    aligner = CrossCorrelationAligner(reference)
+    np.testing.assert_array_equal(aligner.lags(variants), shifts)
+    np.testing.assert_allclose(aligner.align(variants), np.tile(reference, (len(shifts), 1)))
+    np.testing.assert_allclose(aligner.distances(variants), 0, atol=1e-6)
+    assert aligner.lags(variants[3]) == 17
+
+def test_aligner_distances_match_aligned_ed():
+    reference = np.random.randn(200)
+    variants = np.stack([np.roll(reference, k) + np.random.normal(0, 0.3, 200) for k in (5, -20)])
+    for circular in (True, False):
+        aligner = CrossCorrelationAligner(reference, circular=circular)
+        distances, lags = aligner.distances(variants, return_lags=True)
+        aligned = aligner.align(variants, lags)
+        expected = [calculate_ED(reference, row) for row in aligned]
+        np.testing.assert_allclose(distances, expected)
+        assert distances[0] < calculate_ED(reference, variants[0])
+
+def test_aligner_distance_to_itself_is_exactly_zero():
+    reference = np.random.default_rng(3).standard_normal(1000) * 3 + 2
+    for circular in (True, False):
+        aligner = CrossCorrelationAligner(reference, circular=circular)
+        assert aligner.distances(reference) == 0
+    distances = CrossCorrelationAligner(reference).distances(np.stack([reference, np.roll(reference, 25)]))
+    assert np.all(distances == 0)
+
+def test_aligner_linear_and_max_lag():
+    """
+    Test zero-padded correlation and restriction of the lag search.
+    """
+    recording = np.random.randn(400)
+    reference = recording[100:300]
+    variant = recording[130:330]  # content moved 30 samples earlier
+    assert CrossCorrelationAligner(reference, circular=False).lags(variant) == -30
+    assert abs(CrossCorrelationAligner(reference, max_lag=10, circular=False).lags(variant)) <= 10
+
+    lags, distances = align_to_reference(reference, np.roll(reference, 7), return_distances=True)
+    assert lags == 7 and np.isclose(distances, 0, atol=1e-6)
+    with pytest.raises(ValueError):
+        align_to_reference(reference, np.zeros(10))
+
+def _reference_dtw(x, y, band=None):
+    N, M = len(x), len(y)
+    band = max(N, M) if band is None else max(band, abs(N - M))
+    D = np.full((N + 1, M + 1), np.inf)
+    D[0, 0] = 0
+    for i in range(1, N + 1):
+        for j in range(max(1, i - band), min(M, i + band) + 1):
+            D[i, j] = (x[i - 1] - y[j - 1]) ** 2 + min(D[i - 1, j], D[i, j - 1], D[i - 1, j - 1])
+    return np.sqrt(D[N, M])
+
+@pytest.mark.parametrize("N, M, band", [(30, 30, None), (30, 30, 3), (25, 31, 2), (31, 25, 4), (5, 9, 0)])
+def test_calculate_DTW_matches_reference(N, M, band):
+    x, y = np.random.randn(N), np.random.randn(M)
+    assert np.isclose(calculate_DTW(x, y, band=band), _reference_dtw(x, y, band))
+
+def test_calculate_DTW_band_zero_is_ED_and_batches():
+    X, Y = np.random.randn(4, 40), np.random.randn(4, 40)
+    np.testing.assert_allclose(calculate_DTW(X, Y, band=0), [calculate_ED(x, y) for x, y in zip(X, Y)])
+
+    # One reference against many, and warping reduces the distance
+    base = np.sin(np.linspace(0, 6 * np.pi, 100))
+    warped = np.sin(np.linspace(0, 6 * np.pi, 100) ** 1.05 / (6 * np.pi) ** 0.05)
+    d = calculate_DTW(base, np.stack([warped, base]), band=10)
+    assert d.shape == (2,) and d[1] == 0
+    assert d[0] < calculate_ED(base, warped)
+
+def test_sketch_signals_invariant_to_offset_and_scale():
+    waves = np.random.default_rng(0).standard_normal((5, 300))
+    sketches = sketch_signals(waves, n_bits=64, seed=0)
+    assert sketches.shape == (5, 8) and sketches.dtype == np.uint8
+    np.testing.assert_array_equal(sketch_signals(3 * waves + 7, n_bits=64, seed=0), sketches)
+    with pytest.raises(ValueError):
+        sketch_signals(waves, n_bits=60)
+
+def test_find_near_duplicates_reports_planted_pairs():
+    rng = np.random.default_rng(1)
+    waves = rng.standard_normal((2000, 200))
+    waves[3] = 2 * waves[1500] + 1 + rng.normal(0, 0.05, 200)
+    waves[42] = waves[7] + rng.normal(0, 0.1, 200)
+    pairs, similarity = find_near_duplicates(waves, min_similarity=0.95, seed=0)
+    assert {tuple(p) for p in pairs} == {(3, 1500), (7, 42)}
+    assert np.all(similarity >= 0.95)
+
+    # Precomputed sketches give the same answer
+    sketches = sketch_signals(waves, seed=0)
+    pairs_2, _ = find_near_duplicates(None, sketches=sketches)
+    np.testing.assert_array_equal(pairs_2, pairs)
+
+def test_find_near_duplicates_skips_large_buckets():
+    waves = np.tile(np.random.default_rng(2).standard_normal(200), (20, 1))
+    pairs, _ = find_near_duplicates(waves, seed=0)
+    assert len(pairs) == 20 * 19 // 2
+    pairs, _ = find_near_duplicates(waves, seed=0, max_bucket_size=10)
+    assert len(pairs) == 0
+
+def test_normalization_batched_axis_and_in_place():
+    signals = np.random.randn(4, 100) * 3 + 5
+    expected = np.stack([(row - row.mean()) / row.std() for row in signals])
+    np.testing.assert_allclose(normalization(signals, axis=-1), expected)
+    np.testing.assert_allclose(normalization(signals.T, axis=0), expected.T)
+
+    result = normalization(signals, axis=-1, out=signals)
+    assert result is signals
+    np.testing.assert_allclose(signals, expected)
+
+def test_normalization_default_uses_whole_array():
+    signals = np.random.default_rng(0).standard_normal((4, 100)) * [[1], [2], [3], [4]] + 5
+    # Baseline behavior: one mean and std over the whole stack
+    expected = (signals - np.mean(signals)) / np.std(signals)
+    np.testing.assert_allclose(normalization(signals), expected)
+    np.testing.assert_allclose(safe_normalization(signals), expected)
+    copy = signals.copy()
+    assert normalization(copy, out=copy) is copy
+    np.testing.assert_allclose(copy, expected)
+
+def test_safe_normalization_constant_rows():
+    signals = np.vstack([np.full(10, 3.0), np.arange(10.0)])
+    result = safe_normalization(signals, axis=-1)
+    np.testing.assert_array_equal(result[0], 0)
+    np.testing.assert_allclose(result[1], normalization(np.arange(10.0)))
+    with np.errstate(invalid='ignore'):
+        assert np.all(np.isnan(normalization(signals[0])))
+
+def test_safe_normalization_1d():
+    np.testing.assert_allclose(safe_normalization(np.arange(5.0)), normalization(np.arange(5.0)))
+    np.testing.assert_array_equal(safe_normalization(np.full(5, 2.0)), 0)
+    signal = np.arange(5.0)
+    assert safe_normalization(signal, out=signal) is signal
+
+@pytest.mark.parametrize("shape", [(1000,), (3, 1000)])
+def test_streaming_normalizer_matches_normalization(shape, tmp_path):
+    data = np.random.randn(*shape) * 2 + 1
+    stored = np.memmap(tmp_path / "data.dat", dtype=np.float64, mode='w+', shape=shape)
+    stored[:] = data
+    normalizer = StreamingNormalizer().fit(stored, chunk_size=128)
+    np.testing.assert_allclose(normalizer.normalize(stored, chunk_size=100), normalization(data, axis=-1))
+
+    # In place, over the memmap itself
+    normalizer.normalize(stored, out=stored, chunk_size=300)
+    np.testing.assert_allclose(stored, normalization(data, axis=-1))
+
+def test_device_catalog_matches_generate_device_parameters(sample_device_params):
+    catalog = DeviceCatalog(sample_device_params, split_ratios=[0.3, 0.7])
+    splits = generate_device_parameters(sample_device_params, split_ratios=[0.3, 0.7])
+    assert len(catalog) == 2 * 3
+    for i, split_params in enumerate(splits):
+        amplitude, frequency = catalog.lookup("DeviceA", "high", split=i)
+        assert amplitude == split_params["DeviceA"]["amplitude"]
+        assert frequency == split_params["DeviceA"]["frequency"]["high"]
+        assert catalog.lookup("DeviceB", split=i)[1] == split_params["DeviceB"]["frequency"]
+
+def test_device_catalog_sample_within_bounds(sample_device_params):
+    catalog = DeviceCatalog(sample_device_params, split_ratios=[0.5, 0.5])
+    domains, bands, amplitudes, frequencies = catalog.sample(2000, split=1, seed=0)
+    assert set(domains) == {"DeviceA", "DeviceB"}
+    assert set(bands[domains == "DeviceA"]) == {"low", "high"}
+    assert set(bands[domains == "DeviceB"]) == {0}
+
+    for domain, band, amplitude, frequency in zip(domains[:50], bands[:50], amplitudes[:50], frequencies[:50]):
+        (a_lo, a_hi), (f_lo, f_hi) = catalog.lookup(domain, band, split=1)
+        assert a_lo <= amplitude <= a_hi and f_lo <= frequency <= f_hi
+
+    # Fixed domain and reproducibility
+    domains, bands, _, _ = catalog.sample(10, domain="DeviceB", seed=1)
+    assert np.all(domains == "DeviceB")
+    np.testing.assert_array_equal(catalog.sample(10, seed=3)[2], catalog.sample(10, seed=3)[2])
+
+@pytest.mark.parametrize("drop", [False, True])
+@pytest.mark.parametrize("frequency_follows_amplitude", [False, True])
+@pytest.mark.parametrize("split_ratios", [[0.5, 0.5], [0.2, 0.3, 0.5]])
+def test_generate_domain_parameters_matches_full_split(sample_device_params, drop, frequency_follows_amplitude, split_ratios):
+    full = generate_device_parameters(sample_device_params, drop, frequency_follows_amplitude, split_ratios)
+    for domain in sample_device_params:
+        result = generate_domain_parameters(sample_device_params, domain, drop, frequency_follows_amplitude, split_ratios)
+        assert result == [split[domain] for split in full]
+
+def test_generate_domain_parameters_cached_results_are_fresh(sample_device_params):
+    first = generate_domain_parameters(sample_device_params, "DeviceA", split_ratios=[0.4, 0.6])
+    first[0]["frequency"]["low"] = None
+    second = generate_domain_parameters(sample_device_params, "DeviceA", split_ratios=[0.4, 0.6])
+    assert second[0]["frequency"]["low"] == (100, 140)
+
+    with pytest.raises(ValueError):
+        generate_domain_parameters(sample_device_params, "DeviceA", split_ratios=[0.4, 0.4])